@@ -5,8 +5,10 @@ Django settings for backend project.
 from pathlib import Path
 from datetime import timedelta
 import os # Import os module for path manipulation
+import json
 
 from dotenv import load_dotenv  # installed in step 1
+from kombu import Queue
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / ".env")
@@ -147,6 +149,40 @@ CELERY_RESULT_SERIALIZER = 'json' # Serialize results as JSON
 CELERY_TIMEZONE = 'UTC' # Use UTC timezone for Celery tasks
 CELERY_TASK_TRACK_STARTED = True # Track task progress
 CELERY_TASK_CREATE_MISSING_QUEUES = True # Automatically create queues
+# Priority lanes (see resume_processor/scheduling.py). A worker started without -Q
+# consumes both queues; in production run at least one worker with `-Q interactive`
+# so JD processing never waits behind bulk resume work, e.g.
+#   celery -A backend worker -Q interactive -c 2
+#   celery -A backend worker -Q bulk,interactive
+CELERY_TASK_DEFAULT_QUEUE = 'interactive'
+# Each lane is bound by its own name, so a task routed to one queue never lands in the other
+CELERY_TASK_QUEUES = [
+    Queue('interactive', routing_key='interactive'),
+    Queue('bulk', routing_key='bulk'),
+]
+CELERY_TASK_ROUTES = {
+    'resume_processor.tasks.process_job_requirement_pdf': {'queue': 'interactive'},
+    'resume_processor.tasks.finalize_resume_batch': {'queue': 'interactive'},
+    'resume_processor.tasks.requeue_stalled_batches': {'queue': 'interactive'},
+    'resume_processor.tasks.process_resume_batch_zip': {'queue': 'bulk'},
+    'resume_processor.tasks.process_resume_chunk': {'queue': 'bulk'},
+    'resume_processor.tasks.rerank_resume_batch': {'queue': 'bulk'},
+}
+# Message priorities within a queue (0 = served first); prefetching only one message
+# at a time keeps a worker from holding on to low-priority work
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'queue_order_strategy': 'priority',
+}
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Run `celery -A backend beat` alongside the workers for these periodic tasks
+CELERY_BEAT_SCHEDULE = {
+    'requeue-stalled-resume-batches': {
+        'task': 'resume_processor.tasks.requeue_stalled_batches',
+        'schedule': 300.0,
+    },
+}
 
 
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
@@ -154,6 +190,110 @@ GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL", "https://api.groq.com/openai/v1"
 GROQ_MODEL_NAME = os.environ.get("GROQ_MODEL_NAME", "llama-3.1-8b-instant")
 MIN_TEXT_LENGTH_FOR_LLM = int(os.environ.get("MIN_TEXT_LENGTH_FOR_LLM", "50"))
 
+# LLM admission control; 0 disables a limit. Defaults match Groq's free tier for
+# llama-3.1-8b-instant. The per-minute budgets are shared by all worker processes through
+# LLM_RATE_LIMIT_REDIS_URL; with it empty every process gets the full budgets for itself.
+# LLM_MAX_IN_FLIGHT is per worker process.
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get("LLM_REQUESTS_PER_MINUTE", "30"))
+LLM_TOKENS_PER_MINUTE = int(os.environ.get("LLM_TOKENS_PER_MINUTE", "6000"))
+LLM_MAX_IN_FLIGHT = int(os.environ.get("LLM_MAX_IN_FLIGHT", "8"))
+LLM_RATE_LIMIT_REDIS_URL = os.environ.get("LLM_RATE_LIMIT_REDIS_URL", CELERY_BROKER_URL)
+# Completion size assumed when estimating a request's token cost up front
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.environ.get("LLM_EXPECTED_OUTPUT_TOKENS", "400"))
+# Timeout for a single LLM request, and the total time (requests + retry backoff) one resume may take
+LLM_ATTEMPT_TIMEOUT = float(os.environ.get("LLM_ATTEMPT_TIMEOUT", "60"))
+LLM_RESUME_DEADLINE_SECONDS = float(os.environ.get("LLM_RESUME_DEADLINE_SECONDS", "300"))
+# Connection pool of the LLM client (one per worker process, living as long as its event
+# loop, see resume_processor/runtime.py). Idle connections are kept open for
+# LLM_HTTP_KEEPALIVE_SECONDS and reused by later tasks; 0 connections means no limit
+LLM_HTTP_MAX_CONNECTIONS = int(os.environ.get("LLM_HTTP_MAX_CONNECTIONS", str(LLM_MAX_IN_FLIGHT)))
+LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", str(LLM_MAX_IN_FLIGHT or 20)))
+LLM_HTTP_KEEPALIVE_SECONDS = float(os.environ.get("LLM_HTTP_KEEPALIVE_SECONDS", "60"))
+LLM_HTTP_CONNECT_TIMEOUT = float(os.environ.get("LLM_HTTP_CONNECT_TIMEOUT", "10"))
+
+# Resume batches are fanned out to Celery as one task per chunk of this many resumes
+RESUME_TASK_CHUNK_SIZE = int(os.environ.get("RESUME_TASK_CHUNK_SIZE", "10"))
+# Fair sharing of bulk capacity between users: every this many resumes a user already
+# has queued, their next chunks drop one priority step. Weights (by username, default 1)
+# let a user's work sink more slowly, e.g. FAIR_SHARE_USER_WEIGHTS='{"hr-team": 2}'
+FAIR_SHARE_RESUMES_PER_PRIORITY_STEP = int(os.environ.get("FAIR_SHARE_RESUMES_PER_PRIORITY_STEP", "50"))
+FAIR_SHARE_USER_WEIGHTS = json.loads(os.environ.get("FAIR_SHARE_USER_WEIGHTS", "{}"))
+# Ranked resumes are stored with one bulk upsert (and transaction) per this many results;
+# a chunk task buffers finished resumes for at most RANKED_RESUME_FLUSH_SECONDS before writing
+RANKED_RESUME_WRITE_BATCH_SIZE = int(os.environ.get("RANKED_RESUME_WRITE_BATCH_SIZE", "200"))
+RANKED_RESUME_FLUSH_SECONDS = float(os.environ.get("RANKED_RESUME_FLUSH_SECONDS", "2"))
+# Largest N accepted by the ranked results ?top=N mode
+RANKED_RESULTS_MAX_TOP = int(os.environ.get("RANKED_RESULTS_MAX_TOP", "500"))
+# Rows fetched from the database (and written to the response) per chunk in ranked result exports
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", "500"))
+# Redis used to push live batch progress to the dashboard (Server-Sent Events); empty disables it
+BATCH_EVENTS_REDIS_URL = os.environ.get("BATCH_EVENTS_REDIS_URL", CELERY_BROKER_URL)
+# Seconds between keep-alive comments on an idle event stream
+BATCH_EVENTS_HEARTBEAT_SECONDS = float(os.environ.get("BATCH_EVENTS_HEARTBEAT_SECONDS", "15"))
+# Lifetime of the token the dashboard opens an event stream with (see resume_processor.events)
+EVENT_STREAM_TOKEN_MAX_AGE_SECONDS = int(os.environ.get("EVENT_STREAM_TOKEN_MAX_AGE_SECONDS", "60"))
+# Prometheus-style metrics at /api/resume-processor/metrics/. Every process adds its numbers
+# to Redis every METRICS_FLUSH_SECONDS (and after each task) so the endpoint shows all
+# workers; an empty METRICS_REDIS_URL shows the web process only. Scrapes must send
+# "Authorization: Bearer <METRICS_AUTH_TOKEN>"; while it is empty, scraping is refused
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+METRICS_REDIS_URL = os.environ.get("METRICS_REDIS_URL", CELERY_BROKER_URL)
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+METRICS_AUTH_TOKEN = os.environ.get("METRICS_AUTH_TOKEN", "")
+# Pipeline logs (see resume_processor/logs.py): one line per record, "json" or "text", written
+# to stdout by a background thread. Only LOG_SUCCESS_SAMPLE_RATE of resumes log their success
+# path; failures, warnings and resumes slower than LOG_SLOW_RESUME_SECONDS are always logged
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+LOG_SUCCESS_SAMPLE_RATE = float(os.environ.get("LOG_SUCCESS_SAMPLE_RATE", "0.1"))
+LOG_SLOW_RESUME_SECONDS = float(os.environ.get("LOG_SLOW_RESUME_SECONDS", "60"))
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "resume_context": {"()": "resume_processor.logs.ResumeContextFilter"},
+    },
+    "formatters": {
+        "json": {"()": "resume_processor.logs.JsonFormatter"},
+        "text": {"()": "resume_processor.logs.KeyValueFormatter"},
+    },
+    "handlers": {
+        "pipeline": {
+            "()": "resume_processor.logs.NonBlockingStreamHandler",
+            "filters": ["resume_context"],
+            "formatter": LOG_FORMAT,
+        },
+    },
+    "loggers": {
+        "resume_processor": {"handlers": ["pipeline"], "level": LOG_LEVEL, "propagate": False},
+    },
+}
+# Running batch and chunk tasks record a heartbeat every BATCH_HEARTBEAT_SECONDS. A batch whose
+# task has not beaten for BATCH_STALL_TIMEOUT_SECONDS (and no other task of it is still running)
+# is considered stalled and requeued, at most BATCH_MAX_REQUEUES times
+BATCH_HEARTBEAT_SECONDS = int(os.environ.get("BATCH_HEARTBEAT_SECONDS", "60"))
+BATCH_STALL_TIMEOUT_SECONDS = int(os.environ.get("BATCH_STALL_TIMEOUT_SECONDS", "900"))
+BATCH_MAX_REQUEUES = int(os.environ.get("BATCH_MAX_REQUEUES", "3"))
+
+# Local BM25 prefilter: only the best PREFILTER_TOP_K resumes of a batch, and/or those
+# scoring at least PREFILTER_MIN_SCORE (0-100), are sent to the LLM. 0 disables each rule.
+PREFILTER_TOP_K = int(os.environ.get("PREFILTER_TOP_K", "0"))
+PREFILTER_MIN_SCORE = float(os.environ.get("PREFILTER_MIN_SCORE", "0"))
+
+# Local cache of LLM responses (see resume_processor.llm_cache)
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "50000"))
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+# Each process trims expired and excess entries once per this many stores
+LLM_CACHE_EVICTION_INTERVAL = int(os.environ.get("LLM_CACHE_EVICTION_INTERVAL", "100"))
+
+# Size of the process pool used to parse resume PDFs (CPU bound) alongside LLM calls
+PDF_EXTRACTION_WORKERS = int(os.environ.get("PDF_EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+# How many resume PDFs from an uploaded ZIP may be held in memory at once while being parsed
+ZIP_MAX_MEMBERS_IN_MEMORY = int(os.environ.get("ZIP_MAX_MEMBERS_IN_MEMORY", str(2 * PDF_EXTRACTION_WORKERS)))
+# Resumes larger than this (uncompressed) are rejected instead of being read into memory
+MAX_RESUME_PDF_SIZE = int(os.environ.get("MAX_RESUME_PDF_SIZE", str(15 * 1024 * 1024)))
+
 if GROQ_API_KEY:
     os.environ.setdefault("OPENAI_API_KEY", GROQ_API_KEY)
 
@@ -1,6 +1,28 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ResumeProcessorConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "resume_processor"
+
+    def ready(self):
+        from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+        from .runtime import start_async_runtime, stop_async_runtime
+
+        # Each worker process keeps one event loop (and LLM connection pool) for all of
+        # its tasks; worker_shutdown covers the solo and threads pools, which have no child processes
+        worker_process_init.connect(start_async_runtime, weak=False)
+        worker_process_shutdown.connect(stop_async_runtime, weak=False)
+        worker_shutdown.connect(stop_async_runtime, weak=False)
+
+        if settings.METRICS_ENABLED:
+            from celery.signals import task_postrun
+            from .instrumentation import add_stage_recorder
+            from .metrics import flush_metrics, record_stage_metric
+
+            # Pipeline stage timings feed the metrics histograms, and each worker
+            # process sends its metrics to Redis after every task
+            add_stage_recorder(record_stage_metric)
+            task_postrun.connect(flush_metrics, weak=False)
+            worker_process_shutdown.connect(flush_metrics, weak=False)
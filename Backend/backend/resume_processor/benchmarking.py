@@ -0,0 +1,231 @@
+# backend/resume_processor/benchmarking.py
+import io
+import os
+import sys
+import json
+import random
+import zipfile
+import platform
+import resource
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+
+# Shared helpers for the benchmark management commands: synthetic resume PDFs,
+# timing summaries, memory readings, and JSON reports that can be compared against a saved
+# baseline so regressions show up between releases.
+#
+# A report's "metrics" maps a metric name to {"value", "unit", "better"}, where
+# better is "lower" or "higher"; compare_reports only looks at those.
+
+SKILLS = [
+    'Python', 'Django', 'Celery', 'PostgreSQL', 'Redis', 'Docker', 'Kubernetes', 'AWS', 'React', 'TypeScript',
+    'Java', 'Spring Boot', 'SQL', 'Pandas', 'Machine Learning', 'Go', 'CI/CD', 'REST APIs', 'Terraform', 'Kafka',
+]
+FILLER_WORDS = (
+    'designed built shipped maintained services platform team customers latency reliability migration '
+    'pipeline data product features testing monitoring deployment architecture performance scale'
+).split()
+
+
+def percentile(values, pct):
+    """
+    Linear-interpolated percentile (0-100) of a list of numbers; None if empty.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values):
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "total": round(sum(values), 9),
+        "mean": round(sum(values) / len(values), 9),
+        "p50": round(percentile(values, 50), 9),
+        "p95": round(percentile(values, 95), 9),
+        "p99": round(percentile(values, 99), 9),
+        "max": round(max(values), 9),
+    }
+
+
+def median(values):
+    return percentile(values, 50)
+
+
+def metric(value, unit, better="lower"):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def current_rss_mb():
+    """
+    Resident set size of this process right now (Linux only, else None).
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20, 1)
+
+
+def peak_rss_mb(children=False):
+    """
+    Peak resident set size of this process, or of its largest finished child process.
+    """
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    divisor = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+    return round(usage.ru_maxrss / divisor, 1)
+
+
+def environment_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def new_report(benchmark, label=None, config=None):
+    return {
+        "benchmark": benchmark,
+        "label": label,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment_info(),
+        "config": config or {},
+        "metrics": {},
+    }
+
+
+def write_report(report, path):
+    with open(path, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=2, default=str)
+        report_file.write("\n")
+
+
+def load_report(path):
+    with open(path, encoding="utf-8") as report_file:
+        return json.load(report_file)
+
+
+def compare_reports(current, baseline, threshold=0.1):
+    """
+    Compares the metrics both reports have. Returns rows of
+    (name, baseline_value, current_value, relative_change, regressed), where a
+    metric regressed if it got worse by more than `threshold` (0.1 = 10%).
+    """
+    rows = []
+    for name, current_metric in current.get("metrics", {}).items():
+        baseline_metric = baseline.get("metrics", {}).get(name)
+        if not baseline_metric:
+            continue
+        old, new = baseline_metric.get("value"), current_metric.get("value")
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+            continue
+        change = (new - old) / old if old else 0.0
+        worse = -change if current_metric.get("better") == "higher" else change
+        rows.append((name, old, new, change, worse > threshold))
+    return rows
+
+
+def format_comparison(rows):
+    lines = [f"{'metric':<44} {'baseline':>12} {'current':>12} {'change':>8}"]
+    for name, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        lines.append(f"{name:<44} {old:>12.4g} {new:>12.4g} {change:>+8.1%}{flag}")
+    return "\n".join(lines)
+
+
+class StageCollector:
+    """
+    A stage recorder (see instrumentation.add_stage_recorder) that keeps every
+    timing, plus when each group of results was persisted.
+    """
+    def __init__(self, clock):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.durations = defaultdict(list)
+        self.items = defaultdict(int)
+        self.persisted_at = []
+
+    def __call__(self, stage, seconds, items):
+        with self._lock:
+            self.durations[stage].append(seconds)
+            self.items[stage] += items
+            if stage == "persist":
+                self.persisted_at.append((self._clock(), items))
+
+    def result_times(self, started_at):
+        """
+        Seconds from `started_at` until each individual result was stored.
+        """
+        times = []
+        for persisted_at, items in self.persisted_at:
+            times.extend([persisted_at - started_at] * items)
+        return times
+
+    def summary(self):
+        return {
+            stage: {**summarize(durations), "items": self.items[stage]}
+            for stage, durations in sorted(self.durations.items())
+        }
+
+
+def build_pdf(text, pages):
+    """
+    A text PDF spread over `pages` pages. Without metadata and a random file ID
+    the same text always gives the same bytes.
+    """
+    import fitz  # PyMuPDF
+
+    document = fitz.open()
+    document.set_metadata({})
+    lines = text.split('\n')
+    lines_per_page = max(1, -(-len(lines) // pages))
+    for start in range(0, len(lines), lines_per_page):
+        page = document.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 560, 800), '\n'.join(lines[start:start + lines_per_page]), fontsize=9)
+    data = document.tobytes(no_new_id=True)
+    document.close()
+    return data
+
+
+def synthetic_resume_text(index, words, rng):
+    skills = rng.sample(SKILLS, 6)
+    lines = [
+        f"Candidate {index}",
+        f"candidate{index}@example.com | +1 555 {rng.randint(1000000, 9999999)}",
+        f"Skills: {', '.join(skills)}",
+        f"Experience: {rng.randint(1, 15)} years",
+    ]
+    line = []
+    for _ in range(words):
+        line.append(rng.choice(FILLER_WORDS + skills))
+        if len(line) == 14:
+            lines.append(' '.join(line))
+            line = []
+    if line:
+        lines.append(' '.join(line))
+    return '\n'.join(lines)
+
+
+def build_resume_zip(count, words, pages, seed):
+    """
+    Returns the bytes of a ZIP with `count` synthetic resume PDFs; the same
+    arguments always give the same bytes.
+    """
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for index in range(count):
+            member = zipfile.ZipInfo(f"resumes/candidate_{index:05d}.pdf", date_time=(2020, 1, 1, 0, 0, 0))
+            member.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(member, build_pdf(synthetic_resume_text(index, words, rng), pages))
+    return buffer.getvalue()
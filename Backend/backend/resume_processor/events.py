@@ -0,0 +1,146 @@
+# backend/resume_processor/events.py
+import json
+import time
+import logging
+
+from django.conf import settings
+from django.core import signing
+
+from .models import ResumeBatch
+
+# Live progress for the dashboard. The Celery tasks publish small JSON events on
+# a Redis pub/sub channel per batch / job requirement, and the event stream views
+# relay them to the browser as Server-Sent Events. Publishing is best effort:
+# a missing or unreachable Redis never fails a task, the dashboard then simply
+# falls back to polling.
+
+logger = logging.getLogger(__name__)
+
+BATCH_FINISHED_STATUSES = ('completed', 'failed')
+JD_FINISHED_STATUSES = ('processed_jd', 'failed_jd')
+
+# After a failed publish, further events are dropped for this many seconds instead
+# of every resume waiting on another connection attempt
+PUBLISH_RETRY_AFTER_SECONDS = 30
+
+_redis_client = None
+_publish_paused_until = 0.0
+
+
+def events_enabled():
+    return bool(settings.BATCH_EVENTS_REDIS_URL)
+
+
+def batch_channel(resume_batch_id):
+    return f"resume_processor:batch:{resume_batch_id}"
+
+
+def job_requirement_channel(job_requirement_id):
+    return f"resume_processor:requirement:{job_requirement_id}"
+
+
+# Salt of the signed stream tokens, so no other signed value of the project is accepted as one
+STREAM_TOKEN_SALT = "resume_processor.events.stream"
+
+
+def create_stream_token(user_id, channel):
+    """
+    A token that opens the event stream of `channel` for the user, and nothing
+    else, within EVENT_STREAM_TOKEN_MAX_AGE_SECONDS. EventSource cannot send
+    headers, so it is what goes in the stream URL (and in access logs) instead
+    of the user's JWT.
+    """
+    return signing.dumps({'user': user_id, 'channel': channel}, salt=STREAM_TOKEN_SALT, compress=True)
+
+
+def read_stream_token(token, channel):
+    """
+    Returns the id of the user `token` was issued to, or None if it is invalid,
+    has expired or belongs to another stream.
+    """
+    try:
+        payload = signing.loads(token, salt=STREAM_TOKEN_SALT, max_age=settings.EVENT_STREAM_TOKEN_MAX_AGE_SECONDS)
+    except signing.BadSignature:  # Includes SignatureExpired
+        return None
+    return payload.get('user') if payload.get('channel') == channel else None
+
+
+def get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(
+            settings.BATCH_EVENTS_REDIS_URL,
+            socket_connect_timeout=1,
+            socket_timeout=1,
+        )
+    return _redis_client
+
+
+def publish_event(channel, event, data):
+    global _publish_paused_until
+    if not events_enabled() or time.monotonic() < _publish_paused_until:
+        return
+    try:
+        get_redis_client().publish(channel, json.dumps({'event': event, 'data': data}, default=str))
+    except Exception as e:
+        _publish_paused_until = time.monotonic() + PUBLISH_RETRY_AFTER_SECONDS
+        logger.warning("Could not publish '%s' event on %s, pausing live updates: %s", event, channel, e)
+
+
+def batch_progress(resume_batch):
+    return {
+        'id': resume_batch.id,
+        'status': resume_batch.status,
+        'total_count': resume_batch.total_count,
+        'done_count': resume_batch.done_count,
+        'failed_count': resume_batch.failed_count,
+        'eta_seconds': resume_batch.eta_seconds,
+    }
+
+
+def candidate_summary(result):
+    return {
+        'file_name': result.get('file_name'),
+        'status': result.get('status'),
+        'candidate_name': result.get('candidate_name', 'N/A'),
+        'candidate_email': result.get('candidate_email', 'N/A'),
+        'compatibility_score': result.get('compatibility_score', 0),
+    }
+
+
+def publish_batch_progress(resume_batch_id):
+    """
+    Publishes the batch's current status and counters, read back from the database
+    so that concurrent chunk tasks always publish consistent totals.
+    """
+    if not events_enabled():
+        return
+    resume_batch = ResumeBatch.objects.filter(id=resume_batch_id).first()
+    if resume_batch is not None:
+        publish_event(batch_channel(resume_batch_id), 'progress', batch_progress(resume_batch))
+
+
+def publish_batch_candidates(resume_batch_id, results):
+    """
+    Publishes newly ranked resumes, followed by the updated progress counters.
+    """
+    if not events_enabled():
+        return
+    for result in results:
+        publish_event(batch_channel(resume_batch_id), 'candidate', candidate_summary(result))
+    publish_batch_progress(resume_batch_id)
+
+
+def job_requirement_progress(job_requirement):
+    return {
+        'id': job_requirement.id,
+        'status': job_requirement.status,
+        'title': job_requirement.title,
+    }
+
+
+def publish_job_requirement_status(job_requirement):
+    publish_event(
+        job_requirement_channel(job_requirement.id), 'progress', job_requirement_progress(job_requirement)
+    )
@@ -0,0 +1,103 @@
+# backend/resume_processor/exports.py
+import io
+import csv
+import json
+
+from django.conf import settings
+
+# Streaming exports of ranked results. Rows are read with QuerySet.iterator(), so
+# only one chunk of EXPORT_CHUNK_SIZE rows is in memory at a time (a server-side
+# cursor on PostgreSQL), and are written out in chunks of the same size so a large
+# export is not sent as tens of thousands of tiny writes.
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+EXPORT_FIELDS = [
+    'id', 'resume_batch_id', 'file_name', 'status',
+    'candidate_name', 'candidate_email', 'compatibility_score', 'prefilter_score',
+    'extracted_info', 'ranking_analysis',
+]
+
+# extracted_info / ranking_analysis keys flattened into CSV columns
+CSV_EXTRACTED_INFO_KEYS = ['Phone', 'Location', 'YearsOfExperience', 'JobTitles', 'Companies', 'Skills', 'Degree']
+CSV_RANKING_ANALYSIS_KEYS = ['Strengths']
+
+# A spreadsheet runs a cell starting with one of these as a formula. Resume text is
+# untrusted, so such cells are prefixed with a quote to be shown as plain text.
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def flatten_value(value):
+    if isinstance(value, list):
+        return '; '.join(str(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return '' if value is None else value
+
+
+def csv_cell(value):
+    value = flatten_value(value)
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_header():
+    return (
+        [field for field in EXPORT_FIELDS if field not in ('extracted_info', 'ranking_analysis')]
+        + CSV_EXTRACTED_INFO_KEYS
+        + CSV_RANKING_ANALYSIS_KEYS
+    )
+
+
+def csv_row(row):
+    extracted_info = row['extracted_info'] if isinstance(row['extracted_info'], dict) else {}
+    ranking_analysis = row['ranking_analysis'] if isinstance(row['ranking_analysis'], dict) else {}
+    return (
+        [csv_cell(row[field]) for field in EXPORT_FIELDS if field not in ('extracted_info', 'ranking_analysis')]
+        + [csv_cell(extracted_info.get(key)) for key in CSV_EXTRACTED_INFO_KEYS]
+        + [csv_cell(ranking_analysis.get(key)) for key in CSV_RANKING_ANALYSIS_KEYS]
+    )
+
+
+def iter_export_rows(queryset):
+    return queryset.values(*EXPORT_FIELDS).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def stream_csv(queryset):
+    """
+    Yields the CSV export of the queryset, one chunk of rows at a time.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(csv_header())
+    for count, row in enumerate(iter_export_rows(queryset), start=1):
+        writer.writerow(csv_row(row))
+        if count % settings.EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_ndjson(queryset):
+    """
+    Yields one JSON object per line, including the full extracted_info and ranking_analysis.
+    """
+    lines = []
+    for row in iter_export_rows(queryset):
+        lines.append(json.dumps(row, default=str))
+        if len(lines) >= settings.EXPORT_CHUNK_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def stream_export(queryset, export_format):
+    if export_format == 'csv':
+        return stream_csv(queryset)
+    return stream_ndjson(queryset)
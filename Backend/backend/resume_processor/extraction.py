@@ -0,0 +1,194 @@
+# backend/resume_processor/extraction.py
+import os
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .instrumentation import record_stage, stage_timer
+from .logs import reset_log_context
+
+# This module is deliberately kept free of Django imports so that it can be
+# loaded cheaply inside the extraction worker processes. PyMuPDF itself is only
+# imported when a PDF is parsed, so web processes that import the tasks never load it.
+
+logger = logging.getLogger(__name__)
+
+_extraction_executor = None
+
+
+def list_resume_members(zip_ref):
+    """
+    Returns the ZipInfo entries of the resume PDFs in an open archive, without
+    reading any of them.
+    """
+    return [
+        info for info in zip_ref.infolist()
+        if not info.is_dir()
+        and info.filename.lower().endswith('.pdf')
+        and not info.filename.startswith('__MACOSX/')
+    ]
+
+
+def read_resume_member(zip_ref, member, max_member_size=None):
+    """
+    Reads one archive member into memory. Returns None for members whose
+    uncompressed size exceeds max_member_size, so a single oversized (or
+    maliciously compressed) file cannot blow up the worker's memory.
+    """
+    if max_member_size and member.file_size > max_member_size:
+        logger.warning(
+            "Skipping %s: %d bytes exceeds the %d byte limit", member.filename, member.file_size, max_member_size
+        )
+        return None
+    with stage_timer("unzip"):
+        return zip_ref.read(member)
+
+
+def extract_text_from_pdf(pdf_path):
+    """
+    Extracts text from a PDF given either a file path or the raw PDF bytes.
+    Bytes are opened as an in-memory stream, without touching the disk.
+    """
+    import fitz  # PyMuPDF
+
+    text_content = ""
+    try:
+        if isinstance(pdf_path, (bytes, bytearray, memoryview)):
+            pdf_stream, pdf_path = pdf_path, "<in-memory PDF>"
+            doc = fitz.open(stream=pdf_stream, filetype="pdf")
+        else:
+            doc = fitz.open(pdf_path)
+        with doc:
+            for page in doc:
+                page_text = page.get_text()
+                if page_text:
+                    text_content += page_text + "\n"
+        return text_content.strip()
+    except Exception as e:
+        logger.warning("Error extracting text from %s: %s", pdf_path, e)
+        return None
+
+
+def timed_extract_text_from_pdf(pdf_path):
+    """
+    Runs extract_text_from_pdf and returns (text, elapsed_seconds).
+    Top-level so it can be pickled into the extraction process pool.
+    """
+    if pdf_path is None:
+        return None, 0.0
+    started = time.perf_counter()
+    text = extract_text_from_pdf(pdf_path)
+    return text, time.perf_counter() - started
+
+
+def _in_daemon_process():
+    if multiprocessing.current_process().daemon:
+        return True
+    try:
+        import billiard  # Celery's multiprocessing fork
+    except ImportError:
+        return False
+    return bool(billiard.current_process().daemon)
+
+
+def pool_start_method(available_methods):
+    """
+    How the extraction workers are started. By the time the pool starts the
+    parent runs other threads (the runtime event loop, the log listener, the
+    metrics flusher), and a forked child can deadlock on a lock one of them
+    held at fork time, so the workers start from a fresh process instead.
+    """
+    return "forkserver" if "forkserver" in available_methods else "spawn"
+
+
+class BilliardPoolExecutor(Executor):
+    """
+    concurrent.futures interface to a billiard process pool. Unlike
+    multiprocessing, billiard (Celery's fork of it) may start processes from
+    the daemonic prefork children Celery runs tasks in.
+    """
+    def __init__(self, max_workers, initializer=None):
+        import billiard
+        from billiard.pool import Pool
+
+        context = billiard.get_context(pool_start_method(billiard.get_all_start_methods()))
+        self._pool = Pool(max_workers, initializer=initializer, context=context)
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        def set_result(result):
+            if not future.done():
+                future.set_result(result)
+
+        def set_exception(error_info):
+            # billiard reports failures as an ExceptionInfo wrapping the exception
+            if not future.done():
+                future.set_exception(getattr(error_info, "exception", error_info))
+
+        self._pool.apply_async(fn, args, kwargs, callback=set_result, error_callback=set_exception)
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        if cancel_futures:
+            self._pool.terminate()
+        else:
+            self._pool.close()
+        if wait:
+            self._pool.join()
+
+
+def get_extraction_executor(max_workers=None):
+    """
+    Returns the shared executor used for CPU-bound PDF parsing.
+
+    A process pool is used so that several PDFs are parsed in parallel and the
+    event loop stays free to send LLM requests. Celery's prefork children are
+    daemonic, which multiprocessing does not allow to have children, so there
+    the pool is a billiard one. Without billiard the fallback is a single
+    thread: PyMuPDF does not support being used from several threads at once.
+    """
+    global _extraction_executor
+    if _extraction_executor is not None:
+        return _extraction_executor
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, int(max_workers))
+
+    if _in_daemon_process():
+        try:
+            _extraction_executor = BilliardPoolExecutor(max_workers, initializer=reset_log_context)
+        except ImportError:
+            _extraction_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-extract")
+    else:
+        _extraction_executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context(pool_start_method(multiprocessing.get_all_start_methods())),
+            initializer=reset_log_context,
+        )
+    return _extraction_executor
+
+
+def shutdown_extraction_executor():
+    global _extraction_executor
+    if _extraction_executor is not None:
+        _extraction_executor.shutdown(wait=True, cancel_futures=True)
+        _extraction_executor = None
+
+
+async def extract_text_async(pdf_path, max_workers=None):
+    """
+    Extracts text from a PDF on the extraction pool without blocking the event loop.
+    Returns (text, elapsed_seconds) where elapsed covers only the parsing itself.
+    The "extract" stage is timed in the worker too, so it leaves out the time
+    spent waiting for a free worker.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_extraction_executor(max_workers)
+    text, elapsed_seconds = await loop.run_in_executor(executor, timed_extract_text_from_pdf, pdf_path)
+    record_stage("extract", elapsed_seconds)
+    return text, elapsed_seconds
@@ -0,0 +1,55 @@
+# backend/resume_processor/instrumentation.py
+import time
+import logging
+import contextlib
+
+# Per-stage timing hooks for the resume pipeline. The pipeline marks its stages
+# with stage_timer(); nothing is measured unless a recorder has been added, so
+# the hooks cost one list check in normal operation. Recorders are called with
+# (stage, seconds, items) as each timed block ends, on whichever thread or
+# event loop ran it, and must be cheap and thread-safe.
+#
+# Stages:
+#   unzip    reading one resume member out of the archive
+#   extract  extracting the text of one resume (including the wait for the pool)
+#   llm_wait waiting for the LLM scheduler to admit one request
+#   llm      one chat completion request
+#   persist  writing one group of results (items = number of results)
+#
+# Deliberately free of Django imports, like extraction.py.
+
+logger = logging.getLogger(__name__)
+
+_recorders = []
+
+
+def add_stage_recorder(recorder):
+    _recorders.append(recorder)
+
+
+def remove_stage_recorder(recorder):
+    if recorder in _recorders:
+        _recorders.remove(recorder)
+
+
+def record_stage(stage, seconds, items=1):
+    for recorder in list(_recorders):
+        try:
+            recorder(stage, seconds, items)
+        except Exception as e:
+            logger.warning("Stage recorder failed for '%s': %s", stage, e)
+
+
+@contextlib.contextmanager
+def stage_timer(stage, items=1):
+    """
+    Times the block and reports it to the stage recorders, also when it raises.
+    """
+    if not _recorders:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started, items)
@@ -0,0 +1,123 @@
+# backend/resume_processor/llm_cache.py
+import hashlib
+import contextlib
+import contextvars
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import LLMResponseCache
+
+_bypass = contextvars.ContextVar("llm_cache_bypass", default=False)
+_lookup_counts = contextvars.ContextVar("llm_cache_lookup_counts", default=None)
+
+# Stores made by this process since the cache was last trimmed
+_stores_since_eviction = 0
+
+
+@contextlib.contextmanager
+def bypass_llm_cache():
+    """
+    Within this block (and in asyncio tasks started from it) LLM responses are
+    neither read from nor written to the cache.
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+@contextlib.contextmanager
+def count_cache_lookups():
+    """
+    Yields a {"hits", "misses"} dict counting the cache lookups made within this
+    block (and in asyncio tasks started from it), and no others.
+    """
+    counts = {"hits": 0, "misses": 0}
+    token = _lookup_counts.set(counts)
+    try:
+        yield counts
+    finally:
+        _lookup_counts.reset(token)
+
+
+def _count_lookup(key):
+    counts = _lookup_counts.get()
+    if counts is not None:
+        counts[key] += 1
+
+
+def cache_enabled():
+    return settings.LLM_CACHE_ENABLED and not _bypass.get()
+
+
+def hash_prompt(prompt_text):
+    return hashlib.sha256(prompt_text.encode("utf-8")).hexdigest()
+
+
+async def get_cached_response(model_name, temperature, prompt_text):
+    """
+    Returns the cached response for this prompt, or None on a miss.
+    Expired entries count as misses and are removed.
+    """
+    prompt_hash = hash_prompt(prompt_text)
+    entry = await LLMResponseCache.objects.filter(
+        model_name=model_name, temperature=temperature, prompt_hash=prompt_hash
+    ).only("id", "response", "created_at").afirst()
+
+    now = timezone.now()
+    if entry is not None and entry.created_at < now - timedelta(seconds=settings.LLM_CACHE_TTL_SECONDS):
+        await LLMResponseCache.objects.filter(id=entry.id).adelete()
+        entry = None
+
+    if entry is None:
+        _count_lookup("misses")
+        return None
+
+    _count_lookup("hits")
+    await LLMResponseCache.objects.filter(id=entry.id).aupdate(
+        last_used_at=now, hit_count=F("hit_count") + 1
+    )
+    return entry.response
+
+
+async def store_cached_response(model_name, temperature, prompt_text, response):
+    """
+    Stores a response. Every LLM_CACHE_EVICTION_INTERVAL stores the cache is
+    trimmed (see evict_cached_responses), so a store does not count the table.
+    """
+    global _stores_since_eviction
+    now = timezone.now()
+    await LLMResponseCache.objects.aupdate_or_create(
+        model_name=model_name,
+        temperature=temperature,
+        prompt_hash=hash_prompt(prompt_text),
+        defaults={"response": response, "created_at": now, "last_used_at": now, "hit_count": 0},
+    )
+
+    _stores_since_eviction += 1
+    if _stores_since_eviction >= settings.LLM_CACHE_EVICTION_INTERVAL:
+        _stores_since_eviction = 0
+        await evict_cached_responses()
+
+
+async def evict_cached_responses():
+    """
+    Removes expired entries, then the least recently used ones beyond
+    LLM_CACHE_MAX_ENTRIES. Returns the number of entries removed.
+    """
+    expired_before = timezone.now() - timedelta(seconds=settings.LLM_CACHE_TTL_SECONDS)
+    removed, _ = await LLMResponseCache.objects.filter(created_at__lt=expired_before).adelete()
+
+    excess = await LLMResponseCache.objects.acount() - settings.LLM_CACHE_MAX_ENTRIES
+    if excess > 0:
+        stale_ids = [
+            entry_id async for entry_id in
+            LLMResponseCache.objects.order_by("last_used_at").values_list("id", flat=True)[:excess]
+        ]
+        evicted, _ = await LLMResponseCache.objects.filter(id__in=stale_ids).adelete()
+        removed += evicted
+    return removed
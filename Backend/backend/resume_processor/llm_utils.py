@@ -1,71 +1,506 @@
 # backend/resume_processor/llm_utils.py
 import os
 import json
-import fitz
-import openai
+import time
+import email.utils
+import random
 import asyncio
-import tempfile
-import shutil
+import weakref
+import logging
+import contextlib
 from django.conf import settings # Import Django settings to get GROQ_API_KEY etc.
 
-# Initialize OpenAI client with settings from Django
-client = openai.AsyncOpenAI(
-    api_key=settings.GROQ_API_KEY,
-    base_url=settings.GROQ_BASE_URL
-)
+from .extraction import extract_text_from_pdf, extract_text_async, read_resume_member
+from .instrumentation import record_stage, stage_timer
+from .logs import bind_log_context, get_log_context, sample_success_logs
+from .metrics import LLM_ERRORS, LLM_IN_FLIGHT, LLM_TOKENS
+from .llm_cache import cache_enabled, get_cached_response, hash_prompt, store_cached_response
+from .prefilter import build_prefilter_query, bm25_scores_from_counts, document_term_counts, query_terms, select_resumes
+from .runtime import add_shutdown_callback
+
+# The OpenAI SDK (with pydantic and httpx) is only imported, and the client only
+# created, on the first LLM call: web processes import this module through
+# tasks.py to queue work but never call the LLM themselves.
+# Tasks make their LLM calls on the worker process's long-lived event loop (see
+# runtime.py), so the client's keep-alive connections are reused from task to
+# task; they are closed when the runtime shuts down.
+_llm_client = None
+_llm_client_pid = None
+
+
+def create_llm_client(api_key=None, base_url=None):
+    """
+    Creates an AsyncOpenAI client with the connection pool configured in settings.
+    The key and base URL default to GROQ_API_KEY and GROQ_BASE_URL.
+    """
+    import httpx
+    import openai
+    return openai.AsyncOpenAI(
+        api_key=api_key or settings.GROQ_API_KEY,
+        base_url=base_url or settings.GROQ_BASE_URL,
+        max_retries=0, # Retries are handled by get_llm_response
+        http_client=openai.DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS or None,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_SECONDS,
+            ),
+            timeout=httpx.Timeout(settings.LLM_ATTEMPT_TIMEOUT, connect=settings.LLM_HTTP_CONNECT_TIMEOUT),
+        ),
+    )
+
+
+def get_llm_client():
+    """
+    Returns this process's AsyncOpenAI client, creating it from settings on first use.
+    """
+    global _llm_client, _llm_client_pid
+    if _llm_client is None or _llm_client_pid != os.getpid():
+        _llm_client = create_llm_client()
+        _llm_client_pid = os.getpid()
+        add_shutdown_callback(close_llm_client)
+    return _llm_client
+
+
+def set_llm_client(llm_client):
+    """
+    Replaces the shared client, e.g. with one pointed at a mock server; with
+    None the next call creates a fresh one from settings.
+    """
+    global _llm_client, _llm_client_pid
+    _llm_client, _llm_client_pid = llm_client, os.getpid()
+
+
+async def close_llm_client():
+    """
+    Closes the client's connection pool; the next call creates a new client.
+    """
+    global _llm_client
+    llm_client, _llm_client = _llm_client, None
+    if llm_client is not None and _llm_client_pid == os.getpid():
+        await llm_client.close()
 
 LLM_PROVIDER = "groq_llama3" # As per your original main.py
+LLM_TEMPERATURE = 0.1
 MIN_TEXT_LENGTH_FOR_LLM = settings.MIN_TEXT_LENGTH_FOR_LLM # From settings.py
 
-import fitz  # PyMuPDF
-...
-def extract_text_from_pdf(pdf_path):
-    text_content = ""
-    try:
-        with fitz.open(pdf_path) as doc:
-            for page in doc:
-                page_text = page.get_text()
-                if page_text:
-                    text_content += page_text + "\n"
-        return text_content.strip()
-    except Exception as e:
-        print(f"Error extracting text from {pdf_path}: {e}")
-        return None
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used to estimate prompt size before sending it
+CHARS_PER_TOKEN = 4
 
 
-async def get_llm_response(prompt_text):
+def estimate_tokens(prompt_text):
     """
-    Sends a prompt to the LLM and returns the JSON response.
+    Estimates the tokens a request will consume: the prompt plus the expected completion.
     """
-    response_content = None # Initialize to None
-    try:
-        messages = [{"role": "user", "content": prompt_text}]
-        completion = await client.chat.completions.create(
-            model=settings.GROQ_MODEL_NAME,
-            messages=messages,
-            response_format={"type": "json_object"}, # Ensure JSON response
-            temperature=0.1,
+    return len(prompt_text) // CHARS_PER_TOKEN + 1 + settings.LLM_EXPECTED_OUTPUT_TOKENS
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `capacity_per_minute` per minute.
+    A capacity of 0 disables the limit.
+    """
+
+    def __init__(self, capacity_per_minute):
+        self.capacity = capacity_per_minute
+        self.rate = capacity_per_minute / 60.0
+        self.tokens = float(capacity_per_minute)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount):
+        """
+        Waits until `amount` tokens are available and takes them. Waiters are
+        served in arrival order, so a large request is not starved by small ones.
+        """
+        if not self.capacity:
+            return
+        # A single request larger than the whole bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount):
+        """
+        Takes (or, if negative, gives back) tokens without waiting, e.g. to
+        correct an estimate once the real usage is known.
+        """
+        if not self.capacity:
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+# Takes ARGV[3] tokens from the bucket in KEYS[1] (capacity ARGV[1], refilled at ARGV[2]
+# per second) and returns how many seconds the caller must wait before using them. The
+# balance may go negative: each caller reserves its tokens at once and waits its turn, so
+# requests are served in arrival order across processes. A negative amount gives tokens back.
+_REDIS_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate) - amount
+tokens = math.min(capacity, tokens)
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(math.max(0, -tokens) / rate)
+"""
+
+# After a Redis error the shared buckets are skipped (and the local ones used) for this long
+RATE_LIMIT_REDIS_RETRY_AFTER_SECONDS = 30
+
+
+class RedisTokenBucket:
+    """
+    A TokenBucket kept in Redis, so every worker process draws from the same
+    per-minute budget, the way the provider counts it. If Redis cannot be
+    reached, `fallback` (a local TokenBucket) is used until it is back.
+    """
+
+    def __init__(self, redis_client, key, capacity_per_minute, fallback):
+        self.redis = redis_client
+        self.key = key
+        self.capacity = capacity_per_minute
+        self.rate = capacity_per_minute / 60.0
+        self.fallback = fallback
+        self._script = redis_client.register_script(_REDIS_BUCKET_SCRIPT)
+        self._paused_until = 0.0
+
+    async def _take(self, amount):
+        """
+        Returns the seconds to wait for `amount` tokens, or None if Redis is unavailable.
+        """
+        if time.monotonic() < self._paused_until:
+            return None
+        try:
+            wait = await self._script(keys=[self.key], args=[self.capacity, self.rate, amount])
+            return float(wait)
+        except Exception as e:
+            self._paused_until = time.monotonic() + RATE_LIMIT_REDIS_RETRY_AFTER_SECONDS
+            logger.warning(
+                "Shared LLM rate limit unavailable, using this process's own limit for %ss: %s",
+                RATE_LIMIT_REDIS_RETRY_AFTER_SECONDS, e,
+            )
+            return None
+
+    async def acquire(self, amount):
+        if not self.capacity:
+            return
+        wait = await self._take(min(amount, self.capacity))
+        if wait is None:
+            await self.fallback.acquire(amount)
+        elif wait > 0:
+            await asyncio.sleep(wait)
+
+    async def adjust(self, amount):
+        if not self.capacity or not amount:
+            return
+        if await self._take(amount) is None:
+            self.fallback.adjust(amount)
+
+
+class LLMScheduler:
+    """
+    Admission control for LLM calls. A call waits for an in-flight slot, then
+    for room in the requests-per-minute and tokens-per-minute budgets, so bursts
+    are queued instead of being rejected by the provider with a RateLimitError.
+    With `redis_client`, the per-minute budgets are shared by all processes.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute, max_in_flight, redis_client=None, key_prefix=""):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        if redis_client is not None:
+            self.requests = RedisTokenBucket(
+                redis_client, f"{key_prefix}:requests", requests_per_minute, fallback=self.requests
+            )
+            self.tokens = RedisTokenBucket(redis_client, f"{key_prefix}:tokens", tokens_per_minute, fallback=self.tokens)
+        self.in_flight = asyncio.Semaphore(max_in_flight) if max_in_flight else None
+
+    @contextlib.asynccontextmanager
+    async def slot(self, estimated_tokens):
+        async with self.in_flight or contextlib.nullcontext():
+            await self.requests.acquire(1)
+            await self.tokens.acquire(estimated_tokens)
+            yield
+
+    async def record_usage(self, estimated_tokens, actual_tokens):
+        if not actual_tokens:
+            return
+        if isinstance(self.tokens, RedisTokenBucket):
+            # The shared bucket is corrected with a Redis round trip
+            await self.tokens.adjust(actual_tokens - estimated_tokens)
+        else:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+
+# asyncio primitives (and asyncio Redis connections) belong to the loop they are used on,
+# so keep one scheduler per loop
+_schedulers = weakref.WeakKeyDictionary()
+
+RATE_LIMIT_KEY_PREFIX = "resume_processor:llm_rate"
+
+
+def get_llm_scheduler():
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        redis_client = None
+        if settings.LLM_RATE_LIMIT_REDIS_URL:
+            import redis.asyncio as aioredis
+            try:
+                redis_client = aioredis.Redis.from_url(
+                    settings.LLM_RATE_LIMIT_REDIS_URL, socket_connect_timeout=1, socket_timeout=1
+                )
+            except ValueError as e:
+                logger.warning("LLM_RATE_LIMIT_REDIS_URL is not a Redis URL, limiting per process: %s", e)
+        scheduler = LLMScheduler(
+            requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+            max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+            redis_client=redis_client,
+            # The provider's limits apply per organisation and model
+            key_prefix=f"{RATE_LIMIT_KEY_PREFIX}:{settings.GROQ_MODEL_NAME}",
         )
-        response_content = completion.choices[0].message.content
-        # print(f"DEBUG: Raw LLM Response: {response_content[:1000]}...") # For debugging LLM output
-        return json.loads(response_content)
-    except json.JSONDecodeError as json_e:
-        print(f"JSON Decode Error from LLM: {json_e}")
-        print(f"LLM Raw Response (possibly invalid JSON): {response_content[:500] if response_content else 'None'}...")
-        return None
-    except openai.APIConnectionError as e:
-        print(f"API connection error: {e}")
-        return None
-    except openai.RateLimitError as e:
-        print(f"Rate Limit Exceeded: {e}")
+        _schedulers[loop] = scheduler
+    return scheduler
+
+
+class RetryPolicy:
+    """
+    Retry budget for one class of LLM errors, with full-jitter exponential backoff.
+    """
+
+    def __init__(self, max_attempts, base_delay, max_delay):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+RETRY_POLICIES = {
+    "rate_limit": RetryPolicy(max_attempts=6, base_delay=2.0, max_delay=60.0),
+    "connection": RetryPolicy(max_attempts=4, base_delay=1.0, max_delay=20.0),
+    "server_error": RetryPolicy(max_attempts=4, base_delay=1.0, max_delay=30.0),
+    "invalid_json": RetryPolicy(max_attempts=2, base_delay=0.5, max_delay=2.0),
+}
+
+
+def classify_llm_error(error):
+    """
+    Maps an exception raised while calling the LLM to a RETRY_POLICIES key,
+    or None when retrying cannot help (e.g. a 400 or 401).
+    """
+    import openai
+
+    if isinstance(error, json.JSONDecodeError):
+        return "invalid_json"
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limit"
+    # APITimeoutError is a subclass of APIConnectionError
+    if isinstance(error, openai.APIConnectionError):
+        return "connection"
+    if isinstance(error, openai.APIStatusError) and (error.status_code >= 500 or error.status_code in (408, 409)):
+        return "server_error"
+    return None
+
+
+def get_retry_after(error):
+    """
+    Returns the delay in seconds requested by the provider through the
+    retry-after-ms / Retry-After headers, or None if it did not ask for one.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
         return None
-    except openai.APIStatusError as e:
-        print(f"API status error (Code: {e.status_code}): {e.response.text if hasattr(e.response, 'text') else e.response}")
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+    except ValueError:
+        pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
         return None
-    except Exception as e:
-        print(f"An unexpected error occurred interacting with the LLM: {e}")
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        # HTTP-date form
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
         return None
 
+
+class LLMCallStats:
+    """
+    Bookkeeping shared by every LLM call made on behalf of one resume.
+    `time_budget` is the per-resume deadline in seconds; it covers request time
+    and retry backoff but not time spent queued on the scheduler.
+    """
+
+    def __init__(self, time_budget=None):
+        self.attempts = 0
+        self.retries = 0
+        self.retry_wait_seconds = 0.0
+        self.time_budget = time_budget
+
+    def spend(self, seconds):
+        if self.time_budget is not None:
+            self.time_budget -= seconds
+
+
+async def _request_llm_completion(prompt_text, timeout, stats=None):
+    """
+    Makes a single chat completion request once the scheduler admits it and
+    returns the parsed JSON. Errors are left to the caller's retry loop.
+    The request time, from admission on, is spent from `stats`' time budget.
+    """
+    messages = [{"role": "user", "content": prompt_text}]
+    scheduler = get_llm_scheduler()
+    estimated_tokens = estimate_tokens(prompt_text)
+    wait_started = time.perf_counter()
+    async with scheduler.slot(estimated_tokens):
+        admitted = time.perf_counter()
+        record_stage("llm_wait", admitted - wait_started)
+        LLM_IN_FLIGHT.inc()
+        try:
+            with stage_timer("llm"):
+                completion = await get_llm_client().chat.completions.create(
+                    model=settings.GROQ_MODEL_NAME,
+                    messages=messages,
+                    response_format={"type": "json_object"}, # Ensure JSON response
+                    temperature=LLM_TEMPERATURE,
+                    timeout=timeout,
+                )
+        finally:
+            LLM_IN_FLIGHT.dec()
+            if stats is not None:
+                stats.spend(time.perf_counter() - admitted)
+    if completion.usage:
+        await scheduler.record_usage(estimated_tokens, completion.usage.total_tokens)
+        LLM_TOKENS.observe(completion.usage.prompt_tokens, direction="prompt")
+        LLM_TOKENS.observe(completion.usage.completion_tokens, direction="completion")
+    response_content = completion.choices[0].message.content
+    # print(f"DEBUG: Raw LLM Response: {response_content[:1000]}...") # For debugging LLM output
+    return parse_llm_json(response_content)
+
+
+def parse_llm_json(response_content):
+    """
+    Parses the JSON content of a completion; a JSONDecodeError is left to the retry loop.
+    """
+    try:
+        return json.loads(response_content)
+    except json.JSONDecodeError:
+        logger.warning("LLM response is not valid JSON", extra={"response_excerpt": (response_content or "")[:500]})
+        raise
+
+
+async def get_llm_response(prompt_text, stats=None, use_cache=True):
+    """
+    Sends a prompt to the LLM and returns the JSON response.
+    Responses are served from, and saved to, the LLM response cache unless
+    `use_cache` is False or the cache is bypassed (see llm_cache.bypass_llm_cache).
+    The call waits for capacity on the LLM scheduler before it is sent.
+    Transient failures are retried according to RETRY_POLICIES, honouring the
+    provider's Retry-After header; each attempt is bounded by LLM_ATTEMPT_TIMEOUT
+    and the whole call by the remaining budget in `stats` (an LLMCallStats).
+    Returns None once the error is not retryable or the retries are exhausted.
+    """
+    use_cache = use_cache and cache_enabled()
+    if use_cache:
+        try:
+            cached = await get_cached_response(settings.GROQ_MODEL_NAME, LLM_TEMPERATURE, prompt_text)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            logger.warning("LLM cache lookup failed, calling the LLM instead: %s", e)
+
+    response = await _get_llm_response_with_retries(prompt_text, stats)
+
+    if use_cache and response is not None:
+        try:
+            await store_cached_response(settings.GROQ_MODEL_NAME, LLM_TEMPERATURE, prompt_text, response)
+        except Exception as e:
+            logger.warning("Could not store LLM response in cache: %s", e)
+    return response
+
+
+async def _get_llm_response_with_retries(prompt_text, stats=None):
+    import openai
+
+    if stats is None:
+        stats = LLMCallStats(settings.LLM_RESUME_DEADLINE_SECONDS)
+    attempts_by_class = {}
+
+    while True:
+        remaining = stats.time_budget
+        if remaining is not None and remaining <= 0:
+            logger.warning("LLM call abandoned: per-resume deadline exceeded", extra={"attempts": stats.attempts})
+            return None
+        timeout = settings.LLM_ATTEMPT_TIMEOUT if remaining is None else min(settings.LLM_ATTEMPT_TIMEOUT, remaining)
+
+        stats.attempts += 1
+        try:
+            return await _request_llm_completion(prompt_text, timeout, stats)
+        except Exception as e:
+            last_error = e
+            error_class = classify_llm_error(e)
+            LLM_ERRORS.inc(error_class=error_class or "non_retryable")
+            if isinstance(e, openai.APIStatusError):
+                logger.warning(
+                    "LLM API status error %s: %s", e.status_code,
+                    e.response.text if hasattr(e.response, 'text') else e.response,
+                    extra={"error_class": error_class, "attempt": stats.attempts},
+                )
+            elif isinstance(e, (openai.APIConnectionError, json.JSONDecodeError)):
+                logger.warning("LLM %s error: %s", error_class, e, extra={"error_class": error_class, "attempt": stats.attempts})
+            else:
+                logger.exception("An unexpected error occurred interacting with the LLM: %s", e)
+            if error_class is None:
+                return None
+
+        policy = RETRY_POLICIES[error_class]
+        attempts_by_class[error_class] = attempts_by_class.get(error_class, 0) + 1
+        if attempts_by_class[error_class] >= policy.max_attempts:
+            logger.warning("Giving up after %d attempts (%s)", attempts_by_class[error_class], error_class)
+            return None
+
+        delay = get_retry_after(last_error)
+        if delay is None:
+            delay = policy.backoff(attempts_by_class[error_class])
+        remaining = stats.time_budget
+        if remaining is not None and delay >= remaining:
+            logger.warning("Not retrying (%s): a %.1fs wait would pass the per-resume deadline", error_class, delay)
+            return None
+
+        stats.retries += 1
+        stats.retry_wait_seconds += delay
+        stats.spend(delay)
+        await asyncio.sleep(delay)
+
 async def extract_job_title_from_jd(jd_text):
     """
     Extracts the main Job Title from job description text using LLM.
@@ -79,34 +514,56 @@ Return your response as a single JSON object with a key "JobTitle".
 **Job Description Text:**
 {jd_text}
 """
-    print("Extracting job title from job description...")
+    logger.info("Extracting job title from job description")
     llm_response = await get_llm_response(prompt)
     if llm_response and isinstance(llm_response, dict) and "JobTitle" in llm_response:
         return llm_response["JobTitle"].strip()
     else:
-        print("Warning: Could not extract Job Title from JD PDF. Response was not as expected.")
+        logger.warning("Could not extract Job Title from JD PDF: response was not as expected")
         return None
 
-async def process_resume_with_llm(resume_raw_text, job_description, job_title):
+REQUIREMENTS_PROFILE_KEYS = ("MustHaveSkills", "NiceToHaveSkills", "Seniority", "MinYearsOfExperience", "Domain")
+
+async def extract_requirements_profile(jd_text):
     """
-    Processes a single resume against a job description using LLM for extraction and ranking.
+    Compiles job description text into a compact, structured requirements profile.
+    The profile is stored on the JobRequirement and sent with every resume in
+    place of the full JD text, which keeps the per-resume prompts small.
     """
-    if not resume_raw_text:
+    prompt = f"""
+You are an expert at parsing job descriptions. Condense the following job description
+into a compact requirements profile that can be used to rank candidates.
+Return your response as a single JSON object with exactly these keys:
+"MustHaveSkills": ["Required skills, technologies and qualifications (array of short strings)"],
+"NiceToHaveSkills": ["Preferred but optional skills (array of short strings)"],
+"Seniority": "Expected seniority, e.g. 'Junior', 'Mid', 'Senior', 'Lead' (string)",
+"MinYearsOfExperience": "Minimum years of experience asked for, or '' if not stated (string)",
+"Domain": "Industry or business domain of the role (string)"
+Keep every entry short; do not copy whole sentences from the text.
+**Job Description Text:**
+{jd_text}
+"""
+    logger.info("Compiling requirements profile from job description")
+    llm_response = await get_llm_response(prompt)
+    if llm_response and isinstance(llm_response, dict) and "MustHaveSkills" in llm_response:
+        return {key: llm_response.get(key, "") for key in REQUIREMENTS_PROFILE_KEYS}
+    else:
+        logger.warning("Could not compile a requirements profile from the JD: response was not as expected")
         return None
 
-    combined_prompt = f"""
-You are an expert HR and recruitment assistant. Your task is to:
-1. Extract key candidate information from the provided resume.
-2. Compare the candidate's extracted information and the full resume text against
-the given job description and job title.
-3. Provide a compatibility score and strengths.
-
-Instructions for Output:
-Return your entire response as a single JSON object. The JSON object MUST have two
-top-level keys: "extracted_info" and "ranking_analysis".
+async def analyze_job_description(jd_text):
+    """
+    Runs the job title and requirements profile extraction concurrently.
+    Returns (job_title, requirements_profile); either may be None.
+    """
+    with bind_log_context(stage="jd"):
+        job_title, requirements_profile = await asyncio.gather(
+            extract_job_title_from_jd(jd_text),
+            extract_requirements_profile(jd_text),
+        )
+    return job_title, requirements_profile
 
-**Schema for "extracted_info":**
-{{
+CANDIDATE_PROFILE_SCHEMA = """{
 "Name": "Candidate's full name (string)",
 "Email": "Candidate's email address (string)",
 "Phone": "Candidate's phone number, including country code if present (string)",
@@ -121,67 +578,218 @@ strings)"],
 Science, B.S. Computer Engineering')",
 "GraduationYears": ["List of all graduation years or degree date ranges (array of
 strings, e.g., '2017', '2012-2016')"],
-"EducationalInstitutions": ["List of all universities, colleges, or other educational institutions attended (array of strings)"]
+"EducationalInstitutions": ["List of all universities, colleges, or other educational institutions attended (array of strings)"],
+"Highlights": ["Up to 5 short, specific achievements, projects or responsibilities
+that best show the candidate's level (array of strings)"]
+}"""
 
-}}
+def candidate_profile_version():
+    """
+    Identifies how candidate profiles are extracted: the model and the profile
+    prompt. Stored with each profile, so that changing either one makes stored
+    profiles stale instead of being reused.
+    """
+    return hash_prompt(f"{settings.GROQ_MODEL_NAME}\n{build_candidate_profile_prompt('')}")[:16]
+
+async def get_stored_candidate_profile(resume_raw_text):
+    """
+    Returns the candidate profile already extracted, by the current model and
+    prompt, from a resume with exactly this text (in any batch), or None.
+    Like cached LLM responses, stored profiles are not used while the cache is
+    disabled or bypassed.
+    """
+    if not cache_enabled():
+        return None
+    from .models import ResumeDocument
+    document = await ResumeDocument.objects.filter(
+        content_hash=ResumeDocument.hash_text(resume_raw_text),
+        profile_version=candidate_profile_version(),
+    ).exclude(extracted_info={}).only('extracted_info').afirst()
+    return document.extracted_info if document else None
 
-**Schema for "ranking_analysis":**
+def build_candidate_profile_prompt(resume_raw_text):
+    return f"""
+You are an expert HR and recruitment assistant. Extract the key candidate
+information from the provided resume.
+Return your entire response as a single JSON object with this schema:
+{CANDIDATE_PROFILE_SCHEMA}
+
+**Candidate Resume (RAW TEXT from PDF):**
+{resume_raw_text}
+"""
+
+async def extract_candidate_profile(resume_raw_text, stats=None):
+    """
+    Stage 1: extracts the JD-independent candidate profile (the "extracted_info")
+    from a resume. A profile extracted earlier from identical text is reused, so
+    this runs once per unique resume however many JDs it is ranked against.
+    """
+    if not resume_raw_text:
+        return None
+    try:
+        stored_profile = await get_stored_candidate_profile(resume_raw_text)
+        if stored_profile:
+            return stored_profile
+    except Exception as e:
+        logger.warning("Stored candidate profile lookup failed, extracting it instead: %s", e)
+
+    with bind_log_context(stage="llm_profile"):
+        llm_response = await get_llm_response(build_candidate_profile_prompt(resume_raw_text), stats=stats)
+        if llm_response and isinstance(llm_response, dict):
+            return llm_response
+        logger.warning("Could not extract a candidate profile from the resume: response was not as expected")
+    return None
+
+def build_scoring_prompt(candidate_profile, job_description, job_title, requirements_profile=None):
+    if requirements_profile:
+        job_section = "**Job Requirements Profile:**\n" + json.dumps(requirements_profile, separators=(",", ":"))
+    else:
+        job_section = "**Job Description:**\n" + job_description
+
+    return f"""
+You are an expert HR and recruitment assistant. Compare the candidate profile
+against the given job title and job requirements, and provide a compatibility
+score and strengths.
+Return your entire response as a single JSON object with this schema:
 {{
 "CompatibilityScore": "Integer from 0 to 100, where 100 is a perfect match.
 Score based on direct relevance and depth of matching skills, experience, and
-qualifications from the resume to the job description and job title.
-Prioritize hard technical skills and direct experience mentioned in the job
-description.
+qualifications of the candidate to the job description and job title.
+Prioritize hard technical skills and direct experience required by the job.
 If a candidate is a very strong match, score 90-100. Good match, 70-89. Moderate
 match, 50-69. Low match, 0-49.",
-"Strengths": ["List of 3 to 5 most relevant and specific strengths from the
-resume that clearly align with the job description's requirements. Only list what is
-explicitly supported by the resume text."]
+"Strengths": ["List of 3 to 5 most relevant and specific strengths of the
+candidate that clearly align with the job's requirements. Only list what is
+explicitly supported by the candidate profile."]
 }}
 
 **Job Title:** {job_title}
-**Job Description:**
-{job_description}
-**Candidate Resume (RAW TEXT from PDF):**
-{resume_raw_text}
+{job_section}
+**Candidate Profile:**
+{json.dumps(candidate_profile, separators=(",", ":"))}
 """
-    full_llm_response = await get_llm_response(combined_prompt)
-    return full_llm_response
 
-async def process_single_resume_wrapper(pdf_path, job_description, job_title):
+async def score_candidate_profile(candidate_profile, job_description, job_title, stats=None, requirements_profile=None):
     """
-    Wrapper to extract text and then process a single resume with LLM.
+    Stage 2: scores an extracted candidate profile against a job. The prompt only
+    carries the compact profile and the JD (its requirements profile when compiled),
+    not the resume text, so it is small.
+    """
+    prompt = build_scoring_prompt(candidate_profile, job_description, job_title, requirements_profile)
+    with bind_log_context(stage="llm_score"):
+        llm_response = await get_llm_response(prompt, stats=stats)
+        if llm_response and isinstance(llm_response, dict) and "CompatibilityScore" in llm_response:
+            return llm_response
+        logger.warning("Could not score the candidate profile: response was not as expected")
+    return None
+
+async def process_resume_with_llm(resume_raw_text, job_description, job_title, stats=None, requirements_profile=None):
+    """
+    Processes a single resume against a job description in two LLM stages:
+    candidate profile extraction (cached per unique resume, see
+    extract_candidate_profile) and a small scoring prompt.
+    Returns {"extracted_info": ..., "ranking_analysis": ...}; ranking_analysis is
+    empty if only the scoring failed, and None is returned if the extraction failed.
+    `stats` (an LLMCallStats) collects retry information and carries the per-resume
+    deadline across both stages.
+    """
+    candidate_profile = await extract_candidate_profile(resume_raw_text, stats=stats)
+    if not candidate_profile:
+        return None
+    ranking_analysis = await score_candidate_profile(
+        candidate_profile, job_description, job_title, stats=stats, requirements_profile=requirements_profile
+    )
+    return {"extracted_info": candidate_profile, "ranking_analysis": ranking_analysis or {}}
+
+def resume_log_context(file_name, **fields):
+    """
+    Log context for the processing of one resume. Whether its success path is
+    logged (LOG_SUCCESS_SAMPLE_RATE) is decided once, by the outermost context.
+    """
+    sampled = get_log_context().get("sampled")
+    if sampled is None:
+        sampled = sample_success_logs(settings.LOG_SUCCESS_SAMPLE_RATE)
+    return bind_log_context(file_name=file_name, sampled=sampled, **fields)
+
+def log_resume_result(result, seconds):
+    """
+    One summary record per resume. Failures are warnings, so they are always
+    logged; so is any resume slower than LOG_SLOW_RESUME_SECONDS.
+    """
+    ranked = result["status"] in ("ranked", "prefiltered_out")
+    logger.log(
+        logging.INFO if ranked else logging.WARNING,
+        "Resume %s", result["status"],
+        extra={
+            "status": result["status"],
+            "compatibility_score": result["compatibility_score"],
+            "seconds": round(seconds, 3),
+            "extraction_seconds": round(result["extraction_seconds"] or 0.0, 3),
+            "llm_retries": result["llm_retries"],
+            "keep": seconds >= settings.LOG_SLOW_RESUME_SECONDS,
+        },
+    )
+
+def build_resume_result(file_name, status, extraction_seconds=None, llm_stats=None, extracted_info=None,
+                        ranking_analysis=None, compatibility_score=0, candidate_name="N/A",
+                        candidate_email="N/A", prefilter_score=None):
+    """
+    Builds the structured result dictionary stored as a RankedResume row.
+    """
+    return {
+        "file_name": file_name,
+        "status": status,
+        "extracted_info": extracted_info if extracted_info is not None else {},
+        "ranking_analysis": ranking_analysis if ranking_analysis is not None else {"CompatibilityScore": 0, "Strengths": []},
+        "compatibility_score": compatibility_score, # Top-level for sorting
+        "candidate_name": candidate_name,
+        "candidate_email": candidate_email,
+        "extraction_seconds": extraction_seconds,
+        "llm_retries": llm_stats.retries if llm_stats else 0,
+        "llm_retry_wait_seconds": llm_stats.retry_wait_seconds if llm_stats else 0.0,
+        "prefilter_score": prefilter_score,
+    }
+
+async def extract_resume_text(file_name, load_pdf, memory_slots=None):
+    """
+    Extracts the text of one resume on the extraction pool.
+    `load_pdf` is called with no arguments and returns the PDF bytes (or a path);
+    it is only called once one of `memory_slots` is free, and the bytes are
+    released as soon as the text has been extracted.
+    Returns (raw_text, extraction_seconds).
+    """
+    with resume_log_context(file_name, stage="extract"):
+        async with memory_slots or contextlib.nullcontext():
+            pdf_source = load_pdf()
+            # Parsing runs on the extraction pool, so other resumes keep talking to the LLM meanwhile
+            raw_text, extraction_seconds = await extract_text_async(pdf_source, settings.PDF_EXTRACTION_WORKERS)
+            del pdf_source
+        logger.info("Extracted resume text", extra={"extraction_seconds": round(extraction_seconds, 3)})
+    return raw_text, extraction_seconds
+
+def is_rankable_text(raw_text):
+    return bool(raw_text and raw_text.strip()) and len(raw_text) >= MIN_TEXT_LENGTH_FOR_LLM
+
+async def rank_resume_text(file_name, raw_text, extraction_seconds, job_description, job_title,
+                           requirements_profile=None, prefilter_score=None):
+    """
+    Ranks already extracted resume text with the LLM.
     Handles errors and returns a structured dictionary with top-level score, name, email.
     """
+    llm_stats = LLMCallStats(settings.LLM_RESUME_DEADLINE_SECONDS)
     try:
-        raw_text = extract_text_from_pdf(pdf_path)
-
         if raw_text is None or not raw_text.strip():
-            print(f"Skipping {os.path.basename(pdf_path)}: Failed to extract raw text or extracted text is empty.")
-            return {
-                "file_name": os.path.basename(pdf_path),
-                "status": "failed_extraction",
-                "extracted_info": {},
-                "ranking_analysis": {"CompatibilityScore": 0, "Strengths": []},
-                "compatibility_score": 0, # Default to 0
-                "candidate_name": "N/A",  # Default to N/A
-                "candidate_email": "N/A"  # Default to N/A
-            }
+            logger.warning("Skipping resume: failed to extract raw text or extracted text is empty")
+            return build_resume_result(file_name, "failed_extraction", extraction_seconds, llm_stats)
 
         if len(raw_text) < MIN_TEXT_LENGTH_FOR_LLM:
-            print(f"Skipping {os.path.basename(pdf_path)}: Raw text is too short or empty after basic stripping.")
-            return {
-                "file_name": os.path.basename(pdf_path),
-                "status": "text_too_short",
-                "extracted_info": {},
-                "ranking_analysis": {"CompatibilityScore": 0, "Strengths": []},
-                "compatibility_score": 0, # Default to 0
-                "candidate_name": "N/A",  # Default to N/A
-                "candidate_email": "N/A"  # Default to N/A
-            }
-
-        print(f"Processing ranking for: {os.path.basename(pdf_path)}")
-        llm_results = await process_resume_with_llm(raw_text, job_description, job_title)
+            logger.warning("Skipping resume: raw text is too short after basic stripping", extra={"text_length": len(raw_text)})
+            return build_resume_result(file_name, "text_too_short", extraction_seconds, llm_stats)
+
+        logger.info("Ranking resume")
+        llm_results = await process_resume_with_llm(
+            raw_text, job_description, job_title, stats=llm_stats, requirements_profile=requirements_profile
+        )
 
         extracted_info = llm_results.get("extracted_info", {}) if llm_results else {}
         ranking_analysis = llm_results.get("ranking_analysis", {}) if llm_results else {}
@@ -197,35 +805,257 @@ async def process_single_resume_wrapper(pdf_path, job_description, job_title):
         except (ValueError, TypeError):
             compatibility_score = 0 # Default if conversion fails
 
-        if llm_results:
-            return {
-                "file_name": os.path.basename(pdf_path),
-                "status": "ranked",
-                "extracted_info": extracted_info,
-                "ranking_analysis": ranking_analysis,
-                "compatibility_score": compatibility_score, # Now a top-level key
-                "candidate_name": candidate_name,          # Now a top-level key
-                "candidate_email": candidate_email         # Now a top-level key
-            }
-        else:
-            return {
-                "file_name": os.path.basename(pdf_path),
-                "status": "failed_ranking",
-                "extracted_info": extracted_info, # Still include what might have been extracted
-                "ranking_analysis": ranking_analysis, # Still include what might have been extracted
-                "compatibility_score": 0,
-                "candidate_name": candidate_name,
-                "candidate_email": candidate_email
-            }
+        ranked = bool(ranking_analysis)
+        return build_resume_result(
+            file_name,
+            "ranked" if ranked else "failed_ranking",
+            extraction_seconds,
+            llm_stats,
+            # On failure, still include whatever might have been extracted
+            extracted_info=extracted_info,
+            ranking_analysis=ranking_analysis,
+            compatibility_score=compatibility_score if ranked else 0,
+            candidate_name=candidate_name,
+            candidate_email=candidate_email,
+            prefilter_score=prefilter_score,
+        )
     except Exception as e:
-        print(f"An unexpected error processing {os.path.basename(pdf_path)}: {e}")
-        return {
-            "file_name": os.path.basename(pdf_path),
-            "status": f"Error: {e}",
-            "extracted_info": {},
-            "ranking_analysis": {"CompatibilityScore": 0, "Strengths": []},
-            "compatibility_score": 0,
-            "candidate_name": "N/A",
-            "candidate_email": "N/A"
-        }
+        logger.exception("An unexpected error processing %s: %s", file_name, e)
+        return build_resume_result(file_name, f"Error: {e}", extraction_seconds, llm_stats)
+
+async def rank_resume_source(file_name, load_text, job_description, job_title, requirements_profile=None,
+                             prefilter_score=None, keep_text=False):
+    """
+    Gets one resume's text by awaiting `load_text()`, which returns
+    (raw_text, extraction_seconds), and ranks it.
+    With keep_text the text is added to the result as 'raw_text' so the caller can store it.
+    """
+    started = time.monotonic()
+    with resume_log_context(file_name):
+        try:
+            raw_text, extraction_seconds = await load_text()
+        except Exception as e:
+            logger.exception("An unexpected error processing %s: %s", file_name, e)
+            result = build_resume_result(file_name, f"Error: {e}")
+            log_resume_result(result, time.monotonic() - started)
+            return result
+        result = await rank_resume_text(
+            file_name, raw_text, extraction_seconds, job_description, job_title, requirements_profile, prefilter_score
+        )
+        log_resume_result(result, time.monotonic() - started)
+    if keep_text and is_rankable_text(raw_text):
+        result["raw_text"] = raw_text
+    return result
+
+async def process_single_resume_wrapper(file_name, load_pdf, job_description, job_title, memory_slots=None,
+                                        requirements_profile=None, prefilter_score=None, keep_text=False):
+    """
+    Wrapper to extract text and then process a single resume with LLM.
+    Text extraction runs on the extraction process pool (see extract_resume_text),
+    and the LLM call starts as soon as this file's text is ready.
+    Handles errors and returns a structured dictionary with top-level score, name, email
+    and the time spent extracting text.
+    """
+    return await rank_resume_source(
+        file_name,
+        lambda: extract_resume_text(file_name, load_pdf, memory_slots),
+        job_description,
+        job_title,
+        requirements_profile,
+        prefilter_score,
+        keep_text,
+    )
+
+async def load_stored_text(raw_text):
+    """
+    `load_text` for a resume whose text was stored earlier: nothing is extracted.
+    """
+    return raw_text, 0.0
+
+
+async def iter_resume_zip_members(zip_ref, members, job_description, job_title, requirements_profile=None,
+                                  prefilter_scores=None, stored_texts=None):
+    """
+    Ranks the given resume members of an open ZIP archive and yields each
+    result as soon as it is ready, so callers can store it straight away.
+    Members are read lazily, straight into memory, and handed to PyMuPDF as a
+    stream; at most ZIP_MAX_MEMBERS_IN_MEMORY of them are held at once, so peak
+    memory does not grow with the size of the batch.
+    `prefilter_scores` optionally maps file names to the local score they were
+    selected with, which is kept on the result.
+    `stored_texts` maps file names to text extracted earlier (see ResumeDocument);
+    those resumes are ranked without touching the archive. Freshly extracted
+    text is returned on the result as 'raw_text' so it can be stored.
+    """
+    memory_slots = asyncio.Semaphore(settings.ZIP_MAX_MEMBERS_IN_MEMORY)
+    prefilter_scores = prefilter_scores or {}
+    stored_texts = stored_texts or {}
+
+    def reader(member):
+        return lambda: read_resume_member(zip_ref, member, settings.MAX_RESUME_PDF_SIZE)
+
+    tasks = []
+    for member in members:
+        file_name = os.path.basename(member.filename)
+        if file_name in stored_texts:
+            ranking = rank_resume_source(
+                file_name,
+                lambda raw_text=stored_texts[file_name]: load_stored_text(raw_text),
+                job_description,
+                job_title,
+                requirements_profile=requirements_profile,
+                prefilter_score=prefilter_scores.get(file_name),
+            )
+        else:
+            ranking = process_single_resume_wrapper(
+                file_name,
+                reader(member),
+                job_description,
+                job_title,
+                memory_slots=memory_slots,
+                requirements_profile=requirements_profile,
+                prefilter_score=prefilter_scores.get(file_name),
+                keep_text=True,
+            )
+        tasks.append(asyncio.ensure_future(ranking))
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        # If the consumer stops early, do not leave resumes running in the background
+        for task in tasks:
+            task.cancel()
 
+
+async def process_resume_zip_members(zip_ref, members, job_description, job_title, requirements_profile=None,
+                                     prefilter_scores=None, stored_texts=None):
+    """
+    Ranks the given resume members of an open ZIP archive and returns all results
+    (in completion order). See iter_resume_zip_members.
+    """
+    return [
+        result async for result in iter_resume_zip_members(
+            zip_ref, members, job_description, job_title, requirements_profile, prefilter_scores, stored_texts
+        )
+    ]
+
+
+async def iter_zip_member_texts(zip_ref, members):
+    """
+    Extracts the text of the given members of an open ZIP archive and yields
+    (file_name, outcome) as each one finishes, holding at most
+    ZIP_MAX_MEMBERS_IN_MEMORY PDFs in memory at once. The outcome is
+    (raw_text, extraction_seconds) or the exception raised for that member.
+    """
+    memory_slots = asyncio.Semaphore(settings.ZIP_MAX_MEMBERS_IN_MEMORY)
+
+    async def extract(member):
+        file_name = os.path.basename(member.filename)
+        try:
+            return file_name, await extract_resume_text(
+                file_name, lambda: read_resume_member(zip_ref, member, settings.MAX_RESUME_PDF_SIZE), memory_slots
+            )
+        except Exception as e:
+            return file_name, e
+
+    tasks = [asyncio.ensure_future(extract(member)) for member in members]
+    try:
+        for next_outcome in asyncio.as_completed(tasks):
+            yield await next_outcome
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def extract_zip_member_texts(zip_ref, members):
+    """
+    Extracts the text of every given member of an open ZIP archive (see
+    iter_zip_member_texts). Returns a list of (file_name, outcome) in member order.
+    """
+    outcomes = {file_name: outcome async for file_name, outcome in iter_zip_member_texts(zip_ref, members)}
+    return [(file_name, outcomes[file_name]) for file_name in (os.path.basename(member.filename) for member in members)]
+
+
+def prefilter_enabled():
+    return settings.PREFILTER_TOP_K > 0 or settings.PREFILTER_MIN_SCORE > 0
+
+async def prefilter_zip_members(zip_ref, members, job_description, requirements_profile=None,
+                                stored_names=(), load_texts=None, store_texts=None):
+    """
+    Scores every resume member locally against the JD, keeping only the top
+    PREFILTER_TOP_K (and/or those scoring at least PREFILTER_MIN_SCORE) for the LLM.
+    No text is kept: each resume is reduced to the term counts BM25 needs as
+    soon as its text is ready, so memory does not grow with the batch.
+    Members whose file name is in `stored_names` are not extracted again; their
+    text is read with `load_texts(file_names)`, which returns {file_name: text}.
+    Newly extracted rankable text is passed to `store_texts` as
+    {file_name: (raw_text, extraction_seconds)}, so the chunk tasks can rank
+    from it. Both are called for at most ZIP_MAX_MEMBERS_IN_MEMORY resumes at a time.
+    Returns (selected_members, prefilter_scores, decided_results) where
+    decided_results are final results for the resumes that will not be sent to
+    the LLM: status 'prefiltered_out' with their local score, or an extraction failure.
+    """
+    group_size = max(1, settings.ZIP_MAX_MEMBERS_IN_MEMORY)
+    query = query_terms(build_prefilter_query(job_description, requirements_profile))
+    members_by_name = {os.path.basename(member.filename): member for member in members}
+    archive_order = {file_name: position for position, file_name in enumerate(members_by_name)}
+    already_stored = set(stored_names)
+    stored_names = [file_name for file_name in members_by_name if file_name in already_stored]
+
+    decided_results = []
+    rankable = [] # (file_name, extraction_seconds, term_counts)
+    to_store = {}
+
+    async def add_outcome(file_name, outcome, stored):
+        if isinstance(outcome, BaseException):
+            logger.error(
+                "An unexpected error processing %s: %s", file_name, outcome,
+                exc_info=(type(outcome), outcome, outcome.__traceback__), extra={"file_name": file_name},
+            )
+            decided_results.append(build_resume_result(file_name, f"Error: {outcome}"))
+            return
+        raw_text, extraction_seconds = outcome
+        if not is_rankable_text(raw_text):
+            # rank_resume_text turns unusable text into the matching failure status without an LLM call
+            decided_results.append(await rank_resume_text(
+                file_name, raw_text, extraction_seconds, job_description, None
+            ))
+            return
+        rankable.append((file_name, extraction_seconds, document_term_counts(raw_text, query)))
+        if not stored:
+            to_store[file_name] = (raw_text, extraction_seconds)
+            if len(to_store) >= group_size:
+                await store_texts(dict(to_store))
+                to_store.clear()
+
+    for start in range(0, len(stored_names), group_size):
+        texts = await load_texts(stored_names[start:start + group_size])
+        for file_name in stored_names[start:start + group_size]:
+            await add_outcome(file_name, (texts.get(file_name), 0.0), stored=True)
+
+    to_extract = [member for file_name, member in members_by_name.items() if file_name not in already_stored]
+    async for file_name, outcome in iter_zip_member_texts(zip_ref, to_extract):
+        await add_outcome(file_name, outcome, stored=False)
+    if to_store:
+        await store_texts(dict(to_store))
+
+    # Members are selected in archive order, so the chunks are split the same way on every run
+    rankable.sort(key=lambda item: archive_order[item[0]])
+    scores, selected = select_resumes(
+        bm25_scores_from_counts(query, [term_counts for _, _, term_counts in rankable]),
+        top_k=settings.PREFILTER_TOP_K,
+        min_score=settings.PREFILTER_MIN_SCORE,
+    )
+    logger.info("Prefilter selected %d of %d resumes for LLM ranking", len(selected), len(rankable), extra={"keep": True})
+
+    selected_members = []
+    prefilter_scores = {}
+    for index, (file_name, extraction_seconds, _) in enumerate(rankable):
+        prefilter_scores[file_name] = scores[index]
+        if index in selected:
+            selected_members.append(members_by_name[file_name])
+        else:
+            decided_results.append(build_resume_result(
+                file_name, "prefiltered_out", extraction_seconds, prefilter_score=scores[index]
+            ))
+    return selected_members, prefilter_scores, decided_results
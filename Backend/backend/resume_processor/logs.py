@@ -0,0 +1,184 @@
+# backend/resume_processor/logs.py
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+import contextlib
+import contextvars
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Structured logging for the resume pipeline, wired up by settings.LOGGING.
+#
+# - Context: bind_log_context() attaches fields (batch_id, file_name, stage, ...)
+#   to every record logged inside the block, including from asyncio tasks
+#   started in it, so each line of a resume's processing can be traced.
+# - Non-blocking: NonBlockingStreamHandler only puts records on a queue; a
+#   listener thread formats and writes them, so hundreds of coroutines never
+#   wait on stdout.
+# - Sampling: the success-path records of a resume are kept for a sample of
+#   resumes only (LOG_SUCCESS_SAMPLE_RATE). Warnings and errors are always
+#   kept, as are records marked with extra={'keep': True}, e.g. a slow resume.
+#
+# Deliberately free of Django imports: it is loaded while settings are configured.
+
+_log_context = contextvars.ContextVar("resume_processor_log_context", default={})
+
+# Attributes every LogRecord has; anything else on a record came from extra=
+_STANDARD_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+@contextlib.contextmanager
+def bind_log_context(**fields):
+    """
+    Adds `fields` to the log context for the duration of the block.
+    """
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def get_log_context():
+    return _log_context.get()
+
+
+def reset_log_context():
+    """
+    Clears the log context. Used as the initializer of forked pool workers,
+    which would otherwise keep the context of the resume that started them.
+    """
+    _log_context.set({})
+
+
+def sample_success_logs(rate):
+    """
+    Decides once per unit of work (e.g. a resume) whether its success-path
+    records are kept; pass the result to bind_log_context(sampled=...).
+    """
+    return rate >= 1 or random.random() < rate
+
+
+class ResumeContextFilter(logging.Filter):
+    """
+    Copies the bound log context onto the record, in the thread that logged it,
+    and drops sub-warning records of unsampled work.
+    """
+    def filter(self, record):
+        context = _log_context.get()
+        record.context = {key: value for key, value in context.items() if key != "sampled"}
+        if record.levelno >= logging.WARNING or getattr(record, "keep", False):
+            return True
+        return context.get("sampled", True)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, message, the bound context and any extra= fields.
+    """
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "context", {}),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_RECORD_ATTRIBUTES and key not in ("context", "keep"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    """
+    Human-readable lines for development: the message followed by key=value context.
+    """
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record):
+        record.message = record.getMessage()
+        record.asctime = self.formatTime(record)
+        line = self.formatMessage(record)
+        fields = {**getattr(record, "context", {})}
+        for key, value in vars(record).items():
+            if key not in _STANDARD_RECORD_ATTRIBUTES and key not in ("context", "keep"):
+                fields[key] = value
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+class NonBlockingStreamHandler(QueueHandler):
+    """
+    Queues records for a background listener thread, which formats them with
+    this handler's formatter and writes them to stdout. The queue is bounded;
+    when it is full, records are dropped rather than blocking the caller.
+    Forked processes (Celery prefork children, the extraction pool) start
+    their own listener on first use.
+    """
+    def __init__(self, max_queue_size=10000):
+        super().__init__(queue.Queue(max_queue_size))
+        self.max_queue_size = max_queue_size
+        self._listener = None
+        self._listener_pid = None
+        self._start_lock = threading.Lock()
+        self.dropped = 0
+
+    def _ensure_listener(self):
+        if self._listener_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._listener_pid == os.getpid():
+                return
+            if self._listener_pid is not None:
+                # Inherited through fork: the queue may hold the parent's records and no thread serves it
+                self.queue = queue.Queue(self.max_queue_size)
+            # The real stdout: Celery replaces sys.stdout with a proxy that logs what is written to it
+            target = logging.StreamHandler(sys.__stdout__ or sys.stdout)
+            target.setFormatter(self.formatter or JsonFormatter())
+            self._listener = QueueListener(self.queue, target, respect_handler_level=False)
+            self._listener.start()
+            self._listener_pid = os.getpid()
+            atexit.register(self.stop)
+
+    def prepare(self, record):
+        # Merge the arguments and render the traceback here, where they are still
+        # valid; the final formatting happens on the listener thread
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
+
+    def stop(self):
+        if self._listener is not None and self._listener_pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+            self._listener_pid = None
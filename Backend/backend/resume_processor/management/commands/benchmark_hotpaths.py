@@ -0,0 +1,309 @@
+# backend/resume_processor/management/commands/benchmark_hotpaths.py
+import io
+import json
+import time
+import random
+import hashlib
+import zipfile
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from resume_processor.benchmarking import (
+    SKILLS, build_pdf, build_resume_zip, compare_reports, format_comparison, load_report, metric, new_report, summarize,
+    synthetic_resume_text, write_report,
+)
+
+# Fixtures are generated from a fixed seed, so every run (and every release)
+# measures the same inputs; their content hashes are saved with the report.
+FIXTURE_SEED = 1234
+
+REQUIREMENTS_PROFILE = {
+    "MustHaveSkills": ["Python", "Django", "Celery", "PostgreSQL"],
+    "NiceToHaveSkills": ["Kubernetes", "AWS", "CI/CD"],
+    "Seniority": "Senior",
+    "MinYearsOfExperience": "5",
+    "Domain": "SaaS",
+}
+
+
+def candidate_profile(index, rng):
+    return {
+        "Name": f"Candidate {index}",
+        "Email": f"candidate{index}@example.com",
+        "Phone": f"+1 555 {rng.randint(1000000, 9999999)}",
+        "Location": rng.choice(["Berlin", "London", "New York", "Remote"]),
+        "JobTitles": ["Software Engineer", "Backend Developer"],
+        "Companies": ["Acme", "Globex"],
+        "YearsOfExperience": f"{rng.randint(1, 15)} years",
+        "Skills": rng.sample(SKILLS, 8),
+        "Degree": ["B.Sc. Computer Science"],
+        "GraduationYears": ["2014"],
+        "EducationalInstitutions": ["State University"],
+        "Highlights": ["Led a migration to microservices", "Cut p99 latency by 40%"],
+    }
+
+
+def ranking_analysis(rng):
+    return {
+        "CompatibilityScore": rng.randint(0, 100),
+        "Strengths": [f"Experience with {skill}" for skill in rng.sample(SKILLS, 4)],
+    }
+
+
+def build_image_pdf(pages, rng):
+    """
+    A scanned-looking PDF: every page is mostly raster images, with a little text.
+    """
+    import fitz  # PyMuPDF
+
+    document = fitz.open()
+    document.set_metadata({})
+    for page_number in range(pages):
+        page = document.new_page()
+        page.insert_text((50, 50), f"Portfolio page {page_number + 1}", fontsize=12)
+        for row in range(2):
+            width, height = 400, 250
+            samples = rng.randbytes(width * height * 3)
+            pixmap = fitz.Pixmap(fitz.csRGB, width, height, samples, False)
+            page.insert_image(fitz.Rect(50, 80 + row * 330, 550, 380 + row * 330), pixmap=pixmap)
+    data = document.tobytes(deflate=True, no_new_id=True)
+    document.close()
+    return data
+
+
+def build_fixtures():
+    rng = random.Random(FIXTURE_SEED)
+    fixtures = {
+        'small_pdf': build_pdf(synthetic_resume_text(0, 300, rng), 1),
+        'long_pdf': build_pdf(synthetic_resume_text(1, 12000, rng), 40),
+        'image_pdf': build_image_pdf(4, rng),
+    }
+    fixtures['resume_zip'] = build_resume_zip(200, 300, 1, FIXTURE_SEED)
+    fixtures['resume_text'] = synthetic_resume_text(2, 600, rng)
+    fixtures['profile'] = candidate_profile(0, rng)
+    fixtures['profile_json'] = json.dumps(candidate_profile(1, rng))
+    fixtures['results'] = [
+        {
+            'file_name': f"candidate_{index:05d}.pdf",
+            'status': 'ranked',
+            'extracted_info': candidate_profile(index, rng),
+            'ranking_analysis': ranking_analysis(rng),
+            'compatibility_score': rng.randint(0, 100),
+            'candidate_name': f"Candidate {index}",
+            'candidate_email': f"candidate{index}@example.com",
+            'extraction_seconds': 0.02,
+            'llm_retries': 0,
+            'llm_retry_wait_seconds': 0.0,
+            'prefilter_score': None,
+        }
+        for index in range(1000)
+    ]
+    return fixtures
+
+
+def fixture_digest(value):
+    data = value if isinstance(value, bytes) else json.dumps(value, sort_keys=True).encode('utf-8')
+    return {'bytes': len(data), 'sha256': hashlib.sha256(data).hexdigest()[:16]}
+
+
+def measure(func, setup=None, min_rounds=5, min_time=1.0, max_time=10.0):
+    """
+    pytest-benchmark style timing. Cheap functions are called many times per round
+    (calibrated to take at least a millisecond) and the per-call time is reported.
+    With `setup`, each round calls setup() untimed and passes its result to a
+    single timed func() call.
+    Returns the per-call durations of every round, in seconds.
+    """
+    if setup is None:
+        func()  # warm-up
+        started = time.perf_counter()
+        func()
+        iterations = max(1, int(0.001 / max(time.perf_counter() - started, 1e-9)))
+    else:
+        func(setup())
+        iterations = 1
+
+    durations = []
+    deadline = time.perf_counter() + max_time
+    started_all = time.perf_counter()
+    while len(durations) < min_rounds or time.perf_counter() - started_all < min_time:
+        argument = setup() if setup is not None else None
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func(argument) if setup is not None else func()
+        durations.append((time.perf_counter() - started) / iterations)
+        if time.perf_counter() > deadline and len(durations) >= min_rounds:
+            break
+    return durations
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmarks of the pipeline's hot functions on fixed fixtures: PDF text extraction, "
+        "ZIP member iteration, prompt construction, LLM JSON parsing, RankedResume persistence and "
+        "serialization. Save a run with --output and prove an optimization with --compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', help="Comma-separated benchmark names (see --list)")
+        parser.add_argument('--list', action='store_true', help="List the benchmarks and exit")
+        parser.add_argument('--min-rounds', type=int, default=5)
+        parser.add_argument('--min-time', type=float, default=1.0, help="Minimum seconds spent per benchmark")
+        parser.add_argument('--max-time', type=float, default=10.0, help="Stop adding rounds after this many seconds")
+        parser.add_argument('--label', help="Name for this run in the report, e.g. a branch or release tag")
+        parser.add_argument('--output', metavar='FILE', help="Write the JSON report to FILE")
+        parser.add_argument('--compare', metavar='FILE', help="Compare against a report saved with --output")
+        parser.add_argument('--threshold', type=float, default=0.1,
+                            help="Relative slowdown counted as a regression by --compare (default 0.1)")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def benchmarks(self, fixtures):
+        """
+        (name, needs_database, factory); the factory returns (func, setup).
+        """
+        return [
+            ('extract_small_pdf', False, lambda: self.extraction(fixtures['small_pdf'])),
+            ('extract_long_pdf', False, lambda: self.extraction(fixtures['long_pdf'])),
+            ('extract_image_pdf', False, lambda: self.extraction(fixtures['image_pdf'])),
+            ('zip_iterate_members', False, lambda: self.zip_iteration(fixtures['resume_zip'])),
+            ('build_candidate_profile_prompt', False, lambda: self.profile_prompt(fixtures['resume_text'])),
+            ('build_scoring_prompt', False, lambda: self.scoring_prompt(fixtures['profile'])),
+            ('parse_llm_json', False, lambda: self.json_parsing(fixtures['profile_json'])),
+            ('persist_ranked_resumes_200', True, lambda: self.persistence(fixtures['results'][:200])),
+            ('serialize_ranked_resumes_1k', True, lambda: self.serialization(fixtures['results'], render=False)),
+            ('render_ranked_resumes_1k', True, lambda: self.serialization(fixtures['results'], render=True)),
+        ]
+
+    def handle(self, *args, **options):
+        names = None
+        if options['only']:
+            names = {name.strip() for name in options['only'].split(',') if name.strip()}
+
+        self.stdout.write("Building fixtures...")
+        fixtures = build_fixtures()
+        benchmarks = self.benchmarks(fixtures)
+        if options['list']:
+            for name, needs_database, _ in benchmarks:
+                self.stdout.write(f"{name}{' (database)' if needs_database else ''}")
+            return
+        if names:
+            unknown = names - {name for name, _, _ in benchmarks}
+            if unknown:
+                raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+            benchmarks = [benchmark for benchmark in benchmarks if benchmark[0] in names]
+
+        report = new_report('hotpaths', options['label'], {
+            key: options[key] for key in ('only', 'min_rounds', 'min_time', 'max_time')
+        })
+        report['fixtures'] = {
+            name: fixture_digest(fixtures[name])
+            for name in ('small_pdf', 'long_pdf', 'image_pdf', 'resume_zip', 'resume_text', 'results')
+        }
+        report['results'] = {}
+
+        needs_database = any(needs for _, needs, _ in benchmarks)
+        old_database_name = None
+        if needs_database:
+            old_database_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # Live progress events and metric flushes would time Redis round trips instead of our code
+            with override_settings(BATCH_EVENTS_REDIS_URL='', METRICS_REDIS_URL=''):
+                for name, _, factory in benchmarks:
+                    func, setup = factory()
+                    durations = measure(func, setup, options['min_rounds'], options['min_time'], options['max_time'])
+                    stats = {
+                        **summarize(durations),
+                        'min': round(min(durations), 9),
+                        'stddev': round(statistics.pstdev(durations), 9),
+                        'ops_per_second': round(1 / statistics.median(durations), 2),
+                    }
+                    report['results'][name] = stats
+                    report['metrics'][f"{name}_median_seconds"] = metric(stats['p50'], 's')
+                    self.stdout.write(
+                        f"{name:<34} median {stats['p50'] * 1000:>10.4f} ms   min {stats['min'] * 1000:>10.4f} ms"
+                        f"   stddev {stats['stddev'] * 1000:>9.4f} ms   rounds {stats['count']}"
+                    )
+        finally:
+            if old_database_name is not None:
+                connection.creation.destroy_test_db(old_database_name, verbosity=0)
+
+        if options['output']:
+            write_report(report, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        if options['compare']:
+            baseline = load_report(options['compare'])
+            if baseline.get('fixtures') and baseline['fixtures'] != report['fixtures']:
+                self.stdout.write(self.style.WARNING("The baseline was measured on different fixtures."))
+            rows = compare_reports(report, baseline, options['threshold'])
+            self.stdout.write(format_comparison(rows))
+            if options['fail_on_regression'] and any(regressed for *_, regressed in rows):
+                raise CommandError("Performance regressed beyond the threshold.")
+
+    # Benchmark factories: each returns (func, setup)
+
+    def extraction(self, pdf_bytes):
+        from resume_processor.extraction import extract_text_from_pdf
+
+        return lambda: extract_text_from_pdf(pdf_bytes), None
+
+    def zip_iteration(self, zip_bytes):
+        from resume_processor.extraction import list_resume_members, read_resume_member
+
+        def iterate():
+            with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zip_ref:
+                for member in list_resume_members(zip_ref):
+                    read_resume_member(zip_ref, member)
+
+        return iterate, None
+
+    def profile_prompt(self, resume_text):
+        from resume_processor.llm_utils import build_candidate_profile_prompt
+
+        return lambda: build_candidate_profile_prompt(resume_text), None
+
+    def scoring_prompt(self, profile):
+        from resume_processor.llm_utils import build_scoring_prompt
+
+        return lambda: build_scoring_prompt(profile, "", "Senior Backend Engineer", REQUIREMENTS_PROFILE), None
+
+    def json_parsing(self, response_content):
+        from resume_processor.llm_utils import parse_llm_json
+
+        return lambda: parse_llm_json(response_content), None
+
+    def benchmark_batch(self):
+        from django.contrib.auth import get_user_model
+        from resume_processor.models import JobRequirement, ResumeBatch
+
+        user, _ = get_user_model().objects.get_or_create(username='benchmark', defaults={'email': 'benchmark@example.com'})
+        job_requirement = JobRequirement.objects.create(user=user, pdf_file='requirements_pdfs/benchmark.pdf')
+        return ResumeBatch.objects.create(user=user, job_requirement=job_requirement, zip_file='resume_zips/benchmark.zip')
+
+    def persistence(self, results):
+        from resume_processor.tasks import save_resume_results
+
+        texts = {result['file_name']: synthetic_resume_text(index, 300, random.Random(index))
+                 for index, result in enumerate(results)}
+
+        def setup():
+            # A fresh batch per round, so every round inserts (rather than updates) the rows
+            batch_results = [dict(result, raw_text=texts[result['file_name']]) for result in results]
+            return self.benchmark_batch(), batch_results
+
+        return lambda arguments: save_resume_results(*arguments), setup
+
+    def serialization(self, results, render):
+        from rest_framework.renderers import JSONRenderer
+        from resume_processor.models import RankedResume
+        from resume_processor.serializers import RankedResumeSerializer
+
+        resume_batch = self.benchmark_batch()
+        RankedResume.objects.bulk_create([RankedResume.from_result(resume_batch, result) for result in results])
+        rows = list(RankedResume.objects.filter(resume_batch=resume_batch))
+        if not render:
+            return lambda: RankedResumeSerializer(rows, many=True).data, None
+        data = RankedResumeSerializer(rows, many=True).data
+        return lambda: JSONRenderer().render(data), None
@@ -0,0 +1,157 @@
+# backend/resume_processor/management/commands/benchmark_imports.py
+import os
+import sys
+import json
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from resume_processor.benchmarking import (
+    compare_reports, format_comparison, load_report, median, metric, new_report, write_report,
+)
+
+# Modules only the Celery workers need. A web process must be able to start and
+# queue work (which imports resume_processor.tasks) without loading any of them.
+WORKER_ONLY_MODULES = ('fitz', 'pymupdf', 'openai')
+
+# Runs in a fresh interpreter, so nothing this command imported is counted.
+# Prints one JSON object: timings and RSS after each step, and which
+# WORKER_ONLY_MODULES were loaded by then.
+PROBE = r'''
+import os, sys, json, time
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, IndexError, ValueError):
+        return None
+
+worker_only = json.loads(sys.argv[1])
+steps = {}
+
+def step(name, func):
+    rss_before, started = rss_mb(), time.perf_counter()
+    func()
+    rss_after = rss_mb()
+    steps[name] = {
+        "seconds": time.perf_counter() - started,
+        "rss_mb": rss_after,
+        "rss_delta_mb": rss_after - rss_before if rss_after is not None else None,
+        "worker_only_modules": sorted(name for name in worker_only if name in sys.modules),
+    }
+
+def web_startup():
+    import importlib
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+    get_wsgi_application()
+    importlib.import_module(settings.ROOT_URLCONF)
+
+def task_submission():
+    # What a web process loads the first time it queues a JD or a resume batch
+    import resume_processor.scheduling
+    import resume_processor.tasks
+
+def worker_dependencies():
+    # A client like the workers' own, with a placeholder key: GROQ_API_KEY need not be set
+    from resume_processor.llm_utils import create_llm_client
+    import fitz
+    create_llm_client(api_key="benchmark")
+
+steps_started = rss_mb()
+step("web_startup", web_startup)
+step("task_submission", task_submission)
+step("worker_dependencies", worker_dependencies)
+print(json.dumps({"interpreter_rss_mb": steps_started, "steps": steps}))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the start-up cost of a web process in fresh interpreters: Django setup with the URLconf "
+        "loaded, then importing the task modules needed to queue work. Fails if either step loads a "
+        "worker-only dependency (PyMuPDF, the OpenAI SDK). The cost of those dependencies, which only "
+        "Celery workers pay, is reported separately."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to report the median of")
+        parser.add_argument('--max-startup-seconds', type=float,
+                            help="Fail if web start-up plus task submission imports take longer")
+        parser.add_argument('--max-rss-mb', type=float,
+                            help="Fail if the web process is larger than this after those imports")
+        parser.add_argument('--label', help="Name for this run in the report, e.g. a release tag")
+        parser.add_argument('--output', metavar='FILE', help="Write the JSON report to FILE")
+        parser.add_argument('--compare', metavar='FILE', help="Compare against a report saved with --output")
+        parser.add_argument('--threshold', type=float, default=0.1,
+                            help="Relative change counted as a regression by --compare (default 0.1)")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError("--runs must be at least 1.")
+
+        runs = [self.probe() for _ in range(options['runs'])]
+        report = new_report('imports', options['label'], {'runs': options['runs']})
+        report['runs'] = runs
+        report['metrics'] = self.aggregate_metrics(runs)
+
+        for name, value in report['metrics'].items():
+            self.stdout.write(f"{name:<44} {value['value']} {value['unit']}")
+        if options['output']:
+            write_report(report, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+        failures = []
+        for step in ('web_startup', 'task_submission'):
+            loaded = runs[0]['steps'][step]['worker_only_modules']
+            if loaded:
+                failures.append(f"{step} loaded worker-only modules: {', '.join(loaded)}")
+        web_seconds = report['metrics']['web_process_seconds']['value']
+        web_rss = report['metrics']['web_process_rss_mb']['value']
+        if options['max_startup_seconds'] is not None and web_seconds > options['max_startup_seconds']:
+            failures.append(f"web start-up took {web_seconds}s (limit {options['max_startup_seconds']}s)")
+        if options['max_rss_mb'] is not None and web_rss is not None and web_rss > options['max_rss_mb']:
+            failures.append(f"web process RSS is {web_rss} MB (limit {options['max_rss_mb']} MB)")
+
+        if options['compare']:
+            rows = compare_reports(report, load_report(options['compare']), options['threshold'])
+            self.stdout.write(format_comparison(rows))
+            if options['fail_on_regression'] and any(regressed for *_, regressed in rows):
+                failures.append("performance regressed beyond the threshold")
+        if failures:
+            raise CommandError("; ".join(failures))
+
+    def probe(self):
+        """
+        Runs PROBE in a new interpreter with this process's settings module.
+        """
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE, 'PYTHONDONTWRITEBYTECODE': '1'}
+        completed = subprocess.run(
+            [sys.executable, '-c', PROBE, json.dumps(WORKER_ONLY_MODULES)],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            raise CommandError(f"Import probe failed:\n{completed.stderr.strip()}")
+        # Settings or app code may log to stdout while importing; the report is the last line
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def aggregate_metrics(self, runs):
+        def median_of(step, key):
+            values = [run['steps'][step][key] for run in runs if run['steps'][step][key] is not None]
+            return round(median(values), 4) if values else None
+
+        web_seconds = [
+            run['steps']['web_startup']['seconds'] + run['steps']['task_submission']['seconds'] for run in runs
+        ]
+        return {
+            'web_process_seconds': metric(round(median(web_seconds), 4), 's'),
+            'web_process_rss_mb': metric(median_of('task_submission', 'rss_mb'), 'MB'),
+            'web_startup_seconds': metric(median_of('web_startup', 'seconds'), 's'),
+            'task_submission_import_seconds': metric(median_of('task_submission', 'seconds'), 's'),
+            'task_submission_import_rss_mb': metric(median_of('task_submission', 'rss_delta_mb'), 'MB'),
+            'worker_dependencies_seconds': metric(median_of('worker_dependencies', 'seconds'), 's'),
+            'worker_dependencies_rss_mb': metric(median_of('worker_dependencies', 'rss_delta_mb'), 'MB'),
+        }
@@ -0,0 +1,274 @@
+# backend/resume_processor/management/commands/benchmark_pipeline.py
+import time
+import tempfile
+import tracemalloc
+
+from celery import current_app
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from resume_processor import llm_utils
+from resume_processor.benchmarking import (
+    StageCollector, build_pdf, build_resume_zip, compare_reports, current_rss_mb, format_comparison, load_report,
+    median, metric, new_report, peak_rss_mb, summarize, write_report,
+)
+from resume_processor.extraction import shutdown_extraction_executor
+from resume_processor.instrumentation import add_stage_recorder, remove_stage_recorder
+from resume_processor.mock_llm import MockLLMConfig, start_mock_llm_server
+from resume_processor.models import RankedResume, ResumeBatch
+from resume_processor.runtime import run_coroutine
+
+API_PREFIX = '/api/resume-processor'
+# Sent to the mock LLM server, which accepts any key
+MOCK_API_KEY = 'benchmark'
+
+JOB_DESCRIPTION = (
+    "Senior Backend Engineer. We are looking for an engineer with strong Python and Django experience, "
+    "asynchronous task processing with Celery and Redis, PostgreSQL, Docker and AWS. Experience with "
+    "Kubernetes, CI/CD and REST API design is a plus. At least five years of professional experience."
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "End-to-end benchmark of the upload-to-ranking pipeline: uploads a synthetic ZIP through "
+        "ResumeBatchUploadView, ranks it with Celery in eager mode against a mock LLM server, and reads "
+        "the results back through RankedResumesListView. Runs on a throwaway test database. Eager mode "
+        "runs the chunk tasks one after another, so the numbers are for a single worker process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resumes', type=int, default=100, help="Resumes per ZIP")
+        parser.add_argument('--words', type=int, default=400, help="Words of filler text per resume")
+        parser.add_argument('--pages', type=int, default=1, help="Pages per resume PDF")
+        parser.add_argument('--runs', type=int, default=3, help="Runs to report the median of")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--latency', default='lognormal:0.3:0.4', help="Mock LLM latency (see mock_llm_server)")
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+        parser.add_argument('--server-error-rate', type=float, default=0.0)
+        parser.add_argument('--malformed-json-rate', type=float, default=0.0)
+        parser.add_argument('--replay', metavar='FILE', help="Replay recorded LLM traffic instead of synthetic answers")
+        parser.add_argument('--llm-base-url', help="Use an already running LLM endpoint instead of starting a mock")
+        parser.add_argument('--llm-requests-per-minute', type=int, default=0,
+                            help="LLM_REQUESTS_PER_MINUTE during the benchmark (default: unthrottled)")
+        parser.add_argument('--llm-tokens-per-minute', type=int, default=0,
+                            help="LLM_TOKENS_PER_MINUTE during the benchmark (default: unthrottled)")
+        parser.add_argument('--llm-cache', action='store_true', help="Keep the LLM response cache enabled")
+        parser.add_argument('--tracemalloc', action='store_true',
+                            help="Also report peak Python heap usage (slows the run down)")
+        parser.add_argument('--label', help="Name for this run in the report, e.g. a release tag")
+        parser.add_argument('--output', metavar='FILE', help="Write the JSON report to FILE")
+        parser.add_argument('--compare', metavar='FILE', help="Compare against a report saved with --output")
+        parser.add_argument('--threshold', type=float, default=0.1,
+                            help="Relative change counted as a regression by --compare (default 0.1)")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['resumes'] < 1 or options['runs'] < 1:
+            raise CommandError("--resumes and --runs must be at least 1.")
+
+        self.stdout.write(f"Generating {options['resumes']} synthetic resumes...")
+        zip_bytes = build_resume_zip(options['resumes'], options['words'], options['pages'], options['seed'])
+        jd_pdf = build_pdf(JOB_DESCRIPTION, 1)
+
+        mock_server = None
+        base_url = options['llm_base_url']
+        if not base_url:
+            try:
+                mock_server = start_mock_llm_server(MockLLMConfig(
+                    latency=options['latency'],
+                    rate_limit_rate=options['rate_limit_rate'],
+                    server_error_rate=options['server_error_rate'],
+                    malformed_json_rate=options['malformed_json_rate'],
+                    seed=options['seed'],
+                    replay_path=options['replay'],
+                ))
+            except (ValueError, OSError) as e:
+                raise CommandError(str(e))
+            base_url = mock_server.base_url
+
+        config = {
+            key: options[key] for key in (
+                'resumes', 'words', 'pages', 'runs', 'seed', 'latency', 'rate_limit_rate', 'server_error_rate',
+                'malformed_json_rate', 'replay', 'llm_base_url', 'llm_requests_per_minute',
+                'llm_tokens_per_minute', 'llm_cache',
+            )
+        }
+        config['zip_bytes'] = len(zip_bytes)
+        report = new_report('pipeline', options['label'], config)
+
+        # Benchmarking against the mock needs no GROQ_API_KEY
+        api_key = settings.GROQ_API_KEY if options['llm_base_url'] else None
+        llm_utils.set_llm_client(llm_utils.create_llm_client(api_key=api_key or MOCK_API_KEY, base_url=base_url))
+        celery_conf = current_app.conf
+        eager_settings = (celery_conf.task_always_eager, celery_conf.task_eager_propagates)
+        celery_conf.task_always_eager, celery_conf.task_eager_propagates = True, True
+        setup_test_environment()
+        old_database_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(
+                MEDIA_ROOT=media_root,
+                BATCH_EVENTS_REDIS_URL='',
+                METRICS_REDIS_URL='',
+                LLM_RATE_LIMIT_REDIS_URL='',
+                LLM_CACHE_ENABLED=options['llm_cache'],
+                LLM_REQUESTS_PER_MINUTE=options['llm_requests_per_minute'],
+                LLM_TOKENS_PER_MINUTE=options['llm_tokens_per_minute'],
+            ):
+                report['settings'] = self.pipeline_settings()
+                runs = []
+                for run in range(1, options['runs'] + 1):
+                    if mock_server:
+                        mock_server.stats.reset()
+                    run_report = self.run_once(run, zip_bytes, jd_pdf, options['tracemalloc'])
+                    if mock_server:
+                        run_report['llm_server'] = mock_server.stats.snapshot()
+                    runs.append(run_report)
+                    self.stdout.write(
+                        f"Run {run}: {run_report['resumes_per_minute']:.1f} resumes/min, "
+                        f"first result after {run_report['time_to_first_result_seconds']}s, "
+                        f"total {run_report['total_seconds']:.2f}s"
+                    )
+        finally:
+            connection.creation.destroy_test_db(old_database_name, verbosity=0)
+            teardown_test_environment()
+            celery_conf.task_always_eager, celery_conf.task_eager_propagates = eager_settings
+            run_coroutine(llm_utils.close_llm_client())
+            if mock_server:
+                mock_server.shutdown()
+                mock_server.server_close()
+
+        # Extraction pool processes only show up in RUSAGE_CHILDREN once they have exited
+        shutdown_extraction_executor()
+        report['runs'] = runs
+        report['memory'] = {
+            'peak_rss_mb': peak_rss_mb(),
+            'peak_child_rss_mb': peak_rss_mb(children=True),
+        }
+        report['metrics'] = self.aggregate_metrics(runs, report['memory'])
+
+        for name, value in report['metrics'].items():
+            self.stdout.write(f"{name:<44} {value['value']} {value['unit']}")
+        if options['output']:
+            write_report(report, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        if options['compare']:
+            rows = compare_reports(report, load_report(options['compare']), options['threshold'])
+            self.stdout.write(format_comparison(rows))
+            if options['fail_on_regression'] and any(regressed for *_, regressed in rows):
+                raise CommandError("Performance regressed beyond the threshold.")
+
+    def pipeline_settings(self):
+        return {
+            name: getattr(settings, name) for name in (
+                'RESUME_TASK_CHUNK_SIZE', 'PDF_EXTRACTION_WORKERS', 'ZIP_MAX_MEMBERS_IN_MEMORY',
+                'LLM_MAX_IN_FLIGHT', 'RANKED_RESUME_WRITE_BATCH_SIZE', 'RANKED_RESUME_FLUSH_SECONDS',
+                'PREFILTER_TOP_K', 'GROQ_MODEL_NAME',
+            )
+        }
+
+    def run_once(self, run, zip_bytes, jd_pdf, trace_memory):
+        """
+        One upload of the ZIP, by a fresh user, against a freshly processed JD.
+        """
+        user = get_user_model().objects.create_user(
+            username=f"benchmark{run}", email=f"benchmark{run}@example.com", password='benchmark'
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        jd_started = time.perf_counter()
+        response = client.post(f"{API_PREFIX}/upload-requirements/", {
+            'pdf_file': SimpleUploadedFile('job_description.pdf', jd_pdf, content_type='application/pdf'),
+        }, format='multipart')
+        jd_seconds = time.perf_counter() - jd_started
+        if response.status_code != 201:
+            raise CommandError(f"JD upload failed ({response.status_code}): {response.content[:500]!r}")
+        job_requirement_id = response.json()['id']
+
+        collector = StageCollector(time.perf_counter)
+        add_stage_recorder(collector)
+        if trace_memory:
+            tracemalloc.start()
+        rss_before = current_rss_mb()
+        started = time.perf_counter()
+        try:
+            # Eager Celery: the whole batch is ranked before the upload returns
+            response = client.post(f"{API_PREFIX}/upload-resumes/", {
+                'job_requirement': job_requirement_id,
+                'zip_file': SimpleUploadedFile('resumes.zip', zip_bytes, content_type='application/zip'),
+            }, format='multipart')
+            total_seconds = time.perf_counter() - started
+        finally:
+            remove_stage_recorder(collector)
+            heap_peak_mb = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1) if trace_memory else None
+            if trace_memory:
+                tracemalloc.stop()
+        if response.status_code != 201:
+            raise CommandError(f"ZIP upload failed ({response.status_code}): {response.content[:500]!r}")
+        resume_batch = ResumeBatch.objects.get(id=response.json()['id'])
+
+        list_started = time.perf_counter()
+        response = client.get(f"{API_PREFIX}/batches/{resume_batch.id}/ranked-resumes/")
+        list_seconds = time.perf_counter() - list_started
+        if response.status_code != 200:
+            raise CommandError(f"Listing ranked resumes failed ({response.status_code}).")
+
+        result_times = collector.result_times(started)
+        statuses = dict.fromkeys(RankedResume.SUCCESS_STATUSES, 0)
+        for status in resume_batch.ranked_resumes.values_list('status', flat=True):
+            statuses[status] = statuses.get(status, 0) + 1
+        return {
+            'run': run,
+            'batch_status': resume_batch.status,
+            'resume_count': resume_batch.total_count,
+            'statuses': statuses,
+            'jd_seconds': round(jd_seconds, 4),
+            'total_seconds': round(total_seconds, 4),
+            'resumes_per_minute': round(resume_batch.done_count / total_seconds * 60, 2) if total_seconds else None,
+            'time_to_first_result_seconds': round(min(result_times), 4) if result_times else None,
+            'time_to_result': summarize(result_times),
+            'list_seconds': round(list_seconds, 4),
+            'stages': collector.summary(),
+            'rss_before_mb': rss_before,
+            'rss_after_mb': current_rss_mb(),
+            'heap_peak_mb': heap_peak_mb,
+        }
+
+    def aggregate_metrics(self, runs, memory):
+        """
+        Medians over the runs of the numbers worth tracking between releases.
+        """
+        def median_of(getter):
+            values = [value for value in (getter(run) for run in runs) if value is not None]
+            return round(median(values), 4) if values else None
+
+        metrics = {
+            'resumes_per_minute': metric(median_of(lambda run: run['resumes_per_minute']), 'resumes/min', 'higher'),
+            'total_seconds': metric(median_of(lambda run: run['total_seconds']), 's'),
+            'time_to_first_result_seconds': metric(median_of(lambda run: run['time_to_first_result_seconds']), 's'),
+            'time_to_result_p50_seconds': metric(median_of(lambda run: run['time_to_result'].get('p50')), 's'),
+            'time_to_result_p99_seconds': metric(median_of(lambda run: run['time_to_result'].get('p99')), 's'),
+            'list_seconds': metric(median_of(lambda run: run['list_seconds']), 's'),
+        }
+        stages = sorted({stage for run in runs for stage in run['stages']})
+        for stage in stages:
+            for statistic in ('mean', 'p95', 'total'):
+                metrics[f"stage_{stage}_{statistic}_seconds"] = metric(
+                    median_of(lambda run: run['stages'].get(stage, {}).get(statistic)), 's'
+                )
+        metrics['peak_rss_mb'] = metric(memory['peak_rss_mb'], 'MB')
+        metrics['peak_child_rss_mb'] = metric(memory['peak_child_rss_mb'], 'MB')
+        # New connections to the mock LLM server per run; pooled keep-alive connections are reused across runs
+        llm_connections = median_of(lambda run: run.get('llm_server', {}).get('connections'))
+        if llm_connections is not None:
+            metrics['llm_connections'] = metric(llm_connections, 'connections')
+        heap_peak = median_of(lambda run: run['heap_peak_mb'])
+        if heap_peak is not None:
+            metrics['heap_peak_mb'] = metric(heap_peak, 'MB')
+        return metrics
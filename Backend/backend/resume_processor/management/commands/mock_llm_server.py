@@ -0,0 +1,80 @@
+# backend/resume_processor/management/commands/mock_llm_server.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from resume_processor.mock_llm import MockLLMConfig, MockLLMServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs a local OpenAI-compatible chat completions server for load and performance tests. "
+        "Start the app with GROQ_BASE_URL=http://<host>:<port>/v1 to use it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument(
+            '--latency', default='fixed:0.2',
+            help="fixed:SECONDS, uniform:LOW:HIGH, normal:MEAN:STDDEV or lognormal:MEDIAN:SIGMA",
+        )
+        parser.add_argument('--seconds-per-output-token', type=float, default=0.0,
+                            help="Extra latency per generated token, on top of --latency")
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Share of requests answered with 429")
+        parser.add_argument('--server-error-rate', type=float, default=0.0, help="Share of requests answered with 5xx")
+        parser.add_argument('--malformed-json-rate', type=float, default=0.0,
+                            help="Share of responses whose content is truncated JSON")
+        parser.add_argument('--retry-after', type=float, default=1.0, help="Retry-After seconds sent with injected 429s")
+        parser.add_argument('--requests-per-minute', type=int, default=0, help="Per-minute request quota (0 = none)")
+        parser.add_argument('--tokens-per-minute', type=int, default=0, help="Per-minute token quota (0 = none)")
+        parser.add_argument('--seed', type=int, default=None,
+                            help="Makes injected failures and synthetic answers repeatable")
+        parser.add_argument('--record', metavar='FILE',
+                            help="Proxy requests to --upstream and append each exchange to FILE (JSONL)")
+        parser.add_argument('--upstream', default=None,
+                            help="Upstream API base URL for --record (default: GROQ_BASE_URL)")
+        parser.add_argument('--replay', metavar='FILE', help="Answer from exchanges recorded with --record")
+        parser.add_argument('--replay-latency', action='store_true',
+                            help="Wait the recorded upstream latency before each replayed response")
+        parser.add_argument('--verbose-requests', action='store_true', help="Log every request")
+
+    def handle(self, *args, **options):
+        if options['record'] and options['replay']:
+            raise CommandError("--record and --replay cannot be combined.")
+        try:
+            config = MockLLMConfig(
+                latency=options['latency'],
+                seconds_per_output_token=options['seconds_per_output_token'],
+                rate_limit_rate=options['rate_limit_rate'],
+                server_error_rate=options['server_error_rate'],
+                malformed_json_rate=options['malformed_json_rate'],
+                retry_after_seconds=options['retry_after'],
+                requests_per_minute=options['requests_per_minute'],
+                tokens_per_minute=options['tokens_per_minute'],
+                seed=options['seed'],
+                record_path=options['record'],
+                upstream_url=options['upstream'] or settings.GROQ_BASE_URL,
+                upstream_api_key=settings.GROQ_API_KEY,
+                replay_path=options['replay'],
+                replay_latency=options['replay_latency'],
+            )
+            server = MockLLMServer((options['host'], options['port']), config, verbose=options['verbose_requests'])
+        except (ValueError, OSError) as e:
+            raise CommandError(str(e))
+
+        if config.mode == 'replay':
+            self.stdout.write(f"Replaying {len(server.replay_log)} recorded exchanges from {config.replay_path}")
+        elif config.mode == 'record':
+            self.stdout.write(f"Recording exchanges with {config.upstream_url} to {config.record_path}")
+        else:
+            self.stdout.write(f"Synthetic responses, latency {config.latency}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Mock LLM server listening on {server.base_url} (stats at {server.base_url}/stats)"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(str(server.stats.snapshot()))
@@ -0,0 +1,390 @@
+# backend/resume_processor/metrics.py
+import os
+import json
+import time
+import socket
+import bisect
+import logging
+import threading
+
+from django.conf import settings
+
+# Prometheus-style metrics for the resume pipeline, served in the Prometheus
+# text format by the metrics view. Every process (the web server and each
+# Celery worker process) records into its own in-memory registry and adds the
+# increments to Redis hashes every METRICS_FLUSH_SECONDS, from a background
+# thread so that recording a metric (e.g. on the event loop) never waits on
+# Redis, and after each task, so a scrape of any web process sees the totals
+# of all of them. Gauges are
+# stored per process, with an expiry, and summed. Without Redis the endpoint
+# shows its own process only. Like event publishing, a Redis outage never
+# fails a task: increments are kept and sent with the next flush.
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY_PREFIX = "resume_processor:metrics"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+QUEUE_BUCKETS = (0.01, 0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 3600)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+# Seconds a process's gauges are kept after its last flush; a worker that died
+# stops counting towards the totals after this long
+GAUGE_TTL_SECONDS = 300
+# After a failed flush, further flushes wait this long
+FLUSH_RETRY_AFTER_SECONDS = 30
+
+def process_id():
+    # Read on every flush: Celery's prefork children import this module before forking
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def metrics_enabled():
+    return settings.METRICS_ENABLED
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in labels) + "}"
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms are kept as increments on named series
+    ("metric", "suffix|label values"), gauges as this process's current values.
+    """
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._totals = {}
+        self._gauges = {}
+        self._flush_paused_until = 0.0
+        self._flusher_pid = None
+        self._redis_client = None
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def add(self, name, field, amount):
+        with self._lock:
+            if self.redis_enabled():
+                self._pending[(name, field)] = self._pending.get((name, field), 0.0) + amount
+            self._totals[(name, field)] = self._totals.get((name, field), 0.0) + amount
+        self.ensure_flusher()
+
+    def set_gauge(self, name, field, value=None, amount=None):
+        with self._lock:
+            current = self._gauges.get((name, field), 0.0)
+            self._gauges[(name, field)] = value if value is not None else current + amount
+        self.ensure_flusher()
+
+    # Redis aggregation
+
+    def redis_enabled(self):
+        return bool(settings.METRICS_REDIS_URL)
+
+    def get_redis_client(self):
+        if self._redis_client is None:
+            import redis
+            self._redis_client = redis.Redis.from_url(
+                settings.METRICS_REDIS_URL,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+            )
+        return self._redis_client
+
+    def ensure_flusher(self):
+        """
+        Starts this process's flush thread on first use; a forked process
+        (a Celery prefork child) starts its own.
+        """
+        if self._flusher_pid == os.getpid() or not self.redis_enabled():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_periodically, name="metrics-flush", daemon=True).start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_SECONDS)
+            self.flush()
+
+    def flush(self):
+        """
+        Adds this process's pending increments to Redis and refreshes its gauges.
+        """
+        if not self.redis_enabled() or time.monotonic() < self._flush_paused_until:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            # Gauges are always sent, which also keeps them from expiring
+            gauges = dict(self._gauges)
+        if not pending and not gauges:
+            return
+        try:
+            pipe = self.get_redis_client().pipeline(transaction=False)
+            for (name, field), amount in pending.items():
+                pipe.hincrbyfloat(f"{METRICS_KEY_PREFIX}:{name}", field, amount)
+            if gauges:
+                gauge_key = f"{METRICS_KEY_PREFIX}:gauges:{process_id()}"
+                pipe.delete(gauge_key)
+                pipe.hset(gauge_key, mapping={f"{name}|{field}": value for (name, field), value in gauges.items()})
+                pipe.expire(gauge_key, GAUGE_TTL_SECONDS)
+            pipe.execute()
+        except Exception as e:
+            # Keep the increments for the next attempt
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] = self._pending.get(key, 0.0) + amount
+            self._flush_paused_until = time.monotonic() + FLUSH_RETRY_AFTER_SECONDS
+            logger.warning("Could not flush metrics to Redis, retrying in %ss: %s", FLUSH_RETRY_AFTER_SECONDS, e)
+
+    def read_series(self):
+        """
+        Returns ({(name, field): value} for counters and histograms,
+        {(name, field): value} for gauges), summed over every process.
+        """
+        if not self.redis_enabled():
+            return self.read_local_series()
+        self.flush()
+        client = self.get_redis_client()
+        pipe = client.pipeline(transaction=False)
+        names = [name for name, metric in self.metrics.items() if metric.type != "gauge"]
+        for name in names:
+            pipe.hgetall(f"{METRICS_KEY_PREFIX}:{name}")
+        series = {}
+        for name, values in zip(names, pipe.execute()):
+            for field, value in values.items():
+                series[(name, field.decode())] = float(value)
+        gauges = {}
+        for key in client.scan_iter(match=f"{METRICS_KEY_PREFIX}:gauges:*", count=100):
+            for field, value in client.hgetall(key).items():
+                name, _, labels = field.decode().partition("|")
+                gauges[(name, labels)] = gauges.get((name, labels), 0.0) + float(value)
+        return series, gauges
+
+    def read_local_series(self):
+        with self._lock:
+            return dict(self._totals), dict(self._gauges)
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        try:
+            series, gauges = self.read_series()
+        except Exception as e:
+            logger.warning("Could not read metrics from Redis, showing this process only: %s", e)
+            series, gauges = self.read_local_series()
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            lines.extend(metric.render(series, gauges))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.register(self)
+
+    def label_values(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes the labels {self.labelnames}, got {tuple(labels)}")
+        return json.dumps([str(labels[name]) for name in self.labelnames])
+
+    def labels_from(self, encoded, extra=()):
+        return list(zip(self.labelnames, json.loads(encoded))) + list(extra)
+
+    def own_series(self, values):
+        """
+        {(suffix, encoded label values): value} for this metric.
+        """
+        result = {}
+        for (name, field), value in values.items():
+            if name == self.name:
+                suffix, _, encoded = field.partition("|")
+                result[(suffix, encoded)] = value
+        return result
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if metrics_enabled():
+            REGISTRY.add(self.name, f"|{self.label_values(labels)}", amount)
+
+    def render(self, series, gauges):
+        return [
+            f"{self.name}{format_labels(self.labels_from(encoded))} {format_value(value)}"
+            for (_, encoded), value in sorted(self.own_series(series).items())
+        ]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        if not metrics_enabled():
+            return
+        encoded = self.label_values(labels)
+        # Only the bucket the value falls in is incremented; render() makes them cumulative
+        index = bisect.bisect_left(self.buckets, value)
+        bucket = format_value(self.buckets[index]) if index < len(self.buckets) else "+Inf"
+        REGISTRY.add(self.name, f"bucket:{bucket}|{encoded}", 1)
+        REGISTRY.add(self.name, f"sum|{encoded}", value)
+        REGISTRY.add(self.name, f"count|{encoded}", 1)
+
+    def render(self, series, gauges):
+        own = self.own_series(series)
+        lines = []
+        for encoded in sorted({encoded for _, encoded in own}):
+            cumulative = 0.0
+            for bucket in [format_value(bucket) for bucket in self.buckets] + ["+Inf"]:
+                cumulative += own.get((f"bucket:{bucket}", encoded), 0.0)
+                labels = format_labels(self.labels_from(encoded, [("le", bucket)]))
+                lines.append(f"{self.name}_bucket{labels} {format_value(cumulative)}")
+            labels = format_labels(self.labels_from(encoded))
+            lines.append(f"{self.name}_sum{labels} {format_value(own.get(('sum', encoded), 0.0))}")
+            lines.append(f"{self.name}_count{labels} {format_value(own.get(('count', encoded), 0.0))}")
+        return lines
+
+
+class Gauge(Metric):
+    """
+    A per-process value, summed over processes. With `collect`, the value is
+    instead computed when scraped: collect() returns {label values tuple: value}.
+    """
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), collect=None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def inc(self, amount=1, **labels):
+        if metrics_enabled():
+            REGISTRY.set_gauge(self.name, self.label_values(labels), amount=amount)
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        if metrics_enabled():
+            REGISTRY.set_gauge(self.name, self.label_values(labels), value=value)
+
+    def render(self, series, gauges):
+        if self.collect is not None:
+            values = {
+                json.dumps([str(value) for value in label_values]): value
+                for label_values, value in self.collect().items()
+            }
+        else:
+            values = {encoded: value for (name, encoded), value in gauges.items() if name == self.name}
+        return [
+            f"{self.name}{format_labels(self.labels_from(encoded))} {format_value(value)}"
+            for encoded, value in sorted(values.items())
+        ]
+
+
+def count_batches_by_status():
+    from django.db.models import Count
+    from .models import ResumeBatch
+
+    counts = {(status,): 0 for status in ('uploaded', 'extracting', 'processing')}
+    for row in ResumeBatch.objects.filter(status__in=[status for status, in counts]).values('status').annotate(
+        count=Count('id')
+    ):
+        counts[(row['status'],)] = row['count']
+    return counts
+
+
+PDF_EXTRACTION_SECONDS = Histogram(
+    "resume_processor_pdf_extraction_seconds", "Time to extract the text of one resume PDF."
+)
+ZIP_READ_SECONDS = Histogram(
+    "resume_processor_zip_read_seconds", "Time to read one resume out of an uploaded ZIP."
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "resume_processor_llm_request_seconds", "Latency of one LLM chat completion request."
+)
+LLM_QUEUE_SECONDS = Histogram(
+    "resume_processor_llm_queue_seconds", "Time an LLM request waited for the rate limit scheduler.",
+    buckets=QUEUE_BUCKETS,
+)
+LLM_TOKENS = Histogram(
+    "resume_processor_llm_tokens", "Tokens per LLM request, as reported by the provider.",
+    ["direction"], buckets=TOKEN_BUCKETS,
+)
+BATCH_QUEUE_SECONDS = Histogram(
+    "resume_processor_batch_queue_seconds", "Time from upload until a worker started on the batch.",
+    buckets=QUEUE_BUCKETS,
+)
+PERSIST_SECONDS = Histogram(
+    "resume_processor_persist_seconds", "Time to store one group of ranked resumes."
+)
+RANKED_RESUMES = Counter(
+    "resume_processor_ranked_resumes_total", "Resumes given a final result, by status.", ["status"]
+)
+LLM_ERRORS = Counter(
+    "resume_processor_llm_errors_total", "Failed LLM requests, by error class.", ["error_class"]
+)
+LLM_IN_FLIGHT = Gauge(
+    "resume_processor_llm_in_flight", "LLM requests currently being sent."
+)
+BATCHES = Gauge(
+    "resume_processor_batches", "Resume batches waiting or being worked on, by status.", ["status"],
+    collect=count_batches_by_status,
+)
+
+STAGE_HISTOGRAMS = {
+    "extract": PDF_EXTRACTION_SECONDS,
+    "unzip": ZIP_READ_SECONDS,
+    "llm": LLM_REQUEST_SECONDS,
+    "llm_wait": LLM_QUEUE_SECONDS,
+    "persist": PERSIST_SECONDS,
+}
+
+
+def record_stage_metric(stage, seconds, items):
+    """
+    Stage recorder (see instrumentation) feeding the stage histograms.
+    """
+    histogram = STAGE_HISTOGRAMS.get(stage)
+    if histogram is not None:
+        histogram.observe(seconds)
+
+
+def flush_metrics(**kwargs):
+    REGISTRY.flush()
+
+
+def render_metrics():
+    return REGISTRY.render()
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.3 on 2026-10-18 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_processor", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rankedresume",
+            name="extraction_seconds",
+            field=models.FloatField(
+                blank=True,
+                help_text="Time spent extracting text from the PDF",
+                null=True,
+            ),
+        ),
+    ]
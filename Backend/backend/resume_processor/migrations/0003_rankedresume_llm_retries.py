@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_processor", "0002_rankedresume_extraction_seconds"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rankedresume",
+            name="llm_retries",
+            field=models.IntegerField(
+                default=0, help_text="Number of LLM calls retried for this resume"
+            ),
+        ),
+        migrations.AddField(
+            model_name="rankedresume",
+            name="llm_retry_wait_seconds",
+            field=models.FloatField(
+                default=0, help_text="Time spent backing off between LLM retries"
+            ),
+        ),
+    ]
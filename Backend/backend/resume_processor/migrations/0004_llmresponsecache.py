@@ -0,0 +1,47 @@
+# Generated by Django 5.2.3 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_processor", "0003_rankedresume_llm_retries"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LLMResponseCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model_name", models.CharField(max_length=255)),
+                ("temperature", models.FloatField()),
+                (
+                    "prompt_hash",
+                    models.CharField(
+                        help_text="SHA-256 hex digest of the prompt", max_length=64
+                    ),
+                ),
+                (
+                    "response",
+                    models.JSONField(
+                        help_text="Parsed JSON response returned by the LLM"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("last_used_at", models.DateTimeField(db_index=True)),
+                ("hit_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "unique_together": {("model_name", "temperature", "prompt_hash")},
+            },
+        ),
+    ]
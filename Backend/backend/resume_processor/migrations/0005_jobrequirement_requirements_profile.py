@@ -0,0 +1,22 @@
+# Generated by Django 5.2.3 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_processor", "0004_llmresponsecache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobrequirement",
+            name="requirements_profile",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Compact requirements compiled from the JD (must-have/nice-to-have skills, seniority, domain)",
+            ),
+        ),
+    ]
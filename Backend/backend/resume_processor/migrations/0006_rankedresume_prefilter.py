@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_processor", "0005_jobrequirement_requirements_profile"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rankedresume",
+            name="prefilter_score",
+            field=models.FloatField(
+                blank=True,
+                help_text="Local lexical match score against the JD (0-100, relative to the batch)",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="rankedresume",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("extracted", "Text Extracted"),
+                    ("ranked", "Ranked Successfully"),
+                    ("failed_extraction", "Extraction Failed"),
+                    ("failed_ranking", "Ranking Failed"),
+                    ("text_too_short", "Text Too Short"),
+                    ("prefiltered_out", "Filtered Out Before Ranking"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+    ]
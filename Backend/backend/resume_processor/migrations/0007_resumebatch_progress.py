@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-18 08:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_processor", "0006_rankedresume_prefilter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resumebatch",
+            name="done_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Resumes with a final result (including failures)"
+            ),
+        ),
+        migrations.AddField(
+            model_name="resumebatch",
+            name="failed_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Resumes that could not be ranked"
+            ),
+        ),
+        migrations.AddField(
+            model_name="resumebatch",
+            name="processing_started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="resumebatch",
+            name="total_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Number of resumes found in the ZIP"
+            ),
+        ),
+    ]
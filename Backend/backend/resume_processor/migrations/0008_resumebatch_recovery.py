@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_processor", "0007_resumebatch_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resumebatch",
+            name="last_progress_at",
+            field=models.DateTimeField(
+                blank=True, help_text="Last time a resume result was stored", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="resumebatch",
+            name="requeue_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Times the batch was requeued after stalling"
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-18 08:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_processor", "0008_resumebatch_recovery"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="rankedresume",
+            options={"ordering": ["-compatibility_score", "id"]},
+        ),
+        migrations.AddIndex(
+            model_name="rankedresume",
+            index=models.Index(
+                fields=["resume_batch", "-compatibility_score", "id"],
+                name="rankedresume_batch_rank_idx",
+            ),
+        ),
+    ]
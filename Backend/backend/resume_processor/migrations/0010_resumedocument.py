@@ -0,0 +1,86 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_processor", "0009_rankedresume_rank_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resumebatch",
+            name="source_batch",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The uploaded batch whose resumes this batch re-ranks against another JD",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="reranked_batches",
+                to="resume_processor.resumebatch",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ResumeDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "file_name",
+                    models.CharField(
+                        help_text="Original filename of the resume PDF", max_length=255
+                    ),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(
+                        db_index=True,
+                        help_text="SHA-256 hex digest of the extracted text",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "compressed_text",
+                    models.BinaryField(help_text="zlib-compressed extracted text"),
+                ),
+                (
+                    "extraction_seconds",
+                    models.FloatField(
+                        blank=True,
+                        help_text="Time spent extracting text from the PDF",
+                        null=True,
+                    ),
+                ),
+                (
+                    "extracted_info",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="JSON data of extracted candidate info",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "resume_batch",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="documents",
+                        to="resume_processor.resumebatch",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("resume_batch", "file_name")},
+            },
+        ),
+    ]
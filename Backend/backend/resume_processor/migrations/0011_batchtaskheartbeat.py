@@ -0,0 +1,52 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_processor", "0010_resumedocument"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BatchTaskHeartbeat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "task_id",
+                    models.CharField(
+                        help_text="Celery task ID; a redelivered task keeps its ID",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "beat_at",
+                    models.DateTimeField(
+                        help_text="Last time the task reported it was alive"
+                    ),
+                ),
+                (
+                    "resume_batch",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_heartbeats",
+                        to="resume_processor.resumebatch",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("resume_batch", "task_id")},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_processor", "0011_batchtaskheartbeat"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resumedocument",
+            name="profile_version",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Model and prompt extracted_info was extracted with (see llm_utils.candidate_profile_version)",
+                max_length=32,
+            ),
+        ),
+    ]
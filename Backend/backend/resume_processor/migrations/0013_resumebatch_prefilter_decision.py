@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_processor", "0012_resumedocument_profile_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resumebatch",
+            name="prefilter_applied_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the prefilter decided which resumes to rank",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="resumebatch",
+            name="prefilter_scores",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Prefilter score (0-100) of every rankable resume, by file name",
+            ),
+        ),
+    ]
@@ -0,0 +1,474 @@
+# backend/resume_processor/mock_llm.py
+import json
+import math
+import time
+import random
+import hashlib
+import threading
+import urllib.error
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# A local stand-in for the OpenAI-compatible chat completions API, so the
+# pipeline can be run and measured without a Groq key. Point GROQ_BASE_URL at
+# it (see the mock_llm_server management command). Three modes:
+#
+#   synthetic  answers every prompt the app sends with plausible JSON, after a
+#              sampled latency, with optional 429/5xx/malformed-JSON injection
+#              and per-minute request/token quotas like the real provider.
+#   record     forwards requests to a real upstream and appends every
+#              request/response pair to a JSONL file.
+#   replay     answers from such a file: the same request gets the same
+#              recorded status and body (in recorded order if it was sent
+#              several times), so benchmark runs are deterministic.
+#
+# Deliberately free of Django imports, like extraction.py.
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_token_count(text):
+    return max(1, len(text or "") // CHARS_PER_TOKEN)
+
+
+def parse_latency(spec):
+    """
+    Returns a function that samples a latency in seconds from a spec string:
+      fixed:SECONDS | uniform:LOW:HIGH | normal:MEAN:STDDEV | lognormal:MEDIAN:SIGMA
+    """
+    kind, _, args = (spec or "fixed:0").partition(":")
+    try:
+        values = [float(value) for value in args.split(":")] if args else []
+        if kind == "fixed" and len(values) == 1:
+            return lambda rng: values[0]
+        if kind == "uniform" and len(values) == 2:
+            return lambda rng: rng.uniform(values[0], values[1])
+        if kind == "normal" and len(values) == 2:
+            return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+        if kind == "lognormal" and len(values) == 2:
+            return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid latency spec '{spec}'")
+
+
+def request_key(body):
+    """
+    Identifies a chat completion request by everything that affects the answer.
+    """
+    relevant = {
+        "model": body.get("model"),
+        "messages": body.get("messages"),
+        "temperature": body.get("temperature"),
+        "response_format": body.get("response_format"),
+    }
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class MockLLMConfig:
+    """
+    Behaviour of the mock server. Rates are probabilities per request.
+    """
+    def __init__(self, latency="fixed:0", seconds_per_output_token=0.0, rate_limit_rate=0.0,
+                 server_error_rate=0.0, malformed_json_rate=0.0, retry_after_seconds=1.0,
+                 requests_per_minute=0, tokens_per_minute=0, seed=None,
+                 record_path=None, upstream_url=None, upstream_api_key=None,
+                 replay_path=None, replay_latency=False):
+        self.latency = latency
+        self.sample_latency = parse_latency(latency)
+        self.seconds_per_output_token = seconds_per_output_token
+        self.rate_limit_rate = rate_limit_rate
+        self.server_error_rate = server_error_rate
+        self.malformed_json_rate = malformed_json_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.seed = seed
+        self.record_path = record_path
+        self.upstream_url = upstream_url.rstrip("/") if upstream_url else None
+        self.upstream_api_key = upstream_api_key
+        self.replay_path = replay_path
+        self.replay_latency = replay_latency
+
+    @property
+    def mode(self):
+        if self.replay_path:
+            return "replay"
+        if self.record_path:
+            return "record"
+        return "synthetic"
+
+
+class MockLLMStats:
+    """
+    Thread-safe counters, served as JSON on GET /stats.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {
+                "requests": 0, "ok": 0, "rate_limited": 0, "quota_limited": 0, "server_errors": 0,
+                "malformed_json": 0, "replay_misses": 0, "upstream_errors": 0,
+            }
+            self.connections = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.latency_seconds_total = 0.0
+            self.started_at = time.time()
+
+    def add(self, outcome, prompt_tokens=0, completion_tokens=0, latency=0.0):
+        with self._lock:
+            self.counts["requests"] += 1
+            self.counts[outcome] += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.latency_seconds_total += latency
+
+    def add_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                **self.counts,
+                # New TCP connections; fewer than requests means clients reuse keep-alive connections
+                "connections": self.connections,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens,
+                "mean_latency_seconds": round(self.latency_seconds_total / self.counts["requests"], 4)
+                if self.counts["requests"] else 0.0,
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+            }
+
+
+class QuotaWindow:
+    """
+    Per-minute request and token quotas, enforced like the provider's: once a
+    limit is reached, requests get 429 until the minute is over.
+    """
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._requests = 0
+        self._tokens = 0
+
+    def admit(self, tokens):
+        """
+        Returns 0 if the request is admitted, otherwise seconds until the window resets.
+        """
+        if not self.requests_per_minute and not self.tokens_per_minute:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 60:
+                self._window_start, self._requests, self._tokens = now, 0, 0
+            over_requests = self.requests_per_minute and self._requests + 1 > self.requests_per_minute
+            over_tokens = self.tokens_per_minute and self._tokens + tokens > self.tokens_per_minute
+            if over_requests or over_tokens:
+                return max(0.001, 60 - (now - self._window_start))
+            self._requests += 1
+            self._tokens += tokens
+            return 0
+
+
+class ReplayLog:
+    """
+    Recorded exchanges keyed by request_key. Repeated requests are answered
+    with their recordings in order; the last one is reused once they run out.
+    """
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._exchanges = {}
+        with open(path, encoding="utf-8") as recording:
+            for line in recording:
+                if line.strip():
+                    exchange = json.loads(line)
+                    self._exchanges.setdefault(exchange["key"], deque()).append(exchange)
+
+    def __len__(self):
+        return sum(len(exchanges) for exchanges in self._exchanges.values())
+
+    def next(self, key):
+        with self._lock:
+            exchanges = self._exchanges.get(key)
+            if not exchanges:
+                return None
+            return exchanges.popleft() if len(exchanges) > 1 else exchanges[0]
+
+
+# ---------------------------------------------------------------------------
+# Synthetic answers for the prompts sent by llm_utils
+# ---------------------------------------------------------------------------
+
+SKILL_POOL = [
+    "Python", "Django", "Celery", "PostgreSQL", "Redis", "Docker", "Kubernetes", "AWS", "React",
+    "TypeScript", "Java", "Spring Boot", "SQL", "Pandas", "Machine Learning", "Go", "CI/CD", "REST APIs",
+]
+NAME_POOL = ["Jane Doe", "John Smith", "Priya Patel", "Wei Chen", "Maria Garcia", "Ahmed Khan", "Olga Ivanova"]
+
+
+def synthetic_content(prompt, rng):
+    """
+    Builds a plausible JSON answer for the kind of prompt llm_utils sent.
+    """
+    if '"JobTitle"' in prompt:
+        return {"JobTitle": rng.choice(["Software Engineer", "Backend Developer", "Data Scientist"])}
+    if '"MustHaveSkills"' in prompt and '"CompatibilityScore"' not in prompt:
+        return {
+            "MustHaveSkills": rng.sample(SKILL_POOL, 4),
+            "NiceToHaveSkills": rng.sample(SKILL_POOL, 3),
+            "Seniority": rng.choice(["Junior", "Mid", "Senior"]),
+            "MinYearsOfExperience": str(rng.randint(1, 8)),
+            "Domain": rng.choice(["FinTech", "E-commerce", "Healthcare"]),
+        }
+    ranking_analysis = {
+        "CompatibilityScore": rng.randint(0, 100),
+        "Strengths": [f"Experience with {skill}" for skill in rng.sample(SKILL_POOL, 3)],
+    }
+    name = rng.choice(NAME_POOL)
+    extracted_info = {
+        "Name": name,
+        "Email": name.lower().replace(" ", ".") + "@example.com",
+        "Phone": f"+1 555 {rng.randint(1000000, 9999999)}",
+        "Location": rng.choice(["Berlin", "London", "New York", "Remote"]),
+        "JobTitles": [rng.choice(["Software Engineer", "Developer", "Analyst"])],
+        "Companies": [rng.choice(["Acme", "Globex", "Initech"])],
+        "YearsOfExperience": f"{rng.randint(1, 15)} years",
+        "Skills": rng.sample(SKILL_POOL, 6),
+        "Degree": ["B.Sc. Computer Science"],
+        "GraduationYears": [str(rng.randint(2000, 2022))],
+        "EducationalInstitutions": ["State University"],
+        "Highlights": ["Led a migration to microservices"],
+    }
+    if '"extracted_info"' in prompt:
+        return {"extracted_info": extracted_info, "ranking_analysis": ranking_analysis}
+    if '"CompatibilityScore"' in prompt:
+        return ranking_analysis
+    return extracted_info
+
+
+def completion_body(model, content_text, prompt_tokens, completion_tokens):
+    return {
+        "id": f"chatcmpl-mock-{random.getrandbits(48):012x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": content_text},
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def error_body(message, error_type):
+    return {"error": {"message": message, "type": error_type}}
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    server_version = "MockLLM/1.0"
+    # Keep-alive, like the real endpoint; every response carries a Content-Length
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.stats.add_connection()
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status, body, headers=None):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self.send_json(200, self.server.stats.snapshot())
+        elif self.path.rstrip("/").endswith("/models"):
+            self.send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+        else:
+            self.send_json(404, error_body("Not found", "invalid_request_error"))
+
+    def do_POST(self):
+        if self.path.rstrip("/").endswith("/stats/reset"):
+            self.server.stats.reset()
+            self.send_json(200, self.server.stats.snapshot())
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_json(404, error_body("Not found", "invalid_request_error"))
+            return
+        raw_body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            body = json.loads(raw_body)
+        except json.JSONDecodeError:
+            self.send_json(400, error_body("Request body is not valid JSON", "invalid_request_error"))
+            return
+
+        mode = self.server.config.mode
+        if mode == "replay":
+            self.replay(body)
+        elif mode == "record":
+            self.record(body, raw_body)
+        else:
+            self.synthesize(body)
+
+    def synthesize(self, body):
+        config, stats = self.server.config, self.server.stats
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        prompt_tokens = estimate_token_count(prompt)
+        rng = self.server.rng_for(prompt)
+
+        retry_after = self.server.quota.admit(prompt_tokens)
+        if retry_after:
+            stats.add("quota_limited")
+            self.send_json(429, error_body("Rate limit reached (mock quota)", "rate_limit_exceeded"),
+                           {"retry-after": f"{retry_after:.3f}"})
+            return
+
+        roll = self.server.rng.random()
+        if roll < config.rate_limit_rate:
+            stats.add("rate_limited")
+            self.send_json(429, error_body("Rate limit reached (injected)", "rate_limit_exceeded"),
+                           {"retry-after": str(config.retry_after_seconds)})
+            return
+        roll -= config.rate_limit_rate
+        if roll < config.server_error_rate:
+            stats.add("server_errors")
+            self.send_json(self.server.rng.choice([500, 502, 503]), error_body("Injected server error", "server_error"))
+            return
+        roll -= config.server_error_rate
+
+        content_text = json.dumps(synthetic_content(prompt, rng))
+        outcome = "ok"
+        if roll < config.malformed_json_rate:
+            # Cut the JSON short, like a model that ran out of tokens mid-object
+            content_text = content_text[:max(1, len(content_text) // 2)]
+            outcome = "malformed_json"
+        completion_tokens = estimate_token_count(content_text)
+        latency = config.sample_latency(self.server.rng) + completion_tokens * config.seconds_per_output_token
+        time.sleep(latency)
+        stats.add(outcome, prompt_tokens, completion_tokens, latency)
+        self.send_json(200, completion_body(body.get("model", "mock"), content_text, prompt_tokens, completion_tokens))
+
+    def record(self, body, raw_body):
+        config, stats = self.server.config, self.server.stats
+        request = urllib.request.Request(
+            f"{config.upstream_url}/chat/completions",
+            data=raw_body,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": self.headers.get("Authorization") or f"Bearer {config.upstream_api_key}",
+            },
+            method="POST",
+        )
+        started = time.monotonic()
+        try:
+            with urllib.request.urlopen(request, timeout=120) as upstream:
+                status, response_body, headers = upstream.status, upstream.read(), dict(upstream.headers)
+        except urllib.error.HTTPError as e:
+            status, response_body, headers = e.code, e.read(), dict(e.headers)
+        except (urllib.error.URLError, OSError) as e:
+            stats.add("upstream_errors")
+            self.send_json(502, error_body(f"Upstream request failed: {e}", "server_error"))
+            return
+        latency = time.monotonic() - started
+
+        exchange = {
+            "key": request_key(body),
+            "request": body,
+            "status": status,
+            "response": response_body.decode("utf-8", errors="replace"),
+            "retry_after": headers.get("retry-after") or headers.get("Retry-After"),
+            "latency_seconds": round(latency, 4),
+        }
+        with self.server.record_lock, open(config.record_path, "a", encoding="utf-8") as recording:
+            recording.write(json.dumps(exchange) + "\n")
+
+        usage = {}
+        if status == 200:
+            try:
+                usage = json.loads(response_body).get("usage") or {}
+            except json.JSONDecodeError:
+                pass
+        stats.add("ok" if status == 200 else "rate_limited" if status == 429 else "server_errors",
+                  usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), latency)
+        self.send_json(status, response_body, {"retry-after": exchange["retry_after"]} if exchange["retry_after"] else None)
+
+    def replay(self, body):
+        config, stats = self.server.config, self.server.stats
+        exchange = self.server.replay_log.next(request_key(body))
+        if exchange is None:
+            stats.add("replay_misses")
+            # 400 is not retried by the client, so a missing recording fails fast
+            self.send_json(400, error_body("No recorded response for this request", "invalid_request_error"))
+            return
+        latency = exchange.get("latency_seconds", 0.0) if config.replay_latency else 0.0
+        time.sleep(latency)
+        usage = {}
+        if exchange["status"] == 200:
+            try:
+                usage = json.loads(exchange["response"]).get("usage") or {}
+            except json.JSONDecodeError:
+                pass
+        status = exchange["status"]
+        stats.add("ok" if status == 200 else "rate_limited" if status == 429 else "server_errors",
+                  usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), latency)
+        self.send_json(status, exchange["response"].encode("utf-8"),
+                       {"retry-after": exchange["retry_after"]} if exchange.get("retry_after") else None)
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config, verbose=False):
+        super().__init__(address, MockLLMHandler)
+        self.config = config
+        self.verbose = verbose
+        self.stats = MockLLMStats()
+        self.quota = QuotaWindow(config.requests_per_minute, config.tokens_per_minute)
+        self.rng = random.Random(config.seed)
+        self.record_lock = threading.Lock()
+        self.replay_log = ReplayLog(config.replay_path) if config.replay_path else None
+
+    def rng_for(self, prompt):
+        """
+        With a seed, the answer to a prompt is the same on every run.
+        """
+        if self.config.seed is None:
+            return random.Random()
+        return random.Random(f"{self.config.seed}:{prompt}")
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_mock_llm_server(config=None, host="127.0.0.1", port=0, verbose=False):
+    """
+    Starts the mock server on a background thread and returns it; port 0 picks
+    a free port (see server.base_url). Stop it with server.shutdown().
+    """
+    server = MockLLMServer((host, port), config or MockLLMConfig(), verbose=verbose)
+    threading.Thread(target=server.serve_forever, name="mock-llm", daemon=True).start()
+    return server
@@ -4,6 +4,11 @@ from django.db import models
 # backend/resume_processor/models.py
 from django.db import models
 from django.conf import settings # Import settings to reference AUTH_USER_MODEL
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.utils import timezone
+import zlib
+import hashlib
 
 class JobRequirement(models.Model):
     """
@@ -16,6 +21,10 @@ class JobRequirement(models.Model):
     )
     title = models.CharField(max_length=255, blank=True, null=True, help_text="Extracted or manually entered job title")
     description_text = models.TextField(blank=True, null=True, help_text="Extracted text from the PDF")
+    requirements_profile = models.JSONField(
+        default=dict, blank=True,
+        help_text="Compact requirements compiled from the JD (must-have/nice-to-have skills, seniority, domain)"
+    )
     pdf_file = models.FileField(upload_to='requirements_pdfs/', help_text="The original uploaded PDF file")
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
@@ -65,9 +74,122 @@ class ResumeBatch(models.Model):
     # Celery task ID for the batch processing
     processing_task_id = models.CharField(max_length=255, blank=True, null=True)
 
+    # Live progress, updated atomically as each resume's result is stored
+    total_count = models.PositiveIntegerField(default=0, help_text="Number of resumes found in the ZIP")
+    done_count = models.PositiveIntegerField(default=0, help_text="Resumes with a final result (including failures)")
+    failed_count = models.PositiveIntegerField(default=0, help_text="Resumes that could not be ranked")
+    processing_started_at = models.DateTimeField(blank=True, null=True)
+
+    # Crash recovery: batches whose running task stopped sending heartbeats (see
+    # BatchTaskHeartbeat) are requeued
+    last_progress_at = models.DateTimeField(blank=True, null=True, help_text="Last time a resume result was stored")
+    requeue_count = models.PositiveIntegerField(default=0, help_text="Times the batch was requeued after stalling")
+    # The prefilter's decisions, kept so a resumed batch neither re-runs it nor loses the selected resumes' scores
+    prefilter_applied_at = models.DateTimeField(blank=True, null=True, help_text="When the prefilter decided which resumes to rank")
+    prefilter_scores = models.JSONField(default=dict, blank=True, help_text="Prefilter score (0-100) of every rankable resume, by file name")
+
+    # Re-ranking: a batch created from an earlier upload shares its ZIP and stored resume documents
+    source_batch = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        blank=True, null=True,
+        related_name='reranked_batches',
+        help_text="The uploaded batch whose resumes this batch re-ranks against another JD"
+    )
+
+    @property
+    def document_batch_id(self):
+        """
+        Id of the batch the extracted ResumeDocuments of this batch's ZIP are stored under.
+        """
+        return self.source_batch_id or self.id
+
+    def recount_progress(self):
+        """
+        Rebuilds the progress counters from the stored results, e.g. when a
+        batch is resumed after a crash.
+        """
+        finished = self.ranked_resumes.exclude(status__in=RankedResume.UNFINISHED_STATUSES)
+        self.done_count = finished.count()
+        self.failed_count = finished.exclude(status__in=RankedResume.SUCCESS_STATUSES).count()
+
+    @property
+    def eta_seconds(self):
+        """
+        Estimated seconds until the batch is done, extrapolated from the pace so far.
+        """
+        if self.status not in ('extracting', 'processing') or not self.processing_started_at or not self.done_count:
+            return None
+        elapsed = (timezone.now() - self.processing_started_at).total_seconds()
+        remaining = max(self.total_count - self.done_count, 0)
+        return round(elapsed / self.done_count * remaining, 1)
+
     def __str__(self):
         return f"Resume Batch for {self.job_requirement.title or 'N/A'} by {self.user.username} ({self.uploaded_at.strftime('%Y-%m-%d')})"
 
+class ResumeDocument(models.Model):
+    """
+    The text extracted from one resume of an uploaded ZIP, stored once (zlib
+    compressed) so the resume can be ranked again, e.g. against another JD,
+    without re-reading and re-parsing the PDF. extracted_info holds the
+    JD-independent candidate details.
+    """
+    resume_batch = models.ForeignKey(
+        ResumeBatch,
+        on_delete=models.CASCADE,
+        related_name='documents'
+    )
+    file_name = models.CharField(max_length=255, help_text="Original filename of the resume PDF")
+    content_hash = models.CharField(max_length=64, db_index=True, help_text="SHA-256 hex digest of the extracted text")
+    compressed_text = models.BinaryField(help_text="zlib-compressed extracted text")
+    extraction_seconds = models.FloatField(blank=True, null=True, help_text="Time spent extracting text from the PDF")
+    extracted_info = models.JSONField(default=dict, blank=True, help_text="JSON data of extracted candidate info")
+    profile_version = models.CharField(
+        max_length=32, blank=True, default='',
+        help_text="Model and prompt extracted_info was extracted with (see llm_utils.candidate_profile_version)"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('resume_batch', 'file_name')
+
+    @staticmethod
+    def hash_text(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def compress_text(text):
+        return zlib.compress(text.encode('utf-8'))
+
+    @property
+    def text(self):
+        return zlib.decompress(bytes(self.compressed_text)).decode('utf-8')
+
+    def __str__(self):
+        return f"{self.file_name} ({len(self.compressed_text)} bytes compressed)"
+
+class BatchTaskHeartbeat(models.Model):
+    """
+    Liveness of a task (the batch coordinator or a chunk) while it works on a
+    batch. The running task refreshes beat_at and deletes the row when it
+    finishes, so a stale row means the task died; chunks still waiting in the
+    queue have no row at all.
+    """
+    resume_batch = models.ForeignKey(
+        ResumeBatch,
+        on_delete=models.CASCADE,
+        related_name='task_heartbeats'
+    )
+    task_id = models.CharField(max_length=255, help_text="Celery task ID; a redelivered task keeps its ID")
+    beat_at = models.DateTimeField(help_text="Last time the task reported it was alive")
+
+    class Meta:
+        unique_together = ('resume_batch', 'task_id')
+
+    def __str__(self):
+        return f"Task {self.task_id} of batch {self.resume_batch_id} at {self.beat_at}"
+
+
 class RankedResume(models.Model):
     """
     Stores the extracted information and ranking analysis for each resume
@@ -87,7 +209,8 @@ class RankedResume(models.Model):
         ('ranked', 'Ranked Successfully'),
         ('failed_extraction', 'Extraction Failed'),
         ('failed_ranking', 'Ranking Failed'),
-        ('text_too_short', 'Text Too Short')
+        ('text_too_short', 'Text Too Short'),
+        ('prefiltered_out', 'Filtered Out Before Ranking')
     ]
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
 
@@ -99,9 +222,83 @@ class RankedResume(models.Model):
     candidate_name = models.CharField(max_length=255, blank=True, null=True)
     candidate_email = models.EmailField(max_length=255, blank=True, null=True)
 
+    # Processing metrics
+    extraction_seconds = models.FloatField(blank=True, null=True, help_text="Time spent extracting text from the PDF")
+    llm_retries = models.IntegerField(default=0, help_text="Number of LLM calls retried for this resume")
+    llm_retry_wait_seconds = models.FloatField(default=0, help_text="Time spent backing off between LLM retries")
+    prefilter_score = models.FloatField(blank=True, null=True, help_text="Local lexical match score against the JD (0-100, relative to the batch)")
+
     class Meta:
-        ordering = ['-compatibility_score']
+        # id breaks ties between equal scores, so the order is stable across pages
+        ordering = ['-compatibility_score', 'id']
         unique_together = ('resume_batch', 'file_name')
+        indexes = [
+            # Serves a batch's results in ranking order straight from the index
+            # (keyset pagination and top-N), without sorting the whole batch
+            models.Index(fields=['resume_batch', '-compatibility_score', 'id'], name='rankedresume_batch_rank_idx'),
+        ]
+
+    # Final statuses that are not counted as failures in ResumeBatch.failed_count
+    SUCCESS_STATUSES = ('ranked', 'prefiltered_out')
+    # Every other status is final: the resume is skipped when a batch is resumed
+    UNFINISHED_STATUSES = ('pending', 'extracted')
+
+    # Columns rewritten when a result for an existing (resume_batch, file_name) row is stored again
+    RESULT_FIELDS = (
+        'status', 'extracted_info', 'ranking_analysis',
+        'compatibility_score', 'candidate_name', 'candidate_email',
+        'extraction_seconds', 'llm_retries', 'llm_retry_wait_seconds', 'prefilter_score',
+    )
+
+    @classmethod
+    def from_result(cls, resume_batch, result):
+        """
+        Builds an unsaved row from a per-resume result dictionary. The promoted
+        score/name/email columns are filled here, since bulk writes bypass save().
+        """
+        extracted_info = result.get('extracted_info') or {}
+        ranking_analysis = result.get('ranking_analysis') or {}
+        try:
+            compatibility_score = int(result.get('compatibility_score', ranking_analysis.get('CompatibilityScore', 0)))
+        except (ValueError, TypeError):
+            compatibility_score = 0
+        status = result.get('status', 'failed_ranking')
+        if status not in dict(cls.STATUS_CHOICES):
+            # e.g. "Error: ..." from an unexpected exception; one over-long value
+            # would otherwise fail the whole bulk write
+            status = 'failed_ranking'
+        # Name and email come from LLM output, so they are fitted to their columns
+        candidate_name = result.get('candidate_name', extracted_info.get('Name', 'N/A'))
+        candidate_name = cls.fit_to_column('candidate_name', candidate_name)
+        candidate_email = cls.fit_to_column('candidate_email', result.get('candidate_email', extracted_info.get('Email')))
+        try:
+            validate_email(candidate_email)
+        except ValidationError:
+            candidate_email = ''
+        return cls(
+            resume_batch=resume_batch,
+            file_name=result.get('file_name', 'unknown_file.pdf'),
+            status=status,
+            extracted_info=extracted_info,
+            ranking_analysis=ranking_analysis,
+            compatibility_score=compatibility_score,
+            candidate_name=candidate_name,
+            candidate_email=candidate_email,
+            extraction_seconds=result.get('extraction_seconds'),
+            llm_retries=result.get('llm_retries', 0),
+            llm_retry_wait_seconds=result.get('llm_retry_wait_seconds', 0),
+            prefilter_score=result.get('prefilter_score'),
+        )
+
+    @classmethod
+    def fit_to_column(cls, field_name, value):
+        """
+        `value` as a string no longer than the column, so a single over-long
+        value cannot fail the bulk write of the rows around it.
+        """
+        if value is None:
+            return ''
+        return str(value).strip()[:cls._meta.get_field(field_name).max_length]
 
     def __str__(self):
         return f"{self.candidate_name or self.file_name} - Score: {self.compatibility_score}"
@@ -117,3 +314,24 @@ class RankedResume(models.Model):
 
         super().save(*args, **kwargs)
 
+
+class LLMResponseCache(models.Model):
+    """
+    Content-addressed cache of parsed LLM responses, keyed on the model name,
+    temperature and a SHA-256 hash of the prompt. Entries expire after
+    LLM_CACHE_TTL_SECONDS and the least recently used ones are evicted beyond
+    LLM_CACHE_MAX_ENTRIES.
+    """
+    model_name = models.CharField(max_length=255)
+    temperature = models.FloatField()
+    prompt_hash = models.CharField(max_length=64, help_text="SHA-256 hex digest of the prompt")
+    response = models.JSONField(help_text="Parsed JSON response returned by the LLM")
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(db_index=True)
+    hit_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('model_name', 'temperature', 'prompt_hash')
+
+    def __str__(self):
+        return f"{self.model_name}@{self.temperature} {self.prompt_hash[:12]} ({self.hit_count} hits)"
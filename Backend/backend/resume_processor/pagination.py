@@ -0,0 +1,102 @@
+# backend/resume_processor/pagination.py
+import json
+import math
+import base64
+import binascii
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# Cursor values are compared against database columns, so they must fit a
+# signed 64-bit integer
+CURSOR_VALUE_MAX = 2 ** 63 - 1
+
+
+class RankedResumeKeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over ranked resumes in ranking order,
+    (compatibility_score DESC, id ASC).
+
+    The cursor is the (score, id) of the last row on the previous page, so each
+    page is one index range scan on rankedresume_batch_rank_idx: no COUNT(*) and
+    no OFFSET, and page 1000 costs the same as page 1. Rows ranked while the
+    client is paging are never skipped or shown twice.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 25
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, page_size))
+        except ValueError:
+            pass
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, resume):
+        position = json.dumps([resume.compatibility_score, resume.id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            score, resume_id = json.loads(position)
+            if isinstance(score, bool) or not isinstance(score, (int, float)) or not math.isfinite(score):
+                raise ValueError('score')
+            if isinstance(resume_id, bool) or not isinstance(resume_id, int):
+                raise ValueError('id')
+            score = int(score)
+            if abs(score) > CURSOR_VALUE_MAX or not 0 < resume_id <= CURSOR_VALUE_MAX:
+                raise ValueError('out of range')
+            return score, resume_id
+        except (binascii.Error, ValueError, TypeError, OverflowError):
+            raise NotFound('Invalid cursor.')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by('-compatibility_score', 'id')
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            score, resume_id = position
+            queryset = queryset.filter(
+                Q(compatibility_score__lt=score) | Q(compatibility_score=score, id__gt=resume_id)
+            )
+
+        # One extra row tells whether there is a next page
+        results = list(queryset[:page_size + 1])
+        self.has_next = len(results) > page_size
+        self.page = results[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
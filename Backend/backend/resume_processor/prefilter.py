@@ -0,0 +1,127 @@
+# backend/resume_processor/prefilter.py
+import re
+import math
+import heapq
+from collections import Counter
+
+# Local lexical scoring (Okapi BM25) used to decide which resumes are worth an
+# LLM call. Plain Python over term-frequency Counters scores a few thousand
+# resumes in well under a second, so no numeric dependencies are needed.
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Keeps tokens such as "c++", "c#", "node.js" and ".net" intact
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*|\.net")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the
+their this to we will with you your who what when where which while
+""".split())
+
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        token = token.rstrip(".")
+        if len(token) > 1 and token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def build_prefilter_query(job_description, requirements_profile=None):
+    """
+    Query text for the prefilter: the full JD, with the must-have skills from
+    the compiled requirements profile repeated so they weigh more.
+    """
+    parts = [job_description or ""]
+    if requirements_profile:
+        must_have = requirements_profile.get("MustHaveSkills") or []
+        nice_to_have = requirements_profile.get("NiceToHaveSkills") or []
+        if isinstance(must_have, list):
+            parts.extend(str(skill) for skill in must_have * 2)
+        if isinstance(nice_to_have, list):
+            parts.extend(str(skill) for skill in nice_to_have)
+    return "\n".join(parts)
+
+
+def query_terms(query_text):
+    """
+    The query's terms and how often each occurs in it.
+    """
+    return Counter(tokenize(query_text))
+
+
+def document_term_counts(text, query):
+    """
+    All BM25 needs to know about a document: its length in terms and how often
+    each query term occurs in it. Keeping only this, not the text, lets a batch
+    be scored in memory that does not grow with the size of its resumes.
+    """
+    tokens = tokenize(text)
+    return len(tokens), Counter(token for token in tokens if token in query)
+
+
+def bm25_scores_from_counts(query, documents, k1=BM25_K1, b=BM25_B):
+    """
+    BM25 scores from document_term_counts() results, in order.
+    """
+    if not documents:
+        return []
+    avg_length = (sum(length for length, _ in documents) / len(documents)) or 1.0
+
+    document_frequency = Counter()
+    for _, terms in documents:
+        document_frequency.update(terms.keys())
+
+    n_docs = len(documents)
+    idf = {
+        term: math.log(1 + (n_docs - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+        for term in query if document_frequency[term]
+    }
+
+    scores = []
+    for length, terms in documents:
+        norm = k1 * (1 - b + b * length / avg_length)
+        score = 0.0
+        for term, weight in idf.items():
+            tf = terms.get(term)
+            if tf:
+                score += query[term] * weight * tf * (k1 + 1) / (tf + norm)
+        scores.append(score)
+    return scores
+
+
+def bm25_scores(query_text, documents, k1=BM25_K1, b=BM25_B):
+    """
+    Returns the BM25 score of every document against the query, in order.
+    Query terms are weighted by how often they occur in the query.
+    """
+    query = query_terms(query_text)
+    return bm25_scores_from_counts(query, [document_term_counts(document, query) for document in documents], k1, b)
+
+
+def select_resumes(raw_scores, top_k=0, min_score=0):
+    """
+    Normalises raw scores to 0-100 relative to the best resume in the batch and
+    picks the ones to send to the LLM: those within the top_k (when top_k > 0)
+    that score at least min_score (when min_score > 0).
+    Returns (scores, selected_indices).
+    """
+    best = max(raw_scores, default=0.0)
+    scores = [round(100.0 * score / best, 2) if best > 0 else 0.0 for score in raw_scores]
+
+    selected = set(range(len(scores)))
+    if top_k > 0:
+        selected = set(heapq.nlargest(top_k, selected, key=scores.__getitem__))
+    if min_score > 0:
+        selected = {index for index in selected if scores[index] >= min_score}
+    return scores, selected
+
+
+def prefilter_resumes(query_text, resume_texts, top_k=0, min_score=0):
+    """
+    Scores resumes against the query and picks the ones to send to the LLM
+    (see select_resumes). Returns (scores, selected_indices).
+    """
+    return select_resumes(bm25_scores(query_text, resume_texts), top_k, min_score)
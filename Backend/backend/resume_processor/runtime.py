@@ -0,0 +1,113 @@
+# backend/resume_processor/runtime.py
+import os
+import asyncio
+import logging
+import threading
+
+# One long-lived event loop per worker process, running in a dedicated thread.
+# Celery tasks are synchronous; they hand their coroutines to this loop with
+# run_coroutine() and block until the result is ready. Because the loop outlives
+# the tasks, so does everything bound to it: the LLM client's pool of keep-alive
+# connections (no new TLS handshake per task) and the LLM scheduler's rate limit state.
+#
+# The loop is started by worker_process_init, or on first use (eager mode, the
+# solo pool), and stopped by worker_process_shutdown / worker_shutdown once the
+# registered shutdown callbacks, e.g. closing the connection pool, have run.
+# A forked child never uses its parent's loop; it starts its own.
+#
+# The caller's contextvars (log context, LLM cache bypass) are carried over to
+# the coroutine. Deliberately free of Django imports, like extraction.py.
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_loop = None
+_thread = None
+_loop_pid = None
+_shutdown_callbacks = []
+
+
+def add_shutdown_callback(callback):
+    """
+    Registers a coroutine function to be awaited on the loop when the runtime stops.
+    """
+    if callback not in _shutdown_callbacks:
+        _shutdown_callbacks.append(callback)
+
+
+def start_async_runtime(**kwargs):
+    """
+    Starts this process's loop thread unless it is already running, and returns
+    the loop. Extra keyword arguments (from Celery signals) are ignored.
+    """
+    global _loop, _thread, _loop_pid
+    with _lock:
+        if _loop is not None and _loop_pid == os.getpid() and _thread.is_alive():
+            return _loop
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def serve():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(started.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=serve, name="resume-processor-loop", daemon=True)
+        thread.start()
+        started.wait()
+        _loop, _thread, _loop_pid = loop, thread, os.getpid()
+        return loop
+
+
+def run_coroutine(coro, timeout=None):
+    """
+    Runs `coro` on the runtime loop and returns its result (or raises its
+    exception). If the wait times out or is interrupted, e.g. by a Celery time
+    limit, the coroutine is cancelled rather than left running.
+    """
+    loop = start_async_runtime()
+    if threading.current_thread() is _thread:
+        coro.close()
+        raise RuntimeError("run_coroutine() cannot be called from the runtime's own loop.")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()
+        raise
+
+
+async def _shutdown():
+    for callback in _shutdown_callbacks:
+        try:
+            await callback()
+        except Exception as e:
+            logger.warning("Async runtime shutdown callback %s failed: %s", getattr(callback, "__name__", callback), e)
+    current = asyncio.current_task()
+    pending = [task for task in asyncio.all_tasks() if task is not current]
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    await asyncio.get_running_loop().shutdown_asyncgens()
+
+
+def stop_async_runtime(timeout=30, **kwargs):
+    """
+    Runs the shutdown callbacks, cancels whatever is still running on the loop
+    and stops its thread. Safe to call more than once; extra keyword arguments
+    (from Celery signals) are ignored.
+    """
+    global _loop, _thread, _loop_pid
+    with _lock:
+        loop, thread = _loop, _thread
+        if loop is None or _loop_pid != os.getpid():
+            return
+        _loop = _thread = _loop_pid = None
+    try:
+        asyncio.run_coroutine_threadsafe(_shutdown(), loop).result(timeout)
+    except Exception as e:
+        logger.warning("Async runtime did not shut down cleanly: %s", e)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout)
+    if not thread.is_alive():
+        loop.close()
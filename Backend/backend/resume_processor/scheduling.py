@@ -0,0 +1,90 @@
+# backend/resume_processor/scheduling.py
+from django.conf import settings
+from django.db.models import F, Sum
+
+from .models import ResumeBatch
+
+# Scheduling layer for the processing tasks.
+#
+# Lanes: JD processing (and other short tasks) run on the "interactive" queue,
+# resume batches on the "bulk" queue (see CELERY_TASK_ROUTES), so a dedicated
+# `-Q interactive` worker keeps JDs moving however much bulk work is queued.
+#
+# Fair share: within the bulk lane, each chunk of a batch gets a broker
+# priority from its owner's virtual time (resumes already queued for that user,
+# divided by the user's weight). A user's first chunks always go out at the top
+# priority, while the tail of a very large batch sinks, so a small batch
+# uploaded later is started right away instead of waiting behind it.
+# With Redis, priority 0 is served first and PRIORITY_LOWEST last.
+
+PRIORITY_HIGHEST = 0
+PRIORITY_LOWEST = 9
+
+ACTIVE_BATCH_STATUSES = ('uploaded', 'extracting', 'processing')
+
+
+def get_user_weight(user):
+    return max(float(settings.FAIR_SHARE_USER_WEIGHTS.get(user.get_username(), 1)), 0.01)
+
+
+def get_user_backlog(user, exclude_batch_id=None):
+    """
+    Number of resumes still waiting to be processed across the user's active batches.
+    """
+    batches = ResumeBatch.objects.filter(user=user, status__in=ACTIVE_BATCH_STATUSES)
+    if exclude_batch_id is not None:
+        batches = batches.exclude(id=exclude_batch_id)
+    backlog = batches.aggregate(remaining=Sum(F('total_count') - F('done_count')))['remaining']
+    return max(backlog or 0, 0)
+
+
+def fair_share_priority(queued_resumes, weight):
+    """
+    Broker priority for work that has `queued_resumes` of the same user ahead of it.
+    """
+    virtual_time = queued_resumes / weight
+    step = int(virtual_time // settings.FAIR_SHARE_RESUMES_PER_PRIORITY_STEP)
+    return min(PRIORITY_HIGHEST + step, PRIORITY_LOWEST)
+
+
+def chunk_priorities(resume_batch, chunk_sizes):
+    """
+    Priorities for the chunks of a batch, in dispatch order.
+    """
+    weight = get_user_weight(resume_batch.user)
+    queued = get_user_backlog(resume_batch.user, exclude_batch_id=resume_batch.id)
+    priorities = []
+    for size in chunk_sizes:
+        priorities.append(fair_share_priority(queued, weight))
+        queued += size
+    return priorities
+
+
+def submit_job_requirement(job_requirement):
+    """
+    Queues JD processing at the top priority of the interactive lane.
+    """
+    from .tasks import process_job_requirement_pdf
+    return process_job_requirement_pdf.apply_async(args=[job_requirement.id], priority=PRIORITY_HIGHEST)
+
+
+def submit_resume_batch(resume_batch, **kwargs):
+    """
+    Queues a resume batch on the bulk lane, behind the owner's other outstanding work.
+    """
+    from .tasks import process_resume_batch_zip
+    weight = get_user_weight(resume_batch.user)
+    priority = fair_share_priority(get_user_backlog(resume_batch.user, exclude_batch_id=resume_batch.id), weight)
+    return process_resume_batch_zip.apply_async(args=[resume_batch.id], kwargs=kwargs, priority=priority)
+
+
+def submit_rerank(source_batch, resume_batches):
+    """
+    Queues re-ranking of source_batch's resumes as the given new batches, on the bulk lane.
+    """
+    from .tasks import rerank_resume_batch
+    weight = get_user_weight(source_batch.user)
+    priority = fair_share_priority(get_user_backlog(source_batch.user), weight)
+    return rerank_resume_batch.apply_async(
+        args=[source_batch.id, [resume_batch.id for resume_batch in resume_batches]], priority=priority
+    )
@@ -3,11 +3,53 @@ from rest_framework import serializers
 from .models import JobRequirement, ResumeBatch, RankedResume
 from celery.result import AsyncResult # To check Celery task status
 
+class ProjectedFieldsMixin:
+    """
+    Slim representation for list endpoints. Only Meta.default_fields are returned
+    unless the request picks fields with ?fields=a,b or adds some of the heavier
+    ones with ?expand=x,y (both limited to Meta.fields).
+    """
+    @staticmethod
+    def _split_param(request, name):
+        value = request.query_params.get(name, '') if request is not None else ''
+        return {part.strip() for part in value.split(',') if part.strip()}
+
+    @classmethod
+    def get_projected_field_names(cls, request):
+        requested = cls._split_param(request, 'fields')
+        expand = cls._split_param(request, 'expand')
+        names = [name for name in cls.Meta.fields if name in requested]
+        if not names:
+            names = list(cls.Meta.default_fields)
+        names += [name for name in cls.Meta.fields if name in expand and name not in names]
+        return names
+
+    @classmethod
+    def get_projected_model_fields(cls, request):
+        """
+        Model columns needed to render the projected fields, for QuerySet.only().
+        Meta.field_sources maps computed fields to the columns they read.
+        """
+        sources = getattr(cls.Meta, 'field_sources', {})
+        columns = ['id']
+        for name in cls.get_projected_field_names(request):
+            for column in sources.get(name, [name]):
+                if column not in columns:
+                    columns.append(column)
+        return columns
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        keep = set(self.get_projected_field_names(self.context.get('request')))
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+
+
 class JobRequirementSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobRequirement
-        fields = ['id', 'title', 'description_text', 'pdf_file', 'uploaded_at', 'status', 'processing_task_id', 'user']
-        read_only_fields = ['id', 'title', 'description_text', 'uploaded_at', 'status', 'processing_task_id', 'user']
+        fields = ['id', 'title', 'description_text', 'requirements_profile', 'pdf_file', 'uploaded_at', 'status', 'processing_task_id', 'user']
+        read_only_fields = ['id', 'title', 'description_text', 'requirements_profile', 'uploaded_at', 'status', 'processing_task_id', 'user']
 
     def validate_pdf_file(self, f):
         name = f.name.lower()
@@ -17,11 +59,26 @@ class JobRequirementSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("PDF too large (>15MB).")
         return f
     
+class JobRequirementListSerializer(ProjectedFieldsMixin, JobRequirementSerializer):
+    """
+    History listing without the JD text and compiled profile (?expand= adds them).
+    """
+    class Meta(JobRequirementSerializer.Meta):
+        default_fields = ['id', 'title', 'pdf_file', 'uploaded_at', 'status', 'processing_task_id', 'user']
+
 class ResumeBatchSerializer(serializers.ModelSerializer):
+    eta_seconds = serializers.FloatField(read_only=True)
+
     class Meta:
         model = ResumeBatch
-        fields = ['id', 'job_requirement', 'zip_file', 'uploaded_at', 'status', 'processing_task_id', 'user']
-        read_only_fields = ['id', 'uploaded_at', 'status', 'processing_task_id', 'user']
+        fields = [
+            'id', 'job_requirement', 'zip_file', 'uploaded_at', 'status', 'processing_task_id', 'user',
+            'total_count', 'done_count', 'failed_count', 'processing_started_at', 'eta_seconds', 'source_batch'
+        ]
+        read_only_fields = [
+            'id', 'uploaded_at', 'status', 'processing_task_id', 'user',
+            'total_count', 'done_count', 'failed_count', 'processing_started_at', 'source_batch'
+        ]
 
     def validate_zip_file(self, f):
         name = f.name.lower()
@@ -30,21 +87,67 @@ class ResumeBatchSerializer(serializers.ModelSerializer):
         if f.size and f.size > 100 * 1024 * 1024:
             raise serializers.ValidationError("ZIP too large (>100MB).")
         return f
+
+class ResumeBatchListSerializer(ProjectedFieldsMixin, ResumeBatchSerializer):
+    class Meta(ResumeBatchSerializer.Meta):
+        default_fields = ResumeBatchSerializer.Meta.fields
+        field_sources = {'eta_seconds': ['status', 'processing_started_at', 'total_count', 'done_count']}
+
+class ResumeBatchRerankSerializer(serializers.Serializer):
+    """
+    Input for re-ranking an uploaded batch against other job requirements.
+    """
+    job_requirements = serializers.ListField(child=serializers.IntegerField(), min_length=1, max_length=20)
+
+class ResumeBatchStatusSerializer(ResumeBatchSerializer):
+    """
+    Batch status plus the best candidates ranked so far, so the dashboard can
+    show early results while the batch is still running.
+    """
+    top_candidates = serializers.SerializerMethodField()
+
+    TOP_CANDIDATES = 5
+
+    class Meta(ResumeBatchSerializer.Meta):
+        fields = ResumeBatchSerializer.Meta.fields + ['top_candidates']
+
+    def get_top_candidates(self, obj):
+        return list(
+            obj.ranked_resumes.filter(status='ranked')
+            .order_by('-compatibility_score', 'id')
+            .values('id', 'file_name', 'candidate_name', 'candidate_email', 'compatibility_score')[:self.TOP_CANDIDATES]
+        )
+
+
 class RankedResumeSerializer(serializers.ModelSerializer):
     class Meta:
         model = RankedResume
         fields = [
             'id', 'resume_batch', 'file_name', 'status',
             'extracted_info', 'ranking_analysis',
-            'compatibility_score', 'candidate_name', 'candidate_email'
+            'compatibility_score', 'candidate_name', 'candidate_email',
+            'extraction_seconds', 'llm_retries', 'llm_retry_wait_seconds', 'prefilter_score'
         ]
         read_only_fields = [
             'id', 'resume_batch', 'file_name', 'status',
             'extracted_info', 'ranking_analysis',
-            'compatibility_score', 'candidate_name', 'candidate_email'
+            'compatibility_score', 'candidate_name', 'candidate_email',
+            'extraction_seconds', 'llm_retries', 'llm_retry_wait_seconds', 'prefilter_score'
         ]
    
 
+class RankedResumeListSerializer(ProjectedFieldsMixin, RankedResumeSerializer):
+    """
+    The list UI only needs who the candidate is and how they scored; the
+    extracted_info and ranking_analysis blobs are sent with ?expand=.
+    """
+    class Meta(RankedResumeSerializer.Meta):
+        default_fields = [
+            'id', 'resume_batch', 'file_name', 'status',
+            'compatibility_score', 'candidate_name', 'candidate_email'
+        ]
+
+
 class TaskStatusSerializer(serializers.Serializer):
     """
     Serializer to check the status of a Celery task.
@@ -1,33 +1,46 @@
 # backend/resume_processor/tasks.py
 import os
 import json
-import asyncio
+import time
+import logging
 import zipfile
-import tempfile
-import shutil
+import threading
+import functools
+import contextlib
+from datetime import timedelta
 
-from celery import shared_task
+from celery import shared_task, chord, group
 from django.conf import settings
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+from asgiref.sync import sync_to_async
 
-from .models import JobRequirement, ResumeBatch, RankedResume
-from .llm_utils import extract_text_from_pdf, extract_job_title_from_jd, process_single_resume_wrapper
+from .models import BatchTaskHeartbeat, JobRequirement, ResumeBatch, RankedResume, ResumeDocument
+from .scheduling import chunk_priorities, submit_resume_batch
+from .extraction import list_resume_members
+from .events import publish_batch_progress, publish_batch_candidates, publish_job_requirement_status
+from .llm_cache import bypass_llm_cache, count_cache_lookups
+from .instrumentation import stage_timer
+from .logs import bind_log_context
+from .runtime import run_coroutine
+from .metrics import BATCH_QUEUE_SECONDS, RANKED_RESUMES
+from .llm_utils import (
+    extract_text_from_pdf,
+    analyze_job_description,
+    candidate_profile_version,
+    prefilter_enabled,
+    prefilter_zip_members,
+    iter_resume_zip_members,
+    extract_zip_member_texts,
+)
 
-# Helper to run async functions in a synchronous context, ensuring a new event loop
-def run_async_in_sync(coro):
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError: # No current event loop
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
-    # If the loop is already running (e.g., in a test runner or another async context),
-    # we can't just run_until_complete. This is less likely in a solo Celery worker,
-    # but good to be robust.
-    if loop.is_running():
-        pass # The direct loop.run_until_complete() below handles creating/closing.
+logger = logging.getLogger(__name__)
 
-    return loop.run_until_complete(coro)
+# Helper to run async functions from a (synchronous) task: the coroutine runs on the
+# worker process's long-lived event loop (see runtime.py) and this blocks until it is done
+def run_async_in_sync(coro):
+    return run_coroutine(coro)
 
 
 # Task to process a single Job Requirement PDF
@@ -38,6 +51,7 @@ def process_job_requirement_pdf(self, job_requirement_id):
         job_requirement.status = 'processing_jd'
         job_requirement.processing_task_id = self.request.id
         job_requirement.save()
+        publish_job_requirement_status(job_requirement)
 
         pdf_path = job_requirement.pdf_file.path
         jd_text = extract_text_from_pdf(pdf_path)
@@ -45,39 +59,280 @@ def process_job_requirement_pdf(self, job_requirement_id):
         if not jd_text:
             job_requirement.status = 'failed_jd'
             job_requirement.save()
+            publish_job_requirement_status(job_requirement)
             return {'status': 'error', 'message': 'Failed to extract text from JD PDF.'}
 
-        # Use the helper to run the async LLM call
-        job_title = run_async_in_sync(extract_job_title_from_jd(jd_text))
-        
+        # Use the helper to run the async LLM calls. The requirements profile is
+        # compiled once here and reused for every resume ranked against this JD.
+        with bind_log_context(job_requirement_id=job_requirement.id):
+            job_title, requirements_profile = run_async_in_sync(analyze_job_description(jd_text))
+
         if not job_title:
             job_title = "Unknown Job Title"
 
         job_requirement.description_text = jd_text
         job_requirement.title = job_title
+        job_requirement.requirements_profile = requirements_profile or {}
         job_requirement.status = 'processed_jd'
         job_requirement.save()
+        publish_job_requirement_status(job_requirement)
 
         return {
             'status': 'success',
             'job_requirement_id': job_requirement.id,
             'job_title': job_title,
-            'description_text_length': len(jd_text)
+            'description_text_length': len(jd_text),
+            'has_requirements_profile': bool(requirements_profile)
         }
 
     except JobRequirement.DoesNotExist:
         return {'status': 'error', 'message': f'JobRequirement with ID {job_requirement_id} not found.'}
     except Exception as e:
+        logger.exception("Processing job requirement %s failed: %s", job_requirement_id, e)
         # Re-fetch in case of error to ensure latest state
         job_requirement = JobRequirement.objects.get(id=job_requirement_id)
         job_requirement.status = 'failed_jd'
         job_requirement.save()
+        publish_job_requirement_status(job_requirement)
         return {'status': 'error', 'message': f'An unexpected error occurred: {e}'}
 
-# Task to process a batch of resumes from a ZIP file
-@shared_task(bind=True)
-def process_resume_batch_zip(self, resume_batch_id):
-    temp_dir = None
+def store_resume_documents(document_batch_id, extracted_texts, extracted_infos=None):
+    """
+    Stores extracted resume text as ResumeDocuments under the batch that owns
+    the ZIP. `extracted_texts` maps file names to (raw_text, extraction_seconds);
+    documents that already exist are left as they are.
+    """
+    extracted_infos = extracted_infos or {}
+    profile_version = candidate_profile_version()
+    ResumeDocument.objects.bulk_create([
+        ResumeDocument(
+            resume_batch_id=document_batch_id,
+            file_name=file_name,
+            content_hash=ResumeDocument.hash_text(raw_text),
+            compressed_text=ResumeDocument.compress_text(raw_text),
+            extraction_seconds=extraction_seconds,
+            extracted_info=extracted_infos.get(file_name, {}),
+            profile_version=profile_version if file_name in extracted_infos else '',
+        )
+        for file_name, (raw_text, extraction_seconds) in extracted_texts.items()
+    ], ignore_conflicts=True)
+
+
+def load_stored_texts(document_batch_id, file_names):
+    """
+    Returns {file_name: text} for the given files that have a stored ResumeDocument.
+    """
+    documents = ResumeDocument.objects.filter(
+        resume_batch_id=document_batch_id, file_name__in=file_names
+    ).only('file_name', 'compressed_text')
+    return {document.file_name: document.text for document in documents}
+
+
+def stored_document_names(document_batch_id):
+    """
+    File names of the resumes of the batch whose text is already stored.
+    """
+    return set(ResumeDocument.objects.filter(resume_batch_id=document_batch_id).values_list('file_name', flat=True))
+
+
+def save_resume_results(resume_batch, results):
+    """
+    Stores per-resume result dictionaries as RankedResume rows and advances the
+    batch's progress counters.
+    Rows are written with one bulk upsert on (resume_batch, file_name) per
+    RANKED_RESUME_WRITE_BATCH_SIZE results, each in its own short transaction
+    together with its counter update, so writers never hold the database's
+    write lock for long. A chunk that is delivered twice after a worker crash
+    neither fails nor counts a resume twice.
+    Freshly extracted text on a result ('raw_text') is stored as a ResumeDocument.
+    """
+    if not results:
+        return
+    with stage_timer('persist', len(results)):
+        write_resume_results(resume_batch, results)
+    # Published after the commit so a listener that re-reads the batch sees the new rows
+    publish_batch_candidates(resume_batch.id, results)
+
+
+def write_resume_results(resume_batch, results):
+    """
+    The database side of save_resume_results: documents, result rows and counters.
+    """
+    extracted_texts = {}
+    extracted_infos = {}
+    for result in results:
+        raw_text = result.pop('raw_text', None)
+        if raw_text:
+            extracted_texts[result['file_name']] = (raw_text, result.get('extraction_seconds'))
+        if result.get('extracted_info'):
+            extracted_infos[result['file_name']] = result['extracted_info']
+    store_candidate_profiles(resume_batch.document_batch_id, extracted_texts, extracted_infos)
+
+    for batch_results in chunked(results, settings.RANKED_RESUME_WRITE_BATCH_SIZE):
+        rows = [RankedResume.from_result(resume_batch, result) for result in batch_results]
+        with transaction.atomic():
+            # Only rows that did not exist yet advance the counters
+            existing = set(RankedResume.objects.filter(
+                resume_batch=resume_batch, file_name__in=[row.file_name for row in rows]
+            ).values_list('file_name', flat=True))
+            RankedResume.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['resume_batch', 'file_name'],
+                update_fields=RankedResume.RESULT_FIELDS,
+            )
+            new_rows = [row for row in rows if row.file_name not in existing]
+            # F() expressions keep concurrent chunk tasks from overwriting each other's counts
+            ResumeBatch.objects.filter(id=resume_batch.id).update(
+                done_count=F('done_count') + len(new_rows),
+                failed_count=F('failed_count') + sum(
+                    1 for row in new_rows if row.status not in RankedResume.SUCCESS_STATUSES
+                ),
+                last_progress_at=timezone.now(),
+            )
+        for row in new_rows:
+            RANKED_RESUMES.inc(status=row.status)
+
+
+def store_candidate_profiles(document_batch_id, extracted_texts, extracted_infos):
+    """
+    Stores newly extracted text as ResumeDocuments, and the candidate profiles
+    of documents stored earlier that did not have a current one yet.
+    """
+    profile_version = candidate_profile_version()
+    with transaction.atomic():
+        if extracted_texts:
+            store_resume_documents(document_batch_id, extracted_texts, extracted_infos)
+        missing_profiles = [file_name for file_name in extracted_infos if file_name not in extracted_texts]
+        if missing_profiles:
+            documents = list(ResumeDocument.objects.filter(
+                resume_batch_id=document_batch_id, file_name__in=missing_profiles
+            ).exclude(profile_version=profile_version).only('id', 'file_name'))
+            for document in documents:
+                document.extracted_info = extracted_infos[document.file_name]
+                document.profile_version = profile_version
+            ResumeDocument.objects.bulk_update(documents, ['extracted_info', 'profile_version'])
+
+
+def get_finished_file_names(resume_batch, file_names=None):
+    """
+    Returns the file names in the batch that already have a final result.
+    """
+    finished = RankedResume.objects.filter(resume_batch=resume_batch).exclude(
+        status__in=RankedResume.UNFINISHED_STATUSES
+    )
+    if file_names is not None:
+        finished = finished.filter(file_name__in=file_names)
+    return set(finished.values_list('file_name', flat=True))
+
+
+async def rank_and_save_zip_members(resume_batch, zip_ref, members, job_requirement, prefilter_scores=None):
+    """
+    Ranks resumes and stores them as they finish (at least every
+    RANKED_RESUME_FLUSH_SECONDS), so the dashboard sees progress and early
+    results while the rest are still being processed.
+    Returns the number of resumes stored.
+    """
+    with bind_log_context(batch_id=resume_batch.id):
+        return await _rank_and_save_zip_members(resume_batch, zip_ref, members, job_requirement, prefilter_scores)
+
+
+async def _rank_and_save_zip_members(resume_batch, zip_ref, members, job_requirement, prefilter_scores):
+    save_result = sync_to_async(save_resume_results)
+    # Resumes whose text is already stored (re-ranked batches, or extracted by the
+    # prefilter) are ranked without reading their PDF again
+    stored_texts = await sync_to_async(load_stored_texts)(
+        resume_batch.document_batch_id, [os.path.basename(member.filename) for member in members]
+    )
+    processed_count = 0
+    # Results are buffered briefly and written together, which keeps the number of
+    # write transactions low while progress still shows up every few seconds
+    pending = []
+    last_flush = time.monotonic()
+    async for result in iter_resume_zip_members(
+        zip_ref,
+        members,
+        job_requirement.description_text,
+        job_requirement.title,
+        requirements_profile=job_requirement.requirements_profile,
+        prefilter_scores=prefilter_scores,
+        stored_texts=stored_texts
+    ):
+        pending.append(result)
+        processed_count += 1
+        if (len(pending) >= settings.RANKED_RESUME_WRITE_BATCH_SIZE
+                or time.monotonic() - last_flush >= settings.RANKED_RESUME_FLUSH_SECONDS):
+            await save_result(resume_batch, pending)
+            pending = []
+            last_flush = time.monotonic()
+    if pending:
+        await save_result(resume_batch, pending)
+    return processed_count
+
+
+@contextlib.contextmanager
+def batch_heartbeat(resume_batch_id, task_id, touch_progress=False):
+    """
+    Records that `task_id` is working on the batch, refreshing the record every
+    BATCH_HEARTBEAT_SECONDS from a background thread until the block exits.
+    requeue_stalled_batches only requeues batches whose task stopped beating.
+    With touch_progress each beat also advances last_progress_at, for work that
+    stores no results for a while (the prefilter reading a large ZIP).
+    """
+    def beat():
+        now = timezone.now()
+        try:
+            BatchTaskHeartbeat.objects.update_or_create(
+                resume_batch_id=resume_batch_id, task_id=task_id, defaults={'beat_at': now}
+            )
+            if touch_progress:
+                ResumeBatch.objects.filter(id=resume_batch_id).update(last_progress_at=now)
+        except Exception as e:
+            # Also reached for a batch that no longer exists, which the task itself reports
+            logger.warning("Could not record a heartbeat for batch %s: %s", resume_batch_id, e)
+
+    def keep_beating():
+        try:
+            while not stopped.wait(settings.BATCH_HEARTBEAT_SECONDS):
+                beat()
+        finally:
+            connection.close()  # This thread's own database connection
+
+    if not task_id:
+        yield
+        return
+    beat()
+    stopped = threading.Event()
+    thread = threading.Thread(target=keep_beating, name=f"batch-{resume_batch_id}-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+        BatchTaskHeartbeat.objects.filter(resume_batch_id=resume_batch_id, task_id=task_id).delete()
+
+
+def chunked(items, size):
+    size = max(1, size)
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+# Task to process a batch of resumes from a ZIP file.
+# The batch is split into chunks of RESUME_TASK_CHUNK_SIZE resumes, each ranked by its
+# own process_resume_chunk task on whichever worker picks it up; finalize_resume_batch
+# runs once all chunks are done (a Celery chord).
+# The task is idempotent: resumes that already have a final RankedResume row are
+# skipped, so a batch that is re-run after a crash only processes what is left.
+# acks_late + reject_on_worker_lost put the message back on the queue if the worker
+# dies mid-task.
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def process_resume_batch_zip(self, resume_batch_id, bypass_cache=False):
+    with batch_heartbeat(resume_batch_id, self.request.id, touch_progress=True):
+        return _process_resume_batch_zip(resume_batch_id, bypass_cache, self.request.id)
+
+
+def _process_resume_batch_zip(resume_batch_id, bypass_cache, task_id):
     try:
         resume_batch = ResumeBatch.objects.get(id=resume_batch_id)
         job_requirement = resume_batch.job_requirement
@@ -85,59 +340,110 @@ def process_resume_batch_zip(self, resume_batch_id):
         if job_requirement.status != 'processed_jd' or not job_requirement.description_text:
             return {'status': 'error', 'message': 'Job Description not yet processed or missing text.'}
 
+        if resume_batch.status == 'completed':
+            return {'status': 'success', 'resume_batch_id': resume_batch.id, 'message': 'Batch already completed.'}
+
         resume_batch.status = 'extracting'
-        resume_batch.processing_task_id = self.request.id
+        resume_batch.processing_task_id = task_id
+        resume_batch.last_progress_at = timezone.now()
+        if not resume_batch.processing_started_at:
+            resume_batch.processing_started_at = resume_batch.last_progress_at
+            BATCH_QUEUE_SECONDS.observe((resume_batch.processing_started_at - resume_batch.uploaded_at).total_seconds())
         resume_batch.save()
+        publish_batch_progress(resume_batch.id)
 
         zip_path = resume_batch.zip_file.path
-        temp_dir = tempfile.mkdtemp()
-        extracted_pdf_paths = []
 
+        # Only the member list is read here; the chunk tasks stream the PDFs
+        # themselves straight from the archive.
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            pdf_in_zip = [f for f in zip_ref.namelist() if f.lower().endswith('.pdf') and not f.startswith('__MACOSX/')]
+            pdf_members = list_resume_members(zip_ref)
 
-            if not pdf_in_zip:
+            if not pdf_members:
                 resume_batch.status = 'failed'
                 resume_batch.save()
+                publish_batch_progress(resume_batch.id)
                 return {'status': 'error', 'message': 'No PDF files found in the ZIP archive.'}
 
-            for pdf_name in pdf_in_zip:
-                extracted_path = os.path.join(temp_dir, os.path.basename(pdf_name))
-                with open(extracted_path, "wb") as outfile:
-                    outfile.write(zip_ref.read(pdf_name))
-                extracted_pdf_paths.append(extracted_path)
+            resume_batch.total_count = len(pdf_members)
+            resume_batch.recount_progress()
+            resume_batch.save(update_fields=['total_count', 'done_count', 'failed_count'])
+
+            finished_names = get_finished_file_names(resume_batch)
+            if finished_names:
+                logger.info(
+                    "Resuming batch %s: %d resumes already done", resume_batch.id, len(finished_names),
+                    extra={"batch_id": resume_batch.id},
+                )
+
+            if prefilter_enabled() and resume_batch.prefilter_applied_at is None:
+                # Scoring needs every resume's text, so the prefilter runs here,
+                # before the work is split; only the selected resumes fan out.
+                # It always scores the whole batch, so the 0-100 scores are
+                # relative to the same best resume however often the batch restarts.
+                # Texts go to ResumeDocuments as they are extracted, and the chunk
+                # tasks rank the selected resumes from there
+                document_batch_id = resume_batch.document_batch_id
+                with bind_log_context(batch_id=resume_batch.id, stage="prefilter"):
+                    pdf_members, prefilter_scores, decided_results = run_async_in_sync(prefilter_zip_members(
+                        zip_ref,
+                        pdf_members,
+                        job_requirement.description_text,
+                        job_requirement.requirements_profile,
+                        stored_names=stored_document_names(document_batch_id),
+                        load_texts=sync_to_async(functools.partial(load_stored_texts, document_batch_id)),
+                        store_texts=sync_to_async(functools.partial(store_resume_documents, document_batch_id)),
+                    ))
+                save_resume_results(resume_batch, [
+                    result for result in decided_results if result['file_name'] not in finished_names
+                ])
+                resume_batch.prefilter_applied_at = timezone.now()
+                resume_batch.prefilter_scores = prefilter_scores
+                resume_batch.save(update_fields=['prefilter_applied_at', 'prefilter_scores'])
+            else:
+                # When resuming after the prefilter, every resume it filtered out
+                # has a final row, so the unfinished ones are the selected ones.
+                prefilter_scores = resume_batch.prefilter_scores
+
+            pdf_members = [
+                member for member in pdf_members
+                if os.path.basename(member.filename) not in finished_names
+            ]
 
         resume_batch.status = 'processing'
-        resume_batch.save()
+        resume_batch.save(update_fields=['status'])
+        publish_batch_progress(resume_batch.id)
 
-        tasks = [
-            process_single_resume_wrapper(
-                pdf_path,
-                job_requirement.description_text,
-                job_requirement.title
-            ) for pdf_path in extracted_pdf_paths
+        member_names = [member.filename for member in pdf_members]
+        chunks = chunked(member_names, settings.RESUME_TASK_CHUNK_SIZE)
+        # Fair share across users: see scheduling.chunk_priorities
+        priorities = chunk_priorities(resume_batch, [len(chunk) for chunk in chunks])
+        chunk_tasks = [
+            process_resume_chunk.s(
+                resume_batch.id,
+                chunk,
+                bypass_cache=bypass_cache,
+                prefilter_scores={
+                    os.path.basename(name): prefilter_scores[os.path.basename(name)]
+                    for name in chunk if os.path.basename(name) in prefilter_scores
+                },
+            ).set(priority=priority)
+            for chunk, priority in zip(chunks, priorities)
         ]
+        # The callback is tied to this dispatch, so a chord left over from an
+        # earlier, stalled run cannot finalize the batch while this one is running.
+        finalize = finalize_resume_batch.s(resume_batch.id, dispatch_id=task_id)
+        if chunk_tasks:
+            chord(group(chunk_tasks))(finalize)
+        else:
+            finalize.delay([])
 
-        # Use the helper to run all async LLM calls
-        processed_results = run_async_in_sync(asyncio.gather(*tasks))
-
-        with transaction.atomic():
-            for result in processed_results:
-                RankedResume.objects.create(
-                    resume_batch=resume_batch,
-                    file_name=result.get('file_name', 'unknown_file.pdf'),
-                    status=result.get('status', 'failed_ranking'),
-                    extracted_info=result.get('extracted_info', {}),
-                    ranking_analysis=result.get('ranking_analysis', {}),
-                    # NOW CORRECTLY ACCESSING TOP-LEVEL KEYS
-                    compatibility_score=result.get('compatibility_score', 0),
-                    candidate_name=result.get('candidate_name', 'N/A'),
-                    candidate_email=result.get('candidate_email', 'N/A')
-                )
-        
-        resume_batch.status = 'completed'
-        resume_batch.save()
-        return {'status': 'success', 'resume_batch_id': resume_batch.id, 'processed_count': len(processed_results)}
+        return {
+            'status': 'dispatched',
+            'resume_batch_id': resume_batch.id,
+            'resume_count': len(member_names),
+            'chunk_count': len(chunk_tasks),
+        }
 
     except ResumeBatch.DoesNotExist:
         return {'status': 'error', 'message': f'ResumeBatch with ID {resume_batch_id} not found.'}
@@ -147,14 +453,153 @@ def process_resume_batch_zip(self, resume_batch_id):
         resume_batch = ResumeBatch.objects.get(id=resume_batch_id)
         resume_batch.status = 'failed'
         resume_batch.save()
+        publish_batch_progress(resume_batch.id)
         return {'status': 'error', 'message': 'Uploaded file is not a valid ZIP file or is corrupted.'}
     except Exception as e:
         # Catch any other unexpected errors during batch processing
+        logger.exception("Processing batch %s failed: %s", resume_batch_id, e, extra={"batch_id": resume_batch_id})
         resume_batch = ResumeBatch.objects.get(id=resume_batch_id)
         resume_batch.status = 'failed'
         resume_batch.save()
+        publish_batch_progress(resume_batch.id)
         return {'status': 'error', 'message': f'An unexpected error occurred during batch processing: {e}'}
-    finally:
-        if temp_dir and os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
 
+
+# Task to rank one chunk of a resume batch. Like the batch task it skips resumes
+# that already have a final result, so a redelivered chunk only finishes the rest.
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def process_resume_chunk(self, resume_batch_id, member_names, bypass_cache=False, prefilter_scores=None):
+    with batch_heartbeat(resume_batch_id, self.request.id):
+        return _process_resume_chunk(resume_batch_id, member_names, bypass_cache, prefilter_scores)
+
+
+def _process_resume_chunk(resume_batch_id, member_names, bypass_cache, prefilter_scores):
+    try:
+        resume_batch = ResumeBatch.objects.select_related('job_requirement').get(id=resume_batch_id)
+        job_requirement = resume_batch.job_requirement
+        finished_names = get_finished_file_names(resume_batch, [os.path.basename(name) for name in member_names])
+
+        with zipfile.ZipFile(resume_batch.zip_file.path, 'r') as zip_ref:
+            members = [
+                zip_ref.getinfo(name) for name in member_names
+                if os.path.basename(name) not in finished_names
+            ]
+            # Counts only this chunk's lookups, even with other chunks running in the process
+            with count_cache_lookups() as llm_cache:
+                # bypass_cache forces fresh LLM calls, e.g. after a prompt or model change
+                with bypass_llm_cache() if bypass_cache else contextlib.nullcontext():
+                    # Use the helper to run all async LLM calls
+                    processed_count = run_async_in_sync(rank_and_save_zip_members(
+                        resume_batch, zip_ref, members, job_requirement, prefilter_scores
+                    ))
+
+        return {
+            'status': 'success',
+            'processed_count': processed_count,
+            'llm_cache': llm_cache,
+        }
+    except Exception as e:
+        # Reported to finalize_resume_batch instead of raising, so one bad chunk
+        # does not keep the rest of the batch from completing.
+        logger.exception("A chunk of batch %s failed: %s", resume_batch_id, e, extra={"batch_id": resume_batch_id})
+        return {'status': 'error', 'processed_count': 0, 'message': f'Chunk of {len(member_names)} resumes failed: {e}'}
+
+
+# Chord callback: marks the batch as done once all of its chunks have finished
+@shared_task(bind=True)
+def finalize_resume_batch(self, chunk_results, resume_batch_id, dispatch_id=None):
+    try:
+        resume_batch = ResumeBatch.objects.get(id=resume_batch_id)
+    except ResumeBatch.DoesNotExist:
+        return {'status': 'error', 'message': f'ResumeBatch with ID {resume_batch_id} not found.'}
+
+    if dispatch_id and resume_batch.processing_task_id != dispatch_id:
+        return {'status': 'skipped', 'message': 'Batch was requeued; a newer run will finalize it.'}
+
+    failed_chunks = [result for result in chunk_results if result.get('status') != 'success']
+    llm_cache = {'hits': 0, 'misses': 0}
+    for result in chunk_results:
+        for key, value in result.get('llm_cache', {}).items():
+            llm_cache[key] = llm_cache.get(key, 0) + value
+
+    # A batch only fails outright if none of its chunks could be processed
+    resume_batch.status = 'failed' if chunk_results and len(failed_chunks) == len(chunk_results) else 'completed'
+    resume_batch.save(update_fields=['status'])
+    publish_batch_progress(resume_batch.id)
+    return {
+        'status': 'success' if resume_batch.status == 'completed' else 'error',
+        'resume_batch_id': resume_batch.id,
+        'processed_count': resume_batch.ranked_resumes.count(),
+        'failed_chunks': [result.get('message') for result in failed_chunks],
+        'llm_cache': llm_cache,
+    }
+
+
+# Task to rank an already uploaded batch against other job requirements. The resumes'
+# text is extracted (at most) once into ResumeDocuments, then one batch per JD is
+# queued; those batches only run the ranking step.
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def rerank_resume_batch(self, source_batch_id, resume_batch_ids):
+    try:
+        source_batch = ResumeBatch.objects.get(id=source_batch_id)
+        with zipfile.ZipFile(source_batch.zip_file.path, 'r') as zip_ref:
+            members = list_resume_members(zip_ref)
+            stored_names = stored_document_names(source_batch.id)
+            missing = [member for member in members if os.path.basename(member.filename) not in stored_names]
+            if missing:
+                logger.info(
+                    "Extracting %d resumes of batch %s for re-ranking", len(missing), source_batch.id,
+                    extra={"batch_id": source_batch.id},
+                )
+                with bind_log_context(batch_id=source_batch.id):
+                    extracted_texts = {
+                        file_name: outcome
+                        for file_name, outcome in run_async_in_sync(extract_zip_member_texts(zip_ref, missing))
+                        if not isinstance(outcome, BaseException) and outcome[0]
+                    }
+                store_resume_documents(source_batch.id, extracted_texts)
+    except (ResumeBatch.DoesNotExist, OSError, zipfile.BadZipFile) as e:
+        # The batches still run, extracting from the ZIP themselves if it is readable
+        logger.warning("Could not prepare stored resumes of batch %s for re-ranking: %s", source_batch_id, e)
+
+    for resume_batch in ResumeBatch.objects.filter(id__in=resume_batch_ids).select_related('user'):
+        task = submit_resume_batch(resume_batch)
+        ResumeBatch.objects.filter(id=resume_batch.id).update(processing_task_id=task.id)
+    return {'status': 'dispatched', 'source_batch_id': source_batch_id, 'resume_batch_ids': resume_batch_ids}
+
+
+# Periodic task (see CELERY_BEAT_SCHEDULE): requeues batches whose running task has
+# died, e.g. with the worker that ran it: it left a heartbeat that is older than
+# BATCH_STALL_TIMEOUT_SECONDS and no other task of the batch is still beating.
+# Chunks waiting in the queue leave no heartbeat, so a batch that is merely queued
+# behind other work, or busy in a long prefilter, is never requeued.
+@shared_task
+def requeue_stalled_batches():
+    stalled_before = timezone.now() - timedelta(seconds=settings.BATCH_STALL_TIMEOUT_SECONDS)
+    heartbeats = BatchTaskHeartbeat.objects.filter(resume_batch=OuterRef('pk'))
+    stalled = ResumeBatch.objects.filter(
+        Exists(heartbeats.filter(beat_at__lt=stalled_before)),
+        ~Exists(heartbeats.filter(beat_at__gte=stalled_before)),
+        status__in=['extracting', 'processing'],
+    )
+    requeued, failed = [], []
+    for resume_batch in stalled:
+        if resume_batch.requeue_count >= settings.BATCH_MAX_REQUEUES:
+            resume_batch.status = 'failed'
+            resume_batch.save(update_fields=['status'])
+            resume_batch.task_heartbeats.all().delete()
+            publish_batch_progress(resume_batch.id)
+            failed.append(resume_batch.id)
+            continue
+        # Claim the batch atomically so two sweepers never requeue it twice
+        claimed = ResumeBatch.objects.filter(
+            id=resume_batch.id, requeue_count=resume_batch.requeue_count
+        ).update(requeue_count=F('requeue_count') + 1, last_progress_at=timezone.now())
+        if claimed:
+            # The dead tasks' heartbeats; the new run writes its own
+            resume_batch.task_heartbeats.filter(beat_at__lt=stalled_before).delete()
+            submit_resume_batch(resume_batch)
+            requeued.append(resume_batch.id)
+    if requeued or failed:
+        logger.warning("Stalled batches requeued: %s; given up: %s", requeued, failed)
+    return {'requeued': requeued, 'failed': failed}
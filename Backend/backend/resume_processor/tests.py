@@ -0,0 +1,1056 @@
+# backend/resume_processor/tests.py
+import base64
+import json
+import io
+import time
+import email.utils
+import random
+import zipfile
+import shutil
+import asyncio
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+try:
+    import fakeredis # Runs the shared rate limit's Lua script (with lupa)
+except ImportError:
+    fakeredis = None
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import extraction, llm_cache, tasks
+from .benchmarking import build_resume_zip
+from .llm_cache import (
+    bypass_llm_cache, count_cache_lookups, evict_cached_responses, get_cached_response, store_cached_response,
+)
+from . import llm_utils
+from .llm_utils import (
+    LLMCallStats, LLMScheduler, RedisTokenBucket, TokenBucket, build_resume_result, classify_llm_error, get_llm_response, get_retry_after, prefilter_zip_members,
+)
+from .prefilter import bm25_scores
+from .mock_llm import synthetic_content
+from .models import BatchTaskHeartbeat, JobRequirement, ResumeBatch, RankedResume, LLMResponseCache
+
+API_PREFIX = '/api/resume-processor'
+
+
+@override_settings(BATCH_EVENTS_REDIS_URL='', METRICS_REDIS_URL='')
+class ProjectedListQueryTests(TestCase):
+    """
+    The list endpoints run a fixed number of queries however many rows they
+    return, and load the heavy JSON/text columns only when they are asked for.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('hr', 'hr@example.com', 'password')
+        cls.job_requirement = JobRequirement.objects.create(
+            user=cls.user, title='Backend Engineer', description_text='Python, Django and Celery.',
+            requirements_profile={'must_have': ['python']}, pdf_file='requirements_pdfs/jd.pdf',
+            status='processed_jd',
+        )
+        cls.resume_batch = ResumeBatch.objects.create(
+            user=cls.user, job_requirement=cls.job_requirement, zip_file='resume_zips/batch.zip',
+            status='completed', total_count=20, done_count=20,
+        )
+        RankedResume.objects.bulk_create([
+            RankedResume(
+                resume_batch=cls.resume_batch, file_name=f'cv{index}.pdf', status='ranked',
+                candidate_name=f'Candidate {index}', candidate_email=f'c{index}@example.com',
+                compatibility_score=index * 5,
+                extracted_info={'Name': f'Candidate {index}', 'Skills': ['python']},
+                ranking_analysis={'CompatibilityScore': index * 5, 'Strengths': ['django']},
+            )
+            for index in range(20)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, path, expected_queries):
+        with self.assertNumQueries(expected_queries):
+            response = self.client.get(f'{API_PREFIX}/{path}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def assert_loads_columns(self, path, loaded, not_loaded):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'{API_PREFIX}/{path}')
+        select = next(query['sql'] for query in queries if '"resume_processor_rankedresume"."id"' in query['sql'])
+        for column in loaded:
+            self.assertIn(f'"{column}"', select)
+        for column in not_loaded:
+            self.assertNotIn(f'"{column}"', select)
+
+    # Ranked resumes, page-number pagination: batch lookup, COUNT, page, audit insert
+
+    def test_ranked_list_default_fields(self):
+        data = self.get(f'batches/{self.resume_batch.id}/ranked-resumes/', 4)
+        self.assertEqual(len(data['results']), 20)
+        self.assertNotIn('extracted_info', data['results'][0])
+        self.assert_loads_columns(
+            f'batches/{self.resume_batch.id}/ranked-resumes/',
+            loaded=['candidate_name'], not_loaded=['extracted_info', 'ranking_analysis'],
+        )
+
+    def test_ranked_list_fields(self):
+        data = self.get(f'batches/{self.resume_batch.id}/ranked-resumes/?fields=id,compatibility_score', 4)
+        self.assertEqual(set(data['results'][0]), {'id', 'compatibility_score'})
+        self.assert_loads_columns(
+            f'batches/{self.resume_batch.id}/ranked-resumes/?fields=id,compatibility_score',
+            loaded=['compatibility_score'], not_loaded=['candidate_name', 'extracted_info'],
+        )
+
+    def test_ranked_list_expand(self):
+        data = self.get(f'batches/{self.resume_batch.id}/ranked-resumes/?expand=extracted_info,ranking_analysis', 4)
+        self.assertEqual(data['results'][0]['extracted_info']['Skills'], ['python'])
+        self.assertIn('ranking_analysis', data['results'][0])
+
+    # Ranked resumes in ranking order, keyset pagination: batch lookup, page, audit insert
+
+    def test_ranking_default_fields(self):
+        data = self.get(f'batches/{self.resume_batch.id}/ranked-resumes/ranking/', 3)
+        self.assertEqual(data['results'][0]['compatibility_score'], 95)
+        self.assertNotIn('ranking_analysis', data['results'][0])
+
+    def test_ranking_fields(self):
+        data = self.get(f'batches/{self.resume_batch.id}/ranked-resumes/ranking/?fields=id,file_name', 3)
+        self.assertEqual(set(data['results'][0]), {'id', 'file_name'})
+        # The cursor needs the score even when it is not returned
+        self.assert_loads_columns(
+            f'batches/{self.resume_batch.id}/ranked-resumes/ranking/?fields=id,file_name',
+            loaded=['file_name', 'compatibility_score'], not_loaded=['extracted_info'],
+        )
+
+    def test_ranking_expand(self):
+        data = self.get(f'batches/{self.resume_batch.id}/ranked-resumes/ranking/?expand=extracted_info', 3)
+        self.assertIn('extracted_info', data['results'][0])
+
+    def test_ranking_next_page(self):
+        first = self.get(f'batches/{self.resume_batch.id}/ranked-resumes/ranking/?page_size=5', 3)
+        cursor = first['next'].split('cursor=')[1].split('&')[0]
+        second = self.get(f'batches/{self.resume_batch.id}/ranked-resumes/ranking/?page_size=5&cursor={cursor}', 3)
+        self.assertEqual(second['results'][0]['compatibility_score'], 70)
+
+    def test_ranking_top(self):
+        data = self.get(f'batches/{self.resume_batch.id}/ranked-resumes/ranking/?top=3&expand=ranking_analysis', 3)
+        self.assertEqual([row['compatibility_score'] for row in data['results']], [95, 90, 85])
+
+    # History lists: COUNT and page
+
+    def test_my_requirements(self):
+        data = self.get('my-requirements/', 2)
+        self.assertNotIn('description_text', data['results'][0])
+        data = self.get('my-requirements/?expand=description_text,requirements_profile', 2)
+        self.assertEqual(data['results'][0]['requirements_profile'], {'must_have': ['python']})
+        data = self.get('my-requirements/?fields=id,status', 2)
+        self.assertEqual(set(data['results'][0]), {'id', 'status'})
+
+    def test_my_batches(self):
+        data = self.get('my-batches/', 2)
+        self.assertEqual(data['results'][0]['done_count'], 20)
+        data = self.get('my-batches/?fields=id,eta_seconds', 2)
+        self.assertEqual(set(data['results'][0]), {'id', 'eta_seconds'})
+
+    def test_query_count_does_not_grow_with_rows(self):
+        RankedResume.objects.filter(resume_batch=self.resume_batch, compatibility_score__lt=50).delete()
+        self.get(f'batches/{self.resume_batch.id}/ranked-resumes/?expand=extracted_info,ranking_analysis', 4)
+        self.get(f'batches/{self.resume_batch.id}/ranked-resumes/ranking/?expand=extracted_info', 3)
+
+
+def encode_cursor(position):
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+
+@override_settings(BATCH_EVENTS_REDIS_URL='', METRICS_REDIS_URL='')
+class RankingPaginationTests(TestCase):
+    """
+    Keyset pages in ranking order, ?top=N, and cursor validation.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('hr', 'hr@example.com', 'password')
+        job_requirement = JobRequirement.objects.create(
+            user=cls.user, title='Backend Engineer', pdf_file='requirements_pdfs/jd.pdf', status='processed_jd',
+        )
+        cls.resume_batch = ResumeBatch.objects.create(
+            user=cls.user, job_requirement=job_requirement, zip_file='resume_zips/batch.zip', status='completed',
+        )
+        # Three scores with seven resumes each, so page boundaries fall inside ties
+        RankedResume.objects.bulk_create([
+            RankedResume(
+                resume_batch=cls.resume_batch, file_name=f'cv{index}.pdf', status='ranked',
+                compatibility_score=(index % 3) * 10,
+            )
+            for index in range(21)
+        ])
+        cls.path = f'{API_PREFIX}/batches/{cls.resume_batch.id}/ranked-resumes/ranking/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pages_are_continuous_across_tied_scores(self):
+        expected = list(
+            RankedResume.objects.filter(resume_batch=self.resume_batch)
+            .order_by('-compatibility_score', 'id').values_list('id', flat=True)
+        )
+        seen = []
+        url = f'{self.path}?page_size=4&fields=id'
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(row['id'] for row in data['results'])
+            url = data['next']
+        self.assertEqual(seen, expected)
+
+    def test_rows_ranked_while_paging_are_not_repeated(self):
+        first = self.client.get(f'{self.path}?page_size=5&fields=id').json()
+        RankedResume.objects.create(
+            resume_batch=self.resume_batch, file_name='late.pdf', status='ranked', compatibility_score=20,
+        )
+        second = self.client.get(first['next']).json()
+        first_ids = {row['id'] for row in first['results']}
+        self.assertFalse(first_ids & {row['id'] for row in second['results']})
+
+    @override_settings(RANKED_RESULTS_MAX_TOP=5)
+    def test_top_is_capped(self):
+        response = self.client.get(f'{self.path}?top=100&fields=id,compatibility_score')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 5)
+        self.assertEqual({row['compatibility_score'] for row in response.json()['results']}, {20})
+
+    def test_top_rejects_non_positive_values(self):
+        for top in ('0', '-3', 'abc'):
+            response = self.client.get(f'{self.path}?top={top}')
+            self.assertEqual(response.status_code, 400, top)
+
+    def test_invalid_cursors_are_not_found(self):
+        cursors = [
+            'not base64!', encode_cursor('not json'), encode_cursor('[1]'), encode_cursor('{"a": 1}'),
+            encode_cursor('[1e400, 1]'), encode_cursor('[NaN, 1]'), encode_cursor('[Infinity, 1]'),
+            encode_cursor('["10", 1]'), encode_cursor('[true, 1]'), encode_cursor('[10, 1.5]'),
+            encode_cursor('[10, 0]'), encode_cursor('[10, -1]'), encode_cursor(json.dumps([10, 2 ** 63])),
+            encode_cursor(json.dumps([2 ** 63, 1])),
+        ]
+        for cursor in cursors:
+            response = self.client.get(f'{self.path}?cursor={cursor}')
+            self.assertEqual(response.status_code, 404, cursor)
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_REDIS_URL='', METRICS_AUTH_TOKEN='scrape-secret')
+class MetricsViewTests(TestCase):
+    """
+    The scrape endpoint requires the configured bearer token.
+    """
+
+    path = f'{API_PREFIX}/metrics/'
+
+    @override_settings(METRICS_AUTH_TOKEN='')
+    def test_refused_while_no_token_is_configured(self):
+        response = self.client.get(self.path, HTTP_AUTHORIZATION='Bearer ')
+        self.assertEqual(response.status_code, 403)
+
+    def test_missing_token(self):
+        self.assertEqual(self.client.get(self.path).status_code, 401)
+
+    def test_wrong_token(self):
+        for header in ('Bearer wrong', 'scrape-secret', 'Bearer scrape-secr\u00e9t', 'Bearer \u00ff\u00fe'):
+            response = self.client.get(self.path, HTTP_AUTHORIZATION=header)
+            self.assertEqual(response.status_code, 401, header)
+
+    def test_correct_token(self):
+        response = self.client.get(self.path, HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+
+
+@override_settings(BATCH_EVENTS_REDIS_URL='', METRICS_REDIS_URL='', EVENT_STREAM_TOKEN_MAX_AGE_SECONDS=60)
+class EventStreamTokenTests(TestCase):
+    """
+    A stream token opens only the stream it was issued for, and only until it expires.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('hr', 'hr@example.com', 'password')
+        cls.other_user = get_user_model().objects.create_user('other', 'other@example.com', 'password')
+        cls.job_requirement = JobRequirement.objects.create(
+            user=cls.user, title='Backend Engineer', pdf_file='requirements_pdfs/jd.pdf', status='processed_jd',
+        )
+        cls.resume_batch, cls.second_batch = [
+            ResumeBatch.objects.create(
+                user=cls.user, job_requirement=cls.job_requirement, zip_file='resume_zips/batch.zip',
+                status='completed',
+            )
+            for _ in range(2)
+        ]
+        cls.other_batch = ResumeBatch.objects.create(
+            user=cls.other_user, job_requirement=cls.job_requirement, zip_file='resume_zips/other.zip',
+            status='completed',
+        )
+
+    def setUp(self):
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(self.user)
+
+    def issue_token(self, path):
+        response = self.api_client.post(f'{API_PREFIX}/{path}events/token/')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['expires_in'], 60)
+        return response.json()['token']
+
+    def open_stream(self, path, token):
+        response = self.client.get(f'{API_PREFIX}/{path}events/', {'token': token})
+        if response.streaming:
+            response.close()
+        return response.status_code
+
+    def test_token_opens_its_own_stream(self):
+        token = self.issue_token(f'batches/{self.resume_batch.id}/')
+        self.assertEqual(self.open_stream(f'batches/{self.resume_batch.id}/', token), 200)
+        token = self.issue_token(f'requirements/{self.job_requirement.id}/')
+        self.assertEqual(self.open_stream(f'requirements/{self.job_requirement.id}/', token), 200)
+
+    def test_batch_token_does_not_open_other_streams(self):
+        token = self.issue_token(f'batches/{self.resume_batch.id}/')
+        self.assertEqual(self.open_stream(f'batches/{self.second_batch.id}/', token), 401)
+        self.assertEqual(self.open_stream(f'batches/{self.other_batch.id}/', token), 401)
+        self.assertEqual(self.open_stream(f'requirements/{self.job_requirement.id}/', token), 401)
+
+    def test_requirement_token_does_not_open_batch_streams(self):
+        token = self.issue_token(f'requirements/{self.job_requirement.id}/')
+        self.assertEqual(self.open_stream(f'batches/{self.resume_batch.id}/', token), 401)
+
+    def test_expired_token_is_refused(self):
+        token = self.issue_token(f'batches/{self.resume_batch.id}/')
+        with mock.patch('django.core.signing.time.time', return_value=time.time() + 61):
+            self.assertEqual(self.open_stream(f'batches/{self.resume_batch.id}/', token), 401)
+
+    def test_missing_or_forged_token_is_refused(self):
+        self.assertEqual(self.open_stream(f'batches/{self.resume_batch.id}/', ''), 401)
+        token = self.issue_token(f'batches/{self.resume_batch.id}/')
+        self.assertEqual(self.open_stream(f'batches/{self.resume_batch.id}/', token[:-2] + 'xx'), 401)
+
+    def test_tokens_are_issued_for_own_objects_only(self):
+        response = self.api_client.post(f'{API_PREFIX}/batches/{self.other_batch.id}/events/token/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(APIClient().post(f'{API_PREFIX}/batches/{self.resume_batch.id}/events/token/').status_code, 401)
+
+
+@override_settings(LLM_CACHE_ENABLED=True, LLM_CACHE_TTL_SECONDS=3600, LLM_CACHE_MAX_ENTRIES=3,
+                   LLM_CACHE_EVICTION_INTERVAL=1000, GROQ_MODEL_NAME='test-model')
+class LLMResponseCacheTests(TestCase):
+    """
+    Expiry, eviction, per-caller hit/miss counts and the paths that skip the cache.
+    """
+
+    def setUp(self):
+        llm_cache._stores_since_eviction = 0
+
+    async def store(self, prompt, **changes):
+        await store_cached_response('test-model', 0.0, prompt, {'prompt': prompt})
+        if changes:
+            await LLMResponseCache.objects.filter(prompt_hash=llm_cache.hash_prompt(prompt)).aupdate(**changes)
+
+    async def test_hit_and_miss(self):
+        await self.store('a')
+        with count_cache_lookups() as counts:
+            self.assertEqual(await get_cached_response('test-model', 0.0, 'a'), {'prompt': 'a'})
+            self.assertIsNone(await get_cached_response('test-model', 0.0, 'b'))
+            self.assertIsNone(await get_cached_response('other-model', 0.0, 'a'))
+        self.assertEqual(counts, {'hits': 1, 'misses': 2})
+        entry = await LLMResponseCache.objects.aget(prompt_hash=llm_cache.hash_prompt('a'))
+        self.assertEqual(entry.hit_count, 1)
+
+    async def test_expired_entry_is_a_miss_and_removed(self):
+        await self.store('a', created_at=timezone.now() - timedelta(seconds=3601))
+        with count_cache_lookups() as counts:
+            self.assertIsNone(await get_cached_response('test-model', 0.0, 'a'))
+        self.assertEqual(counts, {'hits': 0, 'misses': 1})
+        self.assertFalse(await LLMResponseCache.objects.aexists())
+
+    async def test_eviction_removes_expired_then_least_recently_used(self):
+        now = timezone.now()
+        await self.store('expired', created_at=now - timedelta(seconds=3601), last_used_at=now)
+        for index, prompt in enumerate(['old', 'recent', 'newer', 'newest']):
+            await self.store(prompt, last_used_at=now - timedelta(minutes=10 - index))
+        self.assertEqual(await evict_cached_responses(), 2)
+        remaining = {entry.response['prompt'] async for entry in LLMResponseCache.objects.all()}
+        self.assertEqual(remaining, {'recent', 'newer', 'newest'})
+
+    @override_settings(LLM_CACHE_EVICTION_INTERVAL=3)
+    async def test_stores_evict_only_every_interval(self):
+        for prompt in ['a', 'b', 'c', 'd', 'e']:
+            await self.store(prompt)
+        # The third store trimmed the cache to 3; the next two have not yet
+        self.assertEqual(await LLMResponseCache.objects.acount(), 5)
+        await self.store('f')
+        self.assertEqual(await LLMResponseCache.objects.acount(), 3)
+
+    async def test_counts_are_kept_per_caller(self):
+        await self.store('a')
+
+        async def count_lookups(prompt, lookups):
+            with count_cache_lookups() as counts:
+                for _ in range(lookups):
+                    await get_cached_response('test-model', 0.0, prompt)
+                    await asyncio.sleep(0)
+            return counts
+
+        hits, misses = await asyncio.gather(count_lookups('a', 3), count_lookups('missing', 2))
+        self.assertEqual(hits, {'hits': 3, 'misses': 0})
+        self.assertEqual(misses, {'hits': 0, 'misses': 2})
+
+    async def test_get_llm_response_uses_the_cache(self):
+        with mock.patch('resume_processor.llm_utils._get_llm_response_with_retries', return_value={'score': 1}) as call:
+            self.assertEqual(await get_llm_response('prompt'), {'score': 1})
+            self.assertEqual(await get_llm_response('prompt'), {'score': 1})
+        self.assertEqual(call.call_count, 1)
+
+    async def test_use_cache_false_neither_reads_nor_writes(self):
+        await self.store('prompt')
+        with mock.patch('resume_processor.llm_utils._get_llm_response_with_retries', return_value={'score': 2}) as call:
+            self.assertEqual(await get_llm_response('prompt', use_cache=False), {'score': 2})
+            await get_llm_response('uncached', use_cache=False)
+        self.assertEqual(call.call_count, 2)
+        self.assertFalse(await LLMResponseCache.objects.filter(prompt_hash=llm_cache.hash_prompt('uncached')).aexists())
+
+    async def test_bypass_neither_reads_nor_writes(self):
+        await self.store('prompt')
+        with mock.patch('resume_processor.llm_utils._get_llm_response_with_retries', return_value={'score': 3}) as call:
+            with bypass_llm_cache(), count_cache_lookups() as counts:
+                self.assertEqual(await get_llm_response('prompt'), {'score': 3})
+                await get_llm_response('uncached')
+        self.assertEqual(call.call_count, 2)
+        self.assertEqual(counts, {'hits': 0, 'misses': 0})
+        self.assertFalse(await LLMResponseCache.objects.filter(prompt_hash=llm_cache.hash_prompt('uncached')).aexists())
+
+    @override_settings(LLM_CACHE_ENABLED=False)
+    async def test_disabled_cache_is_skipped(self):
+        with mock.patch('resume_processor.llm_utils._get_llm_response_with_retries', return_value={'score': 4}):
+            await get_llm_response('prompt')
+        self.assertFalse(await LLMResponseCache.objects.aexists())
+
+
+class BatchFixtureMixin:
+    """
+    A batch of three synthetic resumes, ranked by a fake LLM whose calls are counted.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+        cls.zip_bytes = build_resume_zip(3, 150, 1, seed=7)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('hr', 'hr@example.com', 'password')
+        self.job_requirement = JobRequirement.objects.create(
+            user=self.user, title='Backend Engineer', pdf_file='requirements_pdfs/jd.pdf', status='processed_jd',
+            description_text='Backend engineer with python, django, postgresql and docker experience.',
+        )
+        self.resume_batch = ResumeBatch.objects.create(
+            user=self.user, job_requirement=self.job_requirement, status='processing', total_count=3,
+            zip_file=ContentFile(self.zip_bytes, name='batch.zip'),
+        )
+        self.member_names = [f'resumes/candidate_{index:05d}.pdf' for index in range(3)]
+        self.file_names = [name.split('/')[-1] for name in self.member_names]
+        rng = random.Random(0)
+        self.llm = mock.patch(
+            'resume_processor.llm_utils._get_llm_response_with_retries',
+            side_effect=lambda prompt_text, stats=None: synthetic_content(prompt_text, rng),
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def process_chunk(self, member_names=None, prefilter_scores=None):
+        return tasks._process_resume_chunk(
+            self.resume_batch.id, member_names or self.member_names, False, prefilter_scores
+        )
+
+    def dispatch_batch(self):
+        with mock.patch('resume_processor.tasks.chord') as dispatch_chord, \
+                mock.patch('resume_processor.tasks.finalize_resume_batch'):
+            result = tasks._process_resume_batch_zip(self.resume_batch.id, False, 'dispatch-task')
+        chunk_signatures = list(dispatch_chord.call_args.args[0].tasks) if dispatch_chord.called else []
+        return result, chunk_signatures
+
+    def assert_counters(self, done_count, failed_count=0):
+        self.resume_batch.refresh_from_db()
+        self.assertEqual((self.resume_batch.done_count, self.resume_batch.failed_count), (done_count, failed_count))
+
+
+# The chunk ranks on the runtime loop's thread, which needs committed data
+@override_settings(BATCH_EVENTS_REDIS_URL='', METRICS_REDIS_URL='', LLM_CACHE_ENABLED=False,
+                   LLM_RATE_LIMIT_REDIS_URL='', PDF_EXTRACTION_WORKERS=1, RESUME_TASK_CHUNK_SIZE=10)
+class ChunkRedeliveryTests(BatchFixtureMixin, TransactionTestCase):
+    """
+    A chunk delivered again after a worker crash neither ranks nor counts a
+    resume that already has a final result.
+    """
+
+    def test_redelivered_chunk_is_not_ranked_or_counted_again(self):
+        self.assertEqual(self.process_chunk()['processed_count'], 3)
+        self.assertEqual(self.llm.call_count, 6) # Profile and scoring prompt per resume
+        self.assert_counters(3)
+        ranked = dict(RankedResume.objects.values_list('file_name', 'compatibility_score'))
+
+        result = self.process_chunk()
+        self.assertEqual(result['processed_count'], 0)
+        self.assertEqual(self.llm.call_count, 6)
+        self.assert_counters(3)
+        self.assertEqual(dict(RankedResume.objects.values_list('file_name', 'compatibility_score')), ranked)
+
+    def test_redelivered_chunk_finishes_only_the_rest(self):
+        tasks.save_resume_results(self.resume_batch, [
+            build_resume_result(self.file_names[0], 'ranked', compatibility_score=77),
+        ])
+        self.assert_counters(1)
+
+        self.assertEqual(self.process_chunk()['processed_count'], 2)
+        self.assertEqual(self.llm.call_count, 4)
+        self.assert_counters(3)
+        self.assertEqual(RankedResume.objects.get(file_name=self.file_names[0]).compatibility_score, 77)
+        self.assertEqual(RankedResume.objects.filter(status='ranked').count(), 3)
+
+    def test_saving_the_same_results_twice_counts_them_once(self):
+        results = [
+            build_resume_result(self.file_names[0], 'ranked', compatibility_score=50),
+            build_resume_result(self.file_names[1], 'failed_extraction'),
+        ]
+        tasks.save_resume_results(self.resume_batch, [dict(result) for result in results])
+        self.assert_counters(2, failed_count=1)
+        tasks.save_resume_results(self.resume_batch, [dict(result) for result in results])
+        self.assert_counters(2, failed_count=1)
+        self.assertEqual(RankedResume.objects.count(), 2)
+
+
+@override_settings(BATCH_EVENTS_REDIS_URL='', METRICS_REDIS_URL='', LLM_CACHE_ENABLED=False,
+                   LLM_RATE_LIMIT_REDIS_URL='', PDF_EXTRACTION_WORKERS=1, RESUME_TASK_CHUNK_SIZE=10)
+class PrefilterRunTests(BatchFixtureMixin, TransactionTestCase):
+    """
+    The prefilter scores the whole batch once and stores the texts it extracts.
+    """
+
+    @override_settings(PREFILTER_TOP_K=2)
+    def test_prefilter_scores_the_whole_batch_once(self):
+        # A resume finished by an earlier run is scored, but its result is kept
+        tasks.save_resume_results(self.resume_batch, [
+            build_resume_result(self.file_names[0], 'ranked', compatibility_score=77),
+        ])
+        result, chunk_signatures = self.dispatch_batch()
+        self.resume_batch.refresh_from_db()
+        self.assertIsNotNone(self.resume_batch.prefilter_applied_at)
+        self.assertEqual(set(self.resume_batch.prefilter_scores), set(self.file_names))
+        self.assertEqual(max(self.resume_batch.prefilter_scores.values()), 100.0)
+        self.assertEqual(RankedResume.objects.get(file_name=self.file_names[0]).status, 'ranked')
+
+        dispatched = {
+            name.split('/')[-1]: score
+            for signature in chunk_signatures
+            for name in signature.args[1]
+            for score in [signature.kwargs['prefilter_scores'].get(name.split('/')[-1])]
+        }
+        filtered_out = set(RankedResume.objects.filter(status='prefiltered_out').values_list('file_name', flat=True))
+        self.assertEqual(set(dispatched) | filtered_out | {self.file_names[0]}, set(self.file_names))
+        for file_name, score in dispatched.items():
+            self.assertEqual(score, self.resume_batch.prefilter_scores[file_name])
+        self.assertEqual(self.llm.call_count, 0)
+
+    @override_settings(PREFILTER_TOP_K=1)
+    def test_extracted_texts_are_stored_for_the_chunks(self):
+        result, chunk_signatures = self.dispatch_batch()
+        self.assertEqual(result['resume_count'], 1)
+        self.assertEqual(set(tasks.stored_document_names(self.resume_batch.id)), set(self.file_names))
+
+        # The selected resume is ranked from its stored text, without reading the ZIP
+        with mock.patch('resume_processor.llm_utils.read_resume_member') as read_member:
+            self.process_chunk(chunk_signatures[0].args[1], chunk_signatures[0].kwargs['prefilter_scores'])
+        read_member.assert_not_called()
+        self.assert_counters(3)
+        ranked = RankedResume.objects.get(status='ranked')
+        self.assertEqual(ranked.prefilter_score, 100.0)
+
+
+@override_settings(BATCH_EVENTS_REDIS_URL='', METRICS_REDIS_URL='', LLM_CACHE_ENABLED=False,
+                   LLM_RATE_LIMIT_REDIS_URL='', PDF_EXTRACTION_WORKERS=1, RESUME_TASK_CHUNK_SIZE=10)
+class BatchRecoveryTests(BatchFixtureMixin, TestCase):
+    """
+    A restarted batch keeps the prefilter's decision, and the sweeper requeues
+    only batches none of whose tasks are alive.
+    """
+
+    # Restarted batches and the prefilter
+
+    @override_settings(PREFILTER_TOP_K=2)
+    def test_restarted_batch_reuses_the_prefilter_decision(self):
+        self.resume_batch.prefilter_applied_at = timezone.now()
+        self.resume_batch.prefilter_scores = {
+            self.file_names[0]: 100.0, self.file_names[1]: 40.0, self.file_names[2]: 10.0,
+        }
+        self.resume_batch.save()
+        tasks.save_resume_results(self.resume_batch, [
+            build_resume_result(self.file_names[0], 'ranked', compatibility_score=77),
+            build_resume_result(self.file_names[2], 'prefiltered_out', prefilter_score=10.0),
+        ])
+
+        with mock.patch('resume_processor.tasks.prefilter_zip_members') as prefilter:
+            result, chunk_signatures = self.dispatch_batch()
+        prefilter.assert_not_called()
+        self.assertEqual(result['resume_count'], 1)
+        self.assertEqual(len(chunk_signatures), 1)
+        self.assertEqual(chunk_signatures[0].args[1], [self.member_names[1]])
+        self.assertEqual(chunk_signatures[0].kwargs['prefilter_scores'], {self.file_names[1]: 40.0})
+        self.assert_counters(2)
+
+    def test_completed_batch_is_not_dispatched_again(self):
+        self.resume_batch.status = 'completed'
+        self.resume_batch.save()
+        result, chunk_signatures = self.dispatch_batch()
+        self.assertEqual(result['message'], 'Batch already completed.')
+        self.assertEqual(chunk_signatures, [])
+
+    # Stalled-batch sweeper
+
+    def beat(self, resume_batch, task_id, seconds_ago):
+        BatchTaskHeartbeat.objects.create(
+            resume_batch=resume_batch, task_id=task_id, beat_at=timezone.now() - timedelta(seconds=seconds_ago),
+        )
+
+    def new_batch(self, **fields):
+        return ResumeBatch.objects.create(
+            user=self.user, job_requirement=self.job_requirement, zip_file='resume_zips/batch.zip', **fields
+        )
+
+    @override_settings(BATCH_STALL_TIMEOUT_SECONDS=600, BATCH_MAX_REQUEUES=2)
+    def test_sweeper_requeues_only_batches_without_a_live_task(self):
+        stalled = self.new_batch(status='processing')
+        self.beat(stalled, 'dead-chunk', 900)
+        partly_alive = self.new_batch(status='processing')
+        self.beat(partly_alive, 'dead-chunk', 900)
+        self.beat(partly_alive, 'live-chunk', 30)
+        alive = self.new_batch(status='extracting')
+        self.beat(alive, 'coordinator', 30)
+        queued = self.new_batch(status='processing') # Chunks still queued, none running yet
+        finished = self.new_batch(status='completed')
+        self.beat(finished, 'dead-chunk', 900)
+        exhausted = self.new_batch(status='processing', requeue_count=2)
+        self.beat(exhausted, 'dead-chunk', 900)
+
+        with mock.patch('resume_processor.tasks.submit_resume_batch') as submit:
+            result = tasks.requeue_stalled_batches()
+        self.assertEqual(result, {'requeued': [stalled.id], 'failed': [exhausted.id]})
+        self.assertEqual([call.args[0].id for call in submit.call_args_list], [stalled.id])
+
+        stalled.refresh_from_db()
+        self.assertEqual(stalled.requeue_count, 1)
+        self.assertFalse(stalled.task_heartbeats.exists())
+        exhausted.refresh_from_db()
+        self.assertEqual(exhausted.status, 'failed')
+        self.assertTrue(partly_alive.task_heartbeats.filter(task_id='dead-chunk').exists())
+        for resume_batch in (partly_alive, alive, queued):
+            resume_batch.refresh_from_db()
+            self.assertEqual(resume_batch.requeue_count, 0)
+
+        # Once requeued, the batch is not picked up again until its new run stalls
+        with mock.patch('resume_processor.tasks.submit_resume_batch') as submit:
+            self.assertEqual(tasks.requeue_stalled_batches(), {'requeued': [], 'failed': []})
+        submit.assert_not_called()
+
+    def test_heartbeat_is_removed_when_the_task_ends(self):
+        with tasks.batch_heartbeat(self.resume_batch.id, 'chunk-task'):
+            self.assertTrue(self.resume_batch.task_heartbeats.filter(task_id='chunk-task').exists())
+        self.assertFalse(self.resume_batch.task_heartbeats.exists())
+
+
+@override_settings(BATCH_EVENTS_REDIS_URL='', METRICS_REDIS_URL='', RANKED_RESUME_WRITE_BATCH_SIZE=50)
+class RankedResumeWriteTests(TestCase):
+    """
+    Result rows fit their columns whatever the LLM returned, and storing a
+    result again updates its row without counting it again.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('hr', 'hr@example.com', 'password')
+        job_requirement = JobRequirement.objects.create(
+            user=cls.user, title='Backend Engineer', pdf_file='requirements_pdfs/jd.pdf', status='processed_jd',
+        )
+        cls.resume_batch = ResumeBatch.objects.create(
+            user=cls.user, job_requirement=job_requirement, zip_file='resume_zips/batch.zip', status='processing',
+        )
+
+    def ranked(self, file_name, **fields):
+        return build_resume_result(file_name, 'ranked', compatibility_score=60, **fields)
+
+    def test_oversized_llm_values_fit_their_columns(self):
+        tasks.save_resume_results(self.resume_batch, [
+            self.ranked('a.pdf', candidate_name='Ada Lovelace', candidate_email='ada@example.com'),
+            self.ranked('b.pdf', candidate_name='N' * 5000, candidate_email='x' * 300 + '@example.com'),
+            self.ranked('c.pdf', candidate_name=['Grace', 'Hopper'], candidate_email='N/A'),
+            build_resume_result('d.pdf', 'Error: ' + 'e' * 500),
+        ])
+        rows = {row.file_name: row for row in RankedResume.objects.filter(resume_batch=self.resume_batch)}
+        self.assertEqual(len(rows), 4)
+        self.assertEqual((rows['a.pdf'].candidate_name, rows['a.pdf'].candidate_email), ('Ada Lovelace', 'ada@example.com'))
+        self.assertEqual(rows['b.pdf'].candidate_name, 'N' * 255)
+        self.assertEqual(rows['b.pdf'].candidate_email, '')
+        self.assertEqual(rows['c.pdf'].candidate_name, "['Grace', 'Hopper']")
+        self.assertEqual(rows['c.pdf'].candidate_email, '')
+        self.assertEqual(rows['d.pdf'].status, 'failed_ranking')
+
+    def test_from_result_reads_the_profile_when_the_result_has_no_name(self):
+        row = RankedResume.from_result(self.resume_batch, {
+            'file_name': 'a.pdf', 'status': 'ranked', 'extracted_info': {'Name': 'Ada', 'Email': 'ada@example.com'},
+        })
+        self.assertEqual((row.candidate_name, row.candidate_email), ('Ada', 'ada@example.com'))
+
+    def test_upserting_a_result_again_does_not_count_it_again(self):
+        tasks.save_resume_results(self.resume_batch, [
+            self.ranked('a.pdf'), build_resume_result('b.pdf', 'failed_ranking'),
+        ])
+        self.resume_batch.refresh_from_db()
+        self.assertEqual((self.resume_batch.done_count, self.resume_batch.failed_count), (2, 1))
+
+        tasks.save_resume_results(self.resume_batch, [
+            self.ranked('a.pdf', candidate_name='Ada'), build_resume_result('b.pdf', 'failed_ranking'),
+        ])
+        self.resume_batch.refresh_from_db()
+        self.assertEqual((self.resume_batch.done_count, self.resume_batch.failed_count), (2, 1))
+        self.assertEqual(RankedResume.objects.filter(resume_batch=self.resume_batch).count(), 2)
+        self.assertEqual(RankedResume.objects.get(resume_batch=self.resume_batch, file_name='a.pdf').candidate_name, 'Ada')
+
+
+@override_settings(PDF_EXTRACTION_WORKERS=1, ZIP_MAX_MEMBERS_IN_MEMORY=2, PREFILTER_TOP_K=2, PREFILTER_MIN_SCORE=0)
+class PrefilterZipMembersTests(SimpleTestCase):
+    """
+    prefilter_zip_members keeps term counts only, handing texts to the caller's
+    storage in small groups as they are produced.
+    """
+
+    job_description = 'Backend engineer with python, django, postgresql, docker and kubernetes.'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.zip_ref = zipfile.ZipFile(io.BytesIO(build_resume_zip(5, 150, 1, seed=3)))
+        cls.members = cls.zip_ref.infolist()
+        cls.file_names = [member.filename.split('/')[-1] for member in cls.members]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.zip_ref.close()
+        super().tearDownClass()
+
+    async def prefilter(self, stored_texts=None):
+        stored_texts = stored_texts or {}
+        self.loaded, self.stored = [], []
+
+        async def load_texts(file_names):
+            self.loaded.append(list(file_names))
+            return {file_name: stored_texts[file_name] for file_name in file_names}
+
+        async def store_texts(extracted_texts):
+            self.stored.append(dict(extracted_texts))
+
+        return await prefilter_zip_members(
+            self.zip_ref, self.members, self.job_description,
+            stored_names=set(stored_texts), load_texts=load_texts, store_texts=store_texts,
+        )
+
+    async def test_texts_are_stored_in_groups_and_scores_match_bm25(self):
+        selected, scores, decided = await self.prefilter()
+        self.assertEqual([len(group) for group in self.stored], [2, 2, 1])
+        texts = {file_name: text for group in self.stored for file_name, (text, _) in group.items()}
+        self.assertEqual(set(texts), set(self.file_names))
+
+        raw_scores = bm25_scores(self.job_description, [texts[file_name] for file_name in self.file_names])
+        best = max(raw_scores)
+        self.assertEqual(scores, {
+            file_name: round(100.0 * raw / best, 2) for file_name, raw in zip(self.file_names, raw_scores)
+        })
+        self.assertEqual(len(selected), 2)
+        self.assertEqual(selected, sorted(selected, key=self.members.index))
+        self.assertEqual({result['status'] for result in decided}, {'prefiltered_out'})
+        self.assertEqual(len(decided), 3)
+
+    async def test_stored_texts_are_not_extracted_again(self):
+        _, first_scores, _ = await self.prefilter()
+        texts = {file_name: text for group in self.stored for file_name, (text, _) in group.items()}
+        stored_texts = {file_name: texts[file_name] for file_name in self.file_names[:3]}
+
+        with mock.patch(
+            'resume_processor.llm_utils.read_resume_member',
+            side_effect=lambda zip_ref, member, max_size: zip_ref.read(member),
+        ) as read_member:
+            _, scores, _ = await self.prefilter(stored_texts)
+        self.assertEqual(self.loaded, [self.file_names[:2], self.file_names[2:3]])
+        self.assertEqual(sorted(call.args[1].filename.split('/')[-1] for call in read_member.call_args_list), self.file_names[3:])
+        self.assertEqual(set(file_name for group in self.stored for file_name in group), set(self.file_names[3:]))
+        self.assertEqual(scores, first_scores)
+
+
+class ExtractionPoolTests(SimpleTestCase):
+    """
+    The extraction workers are never forked from the multi-threaded parent.
+    """
+
+    def test_start_method(self):
+        self.assertEqual(extraction.pool_start_method(['fork', 'spawn', 'forkserver']), 'forkserver')
+        self.assertEqual(extraction.pool_start_method(['spawn']), 'spawn')
+
+    def test_process_pool_does_not_fork(self):
+        extraction.shutdown_extraction_executor()
+        self.addCleanup(extraction.shutdown_extraction_executor)
+        executor = extraction.get_extraction_executor(1)
+        self.assertNotEqual(executor._mp_context.get_start_method(), 'fork')
+
+
+def llm_request():
+    import httpx
+    return httpx.Request('POST', 'https://llm.example.com/openai/v1/chat/completions')
+
+
+def llm_status_error(status_code, headers=None):
+    import httpx
+    import openai
+    response = httpx.Response(status_code, headers=headers, request=llm_request(), json={'error': {'message': 'error'}})
+    error_class = {429: openai.RateLimitError, 500: openai.InternalServerError, 400: openai.BadRequestError}
+    return error_class.get(status_code, openai.APIStatusError)('error', response=response, body=None)
+
+
+class FakeCompletions:
+    """
+    Stands in for client.chat.completions: every request takes `seconds`.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(self.seconds)
+        message = mock.Mock(content='{"ok": true}')
+        return mock.Mock(choices=[mock.Mock(message=message)], usage=None)
+
+
+@override_settings(LLM_CACHE_ENABLED=False, METRICS_REDIS_URL='', LLM_RATE_LIMIT_REDIS_URL='',
+                   LLM_REQUESTS_PER_MINUTE=0, LLM_TOKENS_PER_MINUTE=0, LLM_ATTEMPT_TIMEOUT=30,
+                   LLM_RESUME_DEADLINE_SECONDS=300)
+class LLMRetryTests(SimpleTestCase):
+    """
+    Error classification, Retry-After handling and the per-resume deadline.
+    """
+
+    def test_error_classification(self):
+        import openai
+        self.assertEqual(classify_llm_error(llm_status_error(429)), 'rate_limit')
+        for status_code in (500, 502, 503, 504, 408, 409):
+            self.assertEqual(classify_llm_error(llm_status_error(status_code)), 'server_error', status_code)
+        for status_code in (400, 401, 403, 404, 422):
+            self.assertIsNone(classify_llm_error(llm_status_error(status_code)), status_code)
+        self.assertEqual(classify_llm_error(openai.APIConnectionError(request=llm_request())), 'connection')
+        self.assertEqual(classify_llm_error(openai.APITimeoutError(request=llm_request())), 'connection')
+        self.assertEqual(classify_llm_error(json.JSONDecodeError('Expecting value', 'not json', 0)), 'invalid_json')
+        self.assertIsNone(classify_llm_error(ValueError('unexpected')))
+
+    def test_retry_after_headers(self):
+        self.assertEqual(get_retry_after(llm_status_error(429, {'retry-after': '7'})), 7.0)
+        self.assertEqual(get_retry_after(llm_status_error(429, {'retry-after-ms': '1500', 'retry-after': '7'})), 1.5)
+        retry_at = email.utils.formatdate(time.time() + 30, usegmt=True)
+        self.assertAlmostEqual(get_retry_after(llm_status_error(503, {'retry-after': retry_at})), 30, delta=2)
+        self.assertIsNone(get_retry_after(llm_status_error(429)))
+        self.assertIsNone(get_retry_after(llm_status_error(429, {'retry-after': 'soon'})))
+
+    async def call_with_errors(self, outcomes, stats=None):
+        with mock.patch('resume_processor.llm_utils._request_llm_completion', side_effect=outcomes) as request, \
+                mock.patch('resume_processor.llm_utils.asyncio.sleep') as sleep:
+            response = await get_llm_response('prompt', stats=stats)
+        return response, request, [call.args[0] for call in sleep.call_args_list]
+
+    async def test_retry_after_overrides_backoff(self):
+        stats = LLMCallStats(300)
+        response, request, delays = await self.call_with_errors([
+            llm_status_error(429, {'retry-after': '45'}),
+            llm_status_error(503, {'retry-after-ms': '250'}),
+            {'ok': True},
+        ], stats)
+        self.assertEqual(response, {'ok': True})
+        self.assertEqual(delays, [45.0, 0.25])
+        self.assertEqual((stats.attempts, stats.retries, stats.retry_wait_seconds), (3, 2, 45.25))
+
+    async def test_backoff_without_retry_after(self):
+        import openai
+        response, request, delays = await self.call_with_errors([
+            openai.APIConnectionError(request=llm_request()), {'ok': True},
+        ])
+        self.assertEqual(response, {'ok': True})
+        policy = llm_utils.RETRY_POLICIES['connection']
+        self.assertTrue(0 <= delays[0] <= policy.base_delay)
+
+    async def test_non_retryable_error_is_not_retried(self):
+        response, request, delays = await self.call_with_errors([llm_status_error(400), {'ok': True}])
+        self.assertIsNone(response)
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(delays, [])
+
+    async def test_gives_up_after_the_policy_attempts(self):
+        invalid_json = json.JSONDecodeError('Expecting value', 'not json', 0)
+        response, request, delays = await self.call_with_errors([invalid_json] * 5)
+        self.assertIsNone(response)
+        self.assertEqual(request.call_count, llm_utils.RETRY_POLICIES['invalid_json'].max_attempts)
+
+    async def test_retry_after_past_the_deadline_is_not_waited_for(self):
+        response, request, delays = await self.call_with_errors(
+            [llm_status_error(429, {'retry-after': '20'}), {'ok': True}], LLMCallStats(10),
+        )
+        self.assertIsNone(response)
+        self.assertEqual(delays, [])
+
+    @override_settings(LLM_MAX_IN_FLIGHT=1)
+    async def test_deadline_excludes_time_queued_on_the_scheduler(self):
+        llm_client = mock.Mock()
+        llm_client.chat.completions = FakeCompletions(0.2)
+        llm_utils.set_llm_client(llm_client)
+        self.addCleanup(llm_utils.set_llm_client, None)
+
+        # One request at a time: the last call waits about 0.4s for a slot,
+        # more than its whole 0.3s budget, but only its own request is charged
+        stats = [LLMCallStats(0.3) for _ in range(3)]
+        responses = await asyncio.gather(*(get_llm_response(f'prompt {index}', stats=stats[index]) for index in range(3)))
+        self.assertEqual(responses, [{'ok': True}] * 3)
+        for call_stats in stats:
+            self.assertEqual(call_stats.attempts, 1)
+            self.assertGreater(call_stats.time_budget, 0.05)
+
+
+class LLMSchedulerTests(SimpleTestCase):
+    """
+    Admission control: the in-flight limit and the per-minute token buckets.
+    """
+
+    async def test_in_flight_limit(self):
+        scheduler = LLMScheduler(requests_per_minute=0, tokens_per_minute=0, max_in_flight=2)
+        running, peak = 0, 0
+
+        async def call():
+            nonlocal running, peak
+            async with scheduler.slot(100):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.02)
+                running -= 1
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        self.assertEqual(peak, 2)
+
+    async def test_requests_wait_for_the_bucket(self):
+        bucket = TokenBucket(600) # 10 per second
+        await bucket.acquire(600)
+        started = time.monotonic()
+        await bucket.acquire(1)
+        self.assertGreaterEqual(time.monotonic() - started, 0.08)
+
+    async def test_oversized_request_takes_the_whole_bucket(self):
+        bucket = TokenBucket(600)
+        await asyncio.wait_for(bucket.acquire(5000), timeout=1)
+        self.assertLess(bucket.tokens, 1)
+
+    async def test_usage_refunds_or_charges_the_difference(self):
+        scheduler = LLMScheduler(requests_per_minute=0, tokens_per_minute=60000, max_in_flight=0)
+        async with scheduler.slot(10000):
+            pass
+        self.assertAlmostEqual(scheduler.tokens.tokens, 50000, delta=50)
+        await scheduler.record_usage(10000, 4000)
+        self.assertAlmostEqual(scheduler.tokens.tokens, 56000, delta=50)
+        await scheduler.record_usage(1000, 9000)
+        self.assertAlmostEqual(scheduler.tokens.tokens, 48000, delta=50)
+        # Unknown usage leaves the estimate in place
+        await scheduler.record_usage(1000, None)
+        self.assertAlmostEqual(scheduler.tokens.tokens, 48000, delta=50)
+
+    async def test_disabled_limits_do_not_wait(self):
+        scheduler = LLMScheduler(requests_per_minute=0, tokens_per_minute=0, max_in_flight=0)
+        async with scheduler.slot(10 ** 9):
+            pass
+        await scheduler.record_usage(10, 10 ** 9)
+
+
+@skipUnless(fakeredis, 'fakeredis is not installed')
+class RedisTokenBucketTests(SimpleTestCase):
+    """
+    The per-minute budgets shared by every process through Redis, and the
+    fallback to each process's own bucket while Redis is unreachable.
+    """
+
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+
+    def redis_client(self):
+        return fakeredis.aioredis.FakeRedis(server=self.server)
+
+    def bucket(self, capacity=600, redis_client=None):
+        return RedisTokenBucket(
+            redis_client or self.redis_client(), 'test:tokens', capacity, fallback=TokenBucket(capacity)
+        )
+
+    async def stored_tokens(self):
+        return float(await self.redis_client().hget('test:tokens', 'tokens'))
+
+    async def test_budget_is_shared_between_processes(self):
+        first, second = self.bucket(), self.bucket() # As if in two worker processes
+        with mock.patch('resume_processor.llm_utils.asyncio.sleep') as sleep:
+            await first.acquire(400)
+            await second.acquire(200)
+            sleep.assert_not_called()
+            await second.acquire(60)
+        # 60 tokens at 10 per second
+        self.assertAlmostEqual(sleep.call_args.args[0], 6.0, delta=0.1)
+        self.assertEqual(first.fallback.tokens, 600)
+
+    async def test_adjust_refunds_or_charges_the_difference(self):
+        bucket = self.bucket()
+        await bucket.acquire(300)
+        await bucket.adjust(-200)
+        self.assertAlmostEqual(await self.stored_tokens(), 500, delta=1)
+        await bucket.adjust(150)
+        self.assertAlmostEqual(await self.stored_tokens(), 350, delta=1)
+
+    async def test_scheduler_records_usage_in_the_shared_bucket(self):
+        scheduler = LLMScheduler(
+            requests_per_minute=600, tokens_per_minute=6000, max_in_flight=1,
+            redis_client=self.redis_client(), key_prefix='test',
+        )
+        async with scheduler.slot(1000):
+            pass
+        await scheduler.record_usage(1000, 250)
+        self.assertAlmostEqual(await self.stored_tokens(), 5750, delta=1)
+
+    async def test_falls_back_to_the_local_bucket_while_redis_is_unreachable(self):
+        import redis.asyncio as aioredis
+        unreachable = aioredis.Redis(host='127.0.0.1', port=1, socket_connect_timeout=0.2)
+        bucket = self.bucket(redis_client=unreachable)
+        await bucket.acquire(100)
+        self.assertAlmostEqual(bucket.fallback.tokens, 500, delta=1)
+        self.assertGreater(bucket._paused_until, time.monotonic())
+
+        # Redis is not tried again until the pause is over
+        with mock.patch.object(bucket, '_script') as script:
+            await bucket.acquire(100)
+            await bucket.adjust(-50)
+        script.assert_not_called()
+        self.assertAlmostEqual(bucket.fallback.tokens, 450, delta=1)
@@ -6,28 +6,58 @@ from django.urls import path
 from .views import (
     JobRequirementUploadView,
     ResumeBatchUploadView,
+    ResumeBatchRerankView,
     JobRequirementStatusView,
     ResumeBatchStatusView,
     RankedResumesListView,
+    RankedResumesKeysetListView,
     UserJobRequirementsList,
     UserResumeBatchesList,
     CeleryTaskStatusView,
+    ResumeBatchExportView,
+    JobRequirementExportView,
+    EventStreamTokenView,
+    job_requirement_events,
+    resume_batch_events,
+    metrics_view,
 )
+from .models import JobRequirement, ResumeBatch
+from .events import batch_channel, job_requirement_channel
 
 urlpatterns = [
     # File Upload Endpoints
     path('upload-requirements/', JobRequirementUploadView.as_view(), name='upload_requirements'),
     path('upload-resumes/', ResumeBatchUploadView.as_view(), name='upload_resumes'),
+    path('batches/<int:pk>/rerank/', ResumeBatchRerankView.as_view(), name='batch_rerank'),
 
     # Status Check Endpoints
     path('requirements/<int:pk>/status/', JobRequirementStatusView.as_view(), name='requirements_status'),
     path('batches/<int:pk>/status/', ResumeBatchStatusView.as_view(), name='batch_status'),
     path('tasks/<str:task_id>/status/', CeleryTaskStatusView.as_view(), name='celery_task_status'),
 
+    # Live progress streams (Server-Sent Events), opened with a token from events/token/
+    path('requirements/<int:pk>/events/', job_requirement_events, name='requirements_events'),
+    path('requirements/<int:pk>/events/token/', EventStreamTokenView.as_view(
+        model=JobRequirement, channel_for=job_requirement_channel,
+    ), name='requirements_events_token'),
+    path('batches/<int:pk>/events/', resume_batch_events, name='batch_events'),
+    path('batches/<int:pk>/events/token/', EventStreamTokenView.as_view(
+        model=ResumeBatch, channel_for=batch_channel,
+    ), name='batch_events_token'),
+
     # Results Endpoints
     path('batches/<int:batch_id>/ranked-resumes/', RankedResumesListView.as_view(), name='ranked_resumes_list'),
+    # Constant-time paging (?cursor=) and top-N (?top=N) in ranking order
+    path('batches/<int:batch_id>/ranked-resumes/ranking/', RankedResumesKeysetListView.as_view(), name='ranked_resumes_ranking'),
+
+    # Streaming exports (csv or ndjson)
+    path('batches/<int:batch_id>/export/<str:export_format>/', ResumeBatchExportView.as_view(), name='batch_export'),
+    path('requirements/<int:pk>/export/<str:export_format>/', JobRequirementExportView.as_view(), name='requirements_export'),
 
     # List Endpoints for User's History
     path('my-requirements/', UserJobRequirementsList.as_view(), name='my_requirements'),
     path('my-batches/', UserResumeBatchesList.as_view(), name='my_batches'),
+
+    # Pipeline metrics for Prometheus
+    path('metrics/', metrics_view, name='metrics'),
 ]
\ No newline at end of file
@@ -1,9 +1,17 @@
+import json
+import hmac
+import asyncio
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser # For file uploads
 from rest_framework.views import APIView # Make sure this is the only 'View' import
-from api.utils import audit
 from rest_framework import serializers
 from django.shortcuts import get_object_or_404
 from django_celery_results.models import TaskResult # To check task status from DB
@@ -12,8 +20,45 @@ from celery.result import AsyncResult # To get task status directly from Celery
 from api.utils import audit, scan_file
 
 from .models import JobRequirement, ResumeBatch, RankedResume
-from .serializers import JobRequirementSerializer, ResumeBatchSerializer, RankedResumeSerializer, TaskStatusSerializer
-from .tasks import process_job_requirement_pdf, process_resume_batch_zip # Import your Celery tasks
+from .serializers import (
+    JobRequirementSerializer,
+    JobRequirementListSerializer,
+    ResumeBatchSerializer,
+    ResumeBatchListSerializer,
+    ResumeBatchRerankSerializer,
+    ResumeBatchStatusSerializer,
+    RankedResumeListSerializer,
+    TaskStatusSerializer,
+)
+from .pagination import RankedResumeKeysetPagination
+from .exports import EXPORT_FORMATS, stream_export
+from .events import (
+    BATCH_FINISHED_STATUSES,
+    JD_FINISHED_STATUSES,
+    batch_channel,
+    batch_progress,
+    create_stream_token,
+    events_enabled,
+    job_requirement_channel,
+    job_requirement_progress,
+    read_stream_token,
+)
+from .metrics import PROMETHEUS_CONTENT_TYPE, render_metrics
+from .runtime import run_coroutine
+from .scheduling import submit_job_requirement, submit_resume_batch, submit_rerank # Queue the Celery tasks on their lanes
+
+logger = logging.getLogger(__name__)
+
+class ProjectedListMixin:
+    """
+    For list views whose serializer uses ProjectedFieldsMixin: loads only the
+    columns behind the requested fields, so unrequested JSON/text columns are
+    neither fetched nor decoded.
+    """
+    def project(self, queryset, *required_columns):
+        columns = self.get_serializer_class().get_projected_model_fields(self.request)
+        return queryset.only(*columns, *required_columns)
+
 
 class JobRequirementUploadView(generics.CreateAPIView):
    
@@ -35,9 +80,11 @@ class JobRequirementUploadView(generics.CreateAPIView):
                 job_requirement.delete()
                 raise serializers.ValidationError({"detail": f"Upload blocked by AV scan: {scan_status}"})
         
-        task = process_job_requirement_pdf.delay(job_requirement.id)
+        task = submit_job_requirement(job_requirement)
+        # Only the task ID is written, so the status and text the task may
+        # already have stored are not overwritten with the upload-time values
         job_requirement.processing_task_id = task.id
-        job_requirement.save()
+        job_requirement.save(update_fields=['processing_task_id'])
         
         audit(
             self.request.user, "UPLOAD_JD",
@@ -77,12 +124,14 @@ class ResumeBatchUploadView(generics.CreateAPIView):
                 resume_batch.delete()
                 raise serializers.ValidationError({"detail": f"Upload blocked by AV scan: {status}"})
         
-        # Trigger the Celery task to process the resumes
-        task = process_resume_batch_zip.delay(resume_batch.id)
+        # Trigger the Celery task to process the resumes, queued fairly behind
+        # this user's other outstanding batches
+        task = submit_resume_batch(resume_batch)
         
-        # Update the ResumeBatch with the task ID
+        # Update the ResumeBatch with the task ID. Only this column is written, so the
+        # status and progress counters the task may already be updating are not overwritten.
         resume_batch.processing_task_id = task.id
-        resume_batch.save()
+        resume_batch.save(update_fields=['processing_task_id'])
     
         audit(
             self.request.user, "UPLOAD_ZIP",
@@ -93,6 +142,54 @@ class ResumeBatchUploadView(generics.CreateAPIView):
         )
 
 
+class ResumeBatchRerankView(APIView):
+    """
+    API endpoint to rank an already uploaded batch against one or more other
+    Job Requirements. Creates one new batch per JD that reuses the uploaded ZIP
+    and its stored resume text, so nothing is uploaded, scanned or parsed again.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk, format=None):
+        source_batch = get_object_or_404(ResumeBatch, id=pk, user=request.user)
+        # Always share the documents of the original upload
+        if source_batch.source_batch_id:
+            source_batch = source_batch.source_batch
+
+        input_serializer = ResumeBatchRerankSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+        job_requirement_ids = list(dict.fromkeys(input_serializer.validated_data['job_requirements']))
+        job_requirements = list(JobRequirement.objects.filter(id__in=job_requirement_ids, user=request.user))
+        if len(job_requirements) != len(job_requirement_ids):
+            raise serializers.ValidationError({"job_requirements": "Job Requirement not found or does not belong to user."})
+        not_ready = [job_requirement.id for job_requirement in job_requirements if job_requirement.status != 'processed_jd']
+        if not_ready:
+            raise serializers.ValidationError({"job_requirements": f"Job Descriptions not yet processed: {not_ready}"})
+
+        resume_batches = [
+            ResumeBatch.objects.create(
+                user=request.user,
+                job_requirement=job_requirement,
+                zip_file=source_batch.zip_file.name,
+                source_batch=source_batch,
+            )
+            for job_requirement in job_requirements
+        ]
+        task = submit_rerank(source_batch, resume_batches)
+
+        audit(
+            request.user, "RERANK_BATCH",
+            resume_batch_id=source_batch.id,
+            job_requirement_ids=job_requirement_ids,
+            new_resume_batch_ids=[resume_batch.id for resume_batch in resume_batches],
+            task_id=task.id
+        )
+        return Response({
+            'task_id': task.id,
+            'resume_batches': ResumeBatchSerializer(resume_batches, many=True, context={'request': request}).data,
+        }, status=status.HTTP_202_ACCEPTED)
+
+
 class JobRequirementStatusView(generics.RetrieveAPIView):
     """
     API endpoint to get the status of a specific Job Requirement processing.
@@ -106,28 +203,30 @@ class JobRequirementStatusView(generics.RetrieveAPIView):
 
 class ResumeBatchStatusView(generics.RetrieveAPIView):
     """
-    API endpoint to get the status of a specific Resume Batch processing.
+    API endpoint to get the status of a specific Resume Batch processing,
+    including progress counters, an ETA and the top candidates ranked so far.
     """
     queryset = ResumeBatch.objects.all()
-    serializer_class = ResumeBatchSerializer
+    serializer_class = ResumeBatchStatusSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         return self.queryset.filter(user=self.request.user)
 
-class RankedResumesListView(generics.ListAPIView):
+class RankedResumesListView(ProjectedListMixin, generics.ListAPIView):
     """
     API endpoint to list ranked resumes for a specific Resume Batch.
-    Ordered by compatibility score descending.
+    Ordered by compatibility score descending. Rows are slim by default;
+    use ?expand=extracted_info,ranking_analysis or ?fields= for more.
     """
-    serializer_class = RankedResumeSerializer
+    serializer_class = RankedResumeListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         resume_batch_id = self.kwargs['batch_id']
         # Ensure the batch belongs to the current user
         resume_batch = get_object_or_404(ResumeBatch, id=resume_batch_id, user=self.request.user)
-        return RankedResume.objects.filter(resume_batch=resume_batch).order_by('-compatibility_score')
+        return self.project(RankedResume.objects.filter(resume_batch=resume_batch).order_by('-compatibility_score', 'id'))
     
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
@@ -142,25 +241,68 @@ class RankedResumesListView(generics.ListAPIView):
         return response
 
 
-class UserJobRequirementsList(generics.ListAPIView):
+class RankedResumesKeysetListView(ProjectedListMixin, generics.ListAPIView):
+    """
+    API endpoint to page through a Resume Batch's ranked resumes in ranking order
+    using an opaque ?cursor= (see RankedResumeKeysetPagination), without counting.
+    With ?top=N it returns just the best N resumes in a single query.
+    Accepts ?fields= / ?expand= like RankedResumesListView.
+    """
+    serializer_class = RankedResumeListSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = RankedResumeKeysetPagination
+
+    def get_queryset(self):
+        resume_batch_id = self.kwargs['batch_id']
+        # Ensure the batch belongs to the current user
+        resume_batch = get_object_or_404(ResumeBatch, id=resume_batch_id, user=self.request.user)
+        queryset = RankedResume.objects.filter(resume_batch=resume_batch).order_by('-compatibility_score', 'id')
+        # The cursor is built from the score, so it is always loaded
+        return self.project(queryset, 'compatibility_score')
+
+    def get_top(self):
+        top = self.request.query_params.get('top')
+        if top is None:
+            return None
+        try:
+            top = int(top)
+        except ValueError:
+            raise serializers.ValidationError({"top": "A positive integer is required."})
+        if top < 1:
+            raise serializers.ValidationError({"top": "A positive integer is required."})
+        return min(top, settings.RANKED_RESULTS_MAX_TOP)
+
+    def list(self, request, *args, **kwargs):
+        top = self.get_top()
+        if top is not None:
+            serializer = self.get_serializer(self.get_queryset()[:top], many=True)
+            response = Response({'results': serializer.data})
+        else:
+            response = super().list(request, *args, **kwargs)
+        audit(request.user, "VIEW_RANKED_LIST", resume_batch_id=kwargs['batch_id'], returned=len(response.data['results']))
+        return response
+
+
+class UserJobRequirementsList(ProjectedListMixin, generics.ListAPIView):
     """
     API endpoint to list all job requirements uploaded by the current user.
+    The JD text and requirements profile are left out unless requested with ?expand=.
     """
-    serializer_class = JobRequirementSerializer
+    serializer_class = JobRequirementListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return JobRequirement.objects.filter(user=self.request.user).order_by('-uploaded_at')
+        return self.project(JobRequirement.objects.filter(user=self.request.user).order_by('-uploaded_at'))
 
-class UserResumeBatchesList(generics.ListAPIView):
+class UserResumeBatchesList(ProjectedListMixin, generics.ListAPIView):
     """
     API endpoint to list all resume batches uploaded by the current user.
     """
-    serializer_class = ResumeBatchSerializer
+    serializer_class = ResumeBatchListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return ResumeBatch.objects.filter(user=self.request.user).order_by('-uploaded_at')
+        return self.project(ResumeBatch.objects.filter(user=self.request.user).order_by('-uploaded_at'))
 
 class CeleryTaskStatusView(APIView):
     """
@@ -181,3 +323,214 @@ class CeleryTaskStatusView(APIView):
             response_data['result'] = task.result
         return Response(response_data)
 
+
+
+class RankedResumesExportMixin:
+    """
+    Streams ranked resumes as CSV or NDJSON in a single response, without
+    pagination or counting (see exports.py).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def export(self, queryset, export_format, file_name):
+        if export_format not in EXPORT_FORMATS:
+            return Response({'detail': f"Unsupported export format, use one of: {', '.join(EXPORT_FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(stream_export(queryset, export_format), content_type=EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="{file_name}.{export_format}"'
+        return response
+
+
+class ResumeBatchExportView(RankedResumesExportMixin, APIView):
+    """
+    API endpoint to export all ranked resumes of a Resume Batch, best first.
+    """
+    def get(self, request, batch_id, export_format):
+        resume_batch = get_object_or_404(ResumeBatch, id=batch_id, user=request.user)
+        queryset = RankedResume.objects.filter(resume_batch=resume_batch).order_by('-compatibility_score', 'id')
+        audit(request.user, "EXPORT_RANKED", resume_batch_id=resume_batch.id, format=export_format)
+        return self.export(queryset, export_format, f"batch-{resume_batch.id}-ranked-resumes")
+
+
+class JobRequirementExportView(RankedResumesExportMixin, APIView):
+    """
+    API endpoint to export the ranked resumes of every batch run against a
+    Job Requirement as one list, best first.
+    """
+    def get(self, request, pk, export_format):
+        job_requirement = get_object_or_404(JobRequirement, id=pk, user=request.user)
+        queryset = RankedResume.objects.filter(
+            resume_batch__job_requirement=job_requirement, resume_batch__user=request.user
+        ).order_by('-compatibility_score', 'id')
+        audit(request.user, "EXPORT_RANKED", job_requirement_id=job_requirement.id, format=export_format)
+        return self.export(queryset, export_format, f"requirement-{job_requirement.id}-ranked-resumes")
+
+
+# ---------------------------------------------------------------------------
+# Live progress (Server-Sent Events)
+# ---------------------------------------------------------------------------
+# The dashboard first asks for a short-lived token scoped to one stream (with its JWT,
+# in the Authorization header), then opens the stream with it as ?token=: EventSource
+# cannot send headers, and the JWT itself must not end up in URLs and access logs.
+#
+# The streams are plain async Django views rather than DRF ones. Served through
+# backend/asgi.py by an ASGI server (e.g. `uvicorn backend.asgi:application`), an
+# open stream holds no thread while it waits. Under WSGI (runserver, gunicorn's sync
+# workers) each stream holds a thread instead: the events are produced on the
+# process's runtime loop and handed to the server as a plain iterator, since Django
+# would otherwise read an async iterator to the end before sending anything.
+
+class EventStreamTokenView(APIView):
+    """
+    Issues a token that opens the event stream of one of the user's objects for
+    EVENT_STREAM_TOKEN_MAX_AGE_SECONDS. Each route passes the object's `model`
+    and its `channel_for` function to as_view().
+    """
+    permission_classes = [IsAuthenticated]
+    model = None
+    channel_for = None
+
+    def post(self, request, pk):
+        get_object_or_404(self.model, id=pk, user=request.user)
+        return Response({
+            'token': create_stream_token(request.user.id, self.channel_for(pk)),
+            'expires_in': settings.EVENT_STREAM_TOKEN_MAX_AGE_SECONDS,
+        })
+
+
+async def get_stream_user(request, channel):
+    user_id = read_stream_token(request.GET.get('token', ''), channel)
+    if user_id is None:
+        return None
+    return await get_user_model().objects.filter(id=user_id, is_active=True).afirst()
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def stream_events(channel, load_progress, finished_statuses):
+    """
+    Relays the events published on `channel` as SSE. The current state is sent
+    first and re-read on every heartbeat, so nothing is missed if Redis is down
+    or an event is dropped. The stream ends once the status is final.
+    """
+    heartbeat = settings.BATCH_EVENTS_HEARTBEAT_SECONDS
+    pubsub = None
+    if events_enabled():
+        try:
+            import redis.asyncio as aioredis # Only processes that serve streams need it
+            pubsub = aioredis.Redis.from_url(settings.BATCH_EVENTS_REDIS_URL).pubsub()
+            # Subscribe before reading the snapshot so no event falls in between
+            await pubsub.subscribe(channel)
+        except Exception as e:
+            logger.warning("Event stream for %s falling back to database polling: %s", channel, e)
+            pubsub = None
+    try:
+        while True:
+            progress = await load_progress()
+            yield format_sse('progress', progress)
+            if progress is None or progress['status'] in finished_statuses:
+                return
+
+            if pubsub is None:
+                await asyncio.sleep(heartbeat)
+                continue
+            # Relay events until the stream has been idle for a heartbeat
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=heartbeat)
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    break
+                payload = json.loads(message['data'])
+                yield format_sse(payload['event'], payload['data'])
+                if payload['event'] == 'progress' and payload['data'].get('status') in finished_statuses:
+                    return
+    finally:
+        if pubsub is not None:
+            await pubsub.reset()
+            await pubsub.connection_pool.disconnect()
+
+
+def iterate_on_runtime(events):
+    """
+    Serves the async generator `events` as a sync one, for WSGI servers: each
+    item is produced on the process's long-lived event loop (see runtime.py),
+    which its Redis connection stays bound to.
+    """
+    async def next_event():
+        return await anext(events)
+
+    try:
+        while True:
+            try:
+                yield run_coroutine(next_event())
+            except StopAsyncIteration:
+                return
+    finally:
+        # Also reached when the client disconnects and the server closes the response
+        run_coroutine(events.aclose())
+
+
+def event_stream_response(request, events):
+    if not isinstance(request, ASGIRequest):
+        events = iterate_on_runtime(events)
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no' # Keep nginx from buffering the stream
+    return response
+
+
+async def resume_batch_events(request, pk):
+    """
+    Streams a batch's status, progress counters and newly ranked candidates.
+    """
+    user = await get_stream_user(request, batch_channel(pk))
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided or are invalid.'}, status=401)
+    if not await ResumeBatch.objects.filter(id=pk, user=user).aexists():
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+
+    async def load_progress():
+        resume_batch = await ResumeBatch.objects.filter(id=pk).afirst()
+        return batch_progress(resume_batch) if resume_batch else None
+
+    return event_stream_response(request, stream_events(batch_channel(pk), load_progress, BATCH_FINISHED_STATUSES))
+
+
+async def job_requirement_events(request, pk):
+    """
+    Streams a job requirement's processing status until it is processed or has failed.
+    """
+    user = await get_stream_user(request, job_requirement_channel(pk))
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided or are invalid.'}, status=401)
+    if not await JobRequirement.objects.filter(id=pk, user=user).aexists():
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+
+    async def load_progress():
+        job_requirement = await JobRequirement.objects.filter(id=pk).afirst()
+        return job_requirement_progress(job_requirement) if job_requirement else None
+
+    return event_stream_response(
+        request, stream_events(job_requirement_channel(pk), load_progress, JD_FINISHED_STATUSES)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Metrics (Prometheus text format)
+# ---------------------------------------------------------------------------
+# A plain Django view: Prometheus scrapes it with a static bearer token
+# (METRICS_AUTH_TOKEN), not a user's JWT. Every scrape reads Redis and counts
+# batches in the database, so there is no anonymous access: without a token
+# configured the endpoint refuses every request.
+
+def metrics_view(request):
+    if not settings.METRICS_ENABLED:
+        return JsonResponse({'detail': 'Metrics are disabled.'}, status=404)
+    if not settings.METRICS_AUTH_TOKEN:
+        return JsonResponse({'detail': 'Set METRICS_AUTH_TOKEN to enable scraping.'}, status=403)
+    # compare_digest only accepts ASCII str, so compare the encoded bytes
+    expected = f"Bearer {settings.METRICS_AUTH_TOKEN}".encode()
+    if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), expected):
+        return JsonResponse({'detail': 'Authentication credentials were not provided or are invalid.'}, status=401)
+    return HttpResponse(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -77,12 +77,29 @@ api.getJobRequirementStatus = (id) =>
 api.getResumeBatchStatus = (id) =>
     api.get(`api/resume-processor/batches/${id}/status/`);
 
+// The list is slim by default; the dashboard cards also show the extracted details and analysis
 api.getRankedResumes = (batchId,page=1) =>
-    api.get(`api/resume-processor/batches/${batchId}/ranked-resumes/?page=${page}`);
+    api.get(`api/resume-processor/batches/${batchId}/ranked-resumes/?page=${page}&expand=extracted_info,ranking_analysis`);
 
 api.getCeleryTaskStatus = (taskId) =>
     api.get(`api/resume-processor/tasks/${taskId}/status/`);
 
+// --------------------------------
+// Live progress streams (Server-Sent Events)
+// --------------------------------
+// EventSource cannot send an Authorization header, so a stream is opened with a
+// short-lived token scoped to it, fetched with the JWT, rather than the JWT itself
+const openEventStream = async (path) => {
+    const { data } = await api.post(`${path}token/`);
+    return new EventSource(`${API_BASE_URL}${path}?token=${encodeURIComponent(data.token)}`);
+};
+
+api.openJobRequirementEvents = (id) =>
+    openEventStream(`api/resume-processor/requirements/${id}/events/`);
+
+api.openResumeBatchEvents = (id) =>
+    openEventStream(`api/resume-processor/batches/${id}/events/`);
+
 api.getMyRequirements = () =>
     api.get('api/resume-processor/my-requirements/');
 
@@ -28,6 +28,11 @@ const Dashboard = () => {
   const [rankedResumes, setRankedResumes] = useState([]);
   const [jobTitle, setJobTitle] = useState('');
   const pollingIntervalRef = useRef(null);
+  // Progress is pushed by the server; polling is the fallback when the stream is unavailable,
+  // and also runs until the stream has delivered its first event
+  const [liveUpdates, setLiveUpdates] = useState(typeof EventSource !== 'undefined');
+  const [streamConnected, setStreamConnected] = useState(false);
+  const [batchProgress, setBatchProgress] = useState(null);
   const [uploadedFileNames, setUploadedFileNames] = useState({ hr: '', zip: '' });
   const hrFileInputRef = useRef(null);
   const zipFileInputRef = useRef(null);
@@ -108,6 +113,7 @@ const Dashboard = () => {
 
       if (resumeBatchId && processingResumeStatus === 'processing_resumes') {
         const { data } = await api.getResumeBatchStatus(resumeBatchId);
+        setBatchProgress(data);
         if (data.status === 'completed') {
           setProcessingResumeStatus('completed');
           fetchRankedResumes(resumeBatchId);
@@ -123,8 +129,69 @@ const Dashboard = () => {
     }
   }, [jobRequirementId, resumeBatchId, processingJDStatus, processingResumeStatus]);
 
+  // Opens an event stream and wires up its handlers; returns the effect cleanup
+  const subscribe = (openEvents, onProgress) => {
+    let events = null;
+    let cancelled = false;
+    openEvents()
+      .then((source) => {
+        if (cancelled) {
+          source.close();
+          return;
+        }
+        events = source;
+        events.addEventListener('progress', (e) => {
+          setStreamConnected(true);
+          onProgress(JSON.parse(e.data), events);
+        });
+        events.onerror = () => {
+          events.close();
+          setStreamConnected(false);
+          setLiveUpdates(false);
+        };
+      })
+      .catch(() => setLiveUpdates(false));
+    return () => {
+      cancelled = true;
+      if (events) events.close();
+      setStreamConnected(false);
+    };
+  };
+
+  useEffect(() => {
+    if (!liveUpdates || !jobRequirementId || processingJDStatus !== 'processing_jd') return;
+    return subscribe(() => api.openJobRequirementEvents(jobRequirementId), (data, events) => {
+      if (data.status === 'processed_jd') {
+        events.close();
+        setProcessingJDStatus('job_description_ready');
+        setJobTitle(data.title || 'Job Title Extracted');
+      } else if (data.status === 'failed_jd') {
+        events.close();
+        setProcessingJDStatus('error');
+        setErrorMessage('Failed to process Job Description.');
+      }
+    });
+  }, [liveUpdates, jobRequirementId, processingJDStatus]);
+
+  useEffect(() => {
+    if (!liveUpdates || !resumeBatchId || processingResumeStatus !== 'processing_resumes') return;
+    return subscribe(() => api.openResumeBatchEvents(resumeBatchId), (data, events) => {
+      setBatchProgress(data);
+      if (data.status === 'completed') {
+        events.close();
+        setProcessingResumeStatus('completed');
+        fetchRankedResumes(resumeBatchId);
+      } else if (data.status === 'failed') {
+        events.close();
+        setProcessingResumeStatus('error');
+        setErrorMessage('Failed to rank resumes.');
+      }
+    });
+  }, [liveUpdates, resumeBatchId, processingResumeStatus]);
+
   useEffect(() => {
     if (
+      !(liveUpdates && streamConnected) &&
       (processingJDStatus === 'processing_jd' ||
         processingResumeStatus === 'processing_resumes') &&
       !pollingIntervalRef.current
@@ -137,7 +204,7 @@ const Dashboard = () => {
         pollingIntervalRef.current = null;
       }
     };
-  }, [processingJDStatus, processingResumeStatus, pollStatus]);
+  }, [liveUpdates, streamConnected, processingJDStatus, processingResumeStatus, pollStatus]);
 
   const fetchRankedResumes = async (batchId, page = 1) => {
   try {
@@ -163,6 +230,9 @@ const Dashboard = () => {
     setRankedResumes([]);
     setJobTitle('');
     setUploadedFileNames({ hr: '', zip: '' });
+    setBatchProgress(null);
+    setLiveUpdates(typeof EventSource !== 'undefined');
+    setStreamConnected(false);
     if (pollingIntervalRef.current) {
       clearInterval(pollingIntervalRef.current);
       pollingIntervalRef.current = null;
@@ -251,6 +321,11 @@ const Dashboard = () => {
                     <div>
                       <div className="card-title">Résumés ZIP</div>
                       <StatusChip state={processingResumeStatus} readyText="Ranking Complete" />
+                      {processingResumeStatus === 'processing_resumes' && batchProgress?.total_count > 0 && (
+                        <p className="muted" style={{marginTop:6}}>
+                          Ranked {batchProgress.done_count} of {batchProgress.total_count}
+                        </p>
+                      )}
                       {uploadedFileNames.zip && (
                         <p className="muted" style={{marginTop:6}}>File: {uploadedFileNames.zip}</p>
                       )}